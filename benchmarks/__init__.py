@@ -0,0 +1,6 @@
+"""Load tests and micro-benchmarks for the scrape_me app.
+
+Run a benchmark from the repository root, e.g.::
+
+    python -m benchmarks.async_scrape_load
+"""
@@ -0,0 +1,85 @@
+"""Concurrent cache-miss load test: WSGI parse-recipe-url vs ASGI parse-recipe-url-async.
+
+"Before" drives the blocking view through `config.wsgi.application` on a
+fixed pool of worker threads, the way a threaded WSGI server would.  "After"
+drives the async view through `config.asgi.application` on a single event
+loop.  Every request asks for a distinct, uncached URL on a local stub server
+that answers after a fixed delay, standing in for a slow recipe site::
+
+    python -m benchmarks.async_scrape_load --requests 200 --delay 1.0 --wsgi-workers 8
+"""
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .common import asgi_get, percentile, setup_django, stub_recipe_server, wsgi_get
+
+
+def run_wsgi_wave(application, base_url: str, count: int, workers: int):
+    latencies = []
+
+    def one(index: int):
+        started = time.perf_counter()
+        status, body = wsgi_get(application, "/parse-recipe-url", {"url": f"{base_url}/wsgi/{index}"})
+        if status != 200:
+            raise RuntimeError(f"parse-recipe-url returned {status}: {body[:200]!r}")
+        return started
+
+    # Latency is measured from submission so queueing for a free worker counts.
+    submitted = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(one, index) for index in range(count)]
+        for future in futures:
+            future.result()
+            latencies.append(time.perf_counter() - submitted)
+    return time.perf_counter() - submitted, latencies
+
+
+async def run_asgi_wave(application, base_url: str, count: int):
+    latencies = []
+
+    async def one(index: int):
+        started = time.perf_counter()
+        status, body = await asgi_get(application, "/parse-recipe-url-async", {"url": f"{base_url}/asgi/{index}"})
+        latencies.append(time.perf_counter() - started)
+        if status != 200:
+            raise RuntimeError(f"parse-recipe-url-async returned {status}: {body[:200]!r}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(count)))
+    return time.perf_counter() - started, latencies
+
+
+def report(label: str, count: int, elapsed: float, latencies) -> None:
+    print(
+        f"{label:<40} {count:>5} req  {elapsed:7.2f}s  {count / elapsed:8.1f} req/s"
+        f"  p50 {percentile(latencies, 50) * 1000:8.1f}ms  p95 {percentile(latencies, 95) * 1000:8.1f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="concurrent cache misses per run")
+    parser.add_argument("--delay", type=float, default=1.0, help="stub server response delay in seconds")
+    parser.add_argument("--wsgi-workers", type=int, default=8, help="WSGI worker threads for the baseline")
+    args = parser.parse_args()
+
+    setup_django(RECIPE_SCRAPE_SUPPORTED_ONLY=False)
+
+    from config.asgi import application as asgi_application
+    from config.wsgi import application as wsgi_application
+
+    with stub_recipe_server(delay=args.delay) as base_url:
+        print(f"stub server {base_url}, {args.delay * 1000:.0f}ms per page, {args.requests} concurrent misses")
+
+        elapsed, latencies = run_wsgi_wave(wsgi_application, base_url, args.requests, args.wsgi_workers)
+        report(f"wsgi parse-recipe-url ({args.wsgi_workers} workers)", args.requests, elapsed, latencies)
+
+        elapsed, latencies = asyncio.run(run_asgi_wave(asgi_application, base_url, args.requests))
+        report("asgi parse-recipe-url-async (1 loop)", args.requests, elapsed, latencies)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""Shared plumbing for the benchmark scripts.
+
+Benchmarks run against a throwaway SQLite database and, where a recipe page
+is needed, against a local stub server, so no real recipe site is contacted.
+"""
+
+import asyncio
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+from urllib.parse import urlencode
+
+import django
+
+
+STUB_RECIPE = {
+    "@context": "https://schema.org",
+    "@type": "Recipe",
+    "name": "Stub Tomato Soup",
+    "author": {"@type": "Person", "name": "Bench Cook"},
+    "description": "A tomato soup served by the benchmark stub server.",
+    "recipeIngredient": [
+        "2 tablespoons olive oil",
+        "1 onion, chopped",
+        "800 g canned tomatoes",
+        "500 ml vegetable stock",
+        "Salt and pepper to taste",
+    ],
+    "recipeInstructions": [
+        {"@type": "HowToStep", "text": "Soften the onion in the oil."},
+        {"@type": "HowToStep", "text": "Add tomatoes and stock and simmer for 20 minutes."},
+        {"@type": "HowToStep", "text": "Blend, season and serve."},
+    ],
+    "totalTime": "PT30M",
+    "recipeYield": "4",
+    "image": "https://example.com/stub-soup.jpg",
+}
+
+
+def render_stub_page(path: str) -> bytes:
+    recipe = dict(STUB_RECIPE, name=f"{STUB_RECIPE['name']} {path}")
+    return (
+        "<html><head><title>Stub</title>"
+        f'<script type="application/ld+json">{json.dumps(recipe)}</script>'
+        "</head><body><h1>Stub</h1></body></html>"
+    ).encode("utf-8")
+
+
+class _StubRecipeHandler(BaseHTTPRequestHandler):
+    delay = 0.0
+
+    def do_GET(self):
+        if self.delay:
+            time.sleep(self.delay)
+        body = render_stub_page(self.path)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def stub_recipe_server(delay: float = 0.0) -> Iterator[str]:
+    """Serve a schema.org recipe page for every path; yields the base URL."""
+
+    handler = type("StubRecipeHandler", (_StubRecipeHandler,), {"delay": delay})
+    server_class = type("StubRecipeServer", (ThreadingHTTPServer,), {"request_queue_size": 1024})
+    server = server_class(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+_ADJECTIVES = ["crispy", "spicy", "creamy", "smoky", "quick", "rustic", "lemony", "garlicky", "hearty", "sticky"]
+_MAINS = [
+    "chicken", "salmon", "tofu", "lentil", "mushroom", "beef", "shrimp", "chickpea",
+    "pork", "eggplant", "halloumi", "cauliflower", "turkey", "bean", "potato", "noodle",
+]
+_DISHES = ["soup", "stew", "curry", "salad", "tacos", "pasta", "bake", "stir-fry", "skillet", "bowl"]
+_INGREDIENTS = [
+    "olive oil", "onion, chopped", "garlic cloves, minced", "canned tomatoes", "vegetable stock",
+    "salt", "black pepper", "cumin", "smoked paprika", "lemon juice", "fresh parsley", "butter",
+    "all-purpose flour", "heavy cream", "parmesan", "rice", "coconut milk", "ginger", "soy sauce",
+    "honey", "chili flakes", "spinach", "carrots", "celery", "thyme", "oregano", "cilantro",
+]
+_UNITS = ["cup", "cups", "tablespoons", "teaspoon", "g", "ml", "oz", "lb", ""]
+
+
+def synthetic_recipe_fields(index: int, rng: random.Random) -> Dict[str, Any]:
+    """Return Recipe field values for one plausible, deterministic fake recipe."""
+
+    main = rng.choice(_MAINS)
+    title = f"{rng.choice(_ADJECTIVES).title()} {main} {rng.choice(_DISHES)}"
+    ingredients = [
+        f"{rng.randint(1, 4)} {rng.choice(_UNITS)} {ingredient}".replace("  ", " ")
+        for ingredient in [main] + rng.sample(_INGREDIENTS, rng.randint(5, 12))
+    ]
+    instructions = [
+        f"Step {step + 1}: combine the {rng.choice(_INGREDIENTS)} and cook for {rng.randint(2, 30)} minutes."
+        for step in range(rng.randint(3, 9))
+    ]
+    return {
+        "source_url": f"https://{rng.choice(['example.com', 'example.org', 'recipes.test'])}/recipe/{index}",
+        "title": title,
+        "description": f"A {title.lower()} with {', '.join(rng.sample(_INGREDIENTS, 3))}.",
+        "author": f"Cook {rng.randint(1, 500)}",
+        "total_time": rng.randint(10, 180),
+        "yields": f"{rng.randint(1, 8)} servings",
+        "image": f"https://img.example.com/{index}.jpg",
+        "ingredients": ingredients,
+        "instructions": instructions,
+        "views": rng.randint(0, 5000),
+    }
+
+
+def populate_catalog(count: int, seed: int = 1234, batch_size: int = 2000) -> None:
+    """Bulk insert `count` synthetic recipes into the configured database."""
+
+    from scrape_me.models import Recipe
+
+    rng = random.Random(seed)
+    start = Recipe.objects.count()
+    batch = []
+    for index in range(start, start + count):
+        recipe = Recipe(**synthetic_recipe_fields(index, rng))
+        recipe.prepare_for_save()
+        batch.append(recipe)
+        if len(batch) >= batch_size:
+            Recipe.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Recipe.objects.bulk_create(batch)
+
+
+def setup_django(database: Path | None = None, **overrides) -> None:
+    """Configure Django against `database` (a temp file by default) and migrate it."""
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    from django.conf import settings
+
+    if database is None:
+        database = Path(tempfile.mkdtemp(prefix="flavorbuddy-bench-")) / "bench.sqlite3"
+    settings.DATABASES["default"]["NAME"] = str(database)
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+
+    django.setup()
+
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0, interactive=False)
+
+
+async def asgi_request(
+    application,
+    method: str,
+    path: str,
+    params: Dict[str, str] | None = None,
+    body: bytes = b"",
+    content_type: str = "",
+) -> Tuple[int, bytes]:
+    """Send a single request straight into an ASGI application."""
+
+    headers = [(b"host", b"localhost")]
+    if content_type:
+        headers += [(b"content-type", content_type.encode("ascii")), (b"content-length", str(len(body)).encode())]
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("ascii"),
+        "query_string": urlencode(params or {}).encode("ascii"),
+        "headers": headers,
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    request_sent = False
+    response_done = asyncio.Event()
+    status = 0
+    chunks: List[bytes] = []
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Django watches for disconnects while the view runs; only report one
+        # once the response has been fully sent.
+        await response_done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                response_done.set()
+
+    await application(scope, receive, send)
+    return status, b"".join(chunks)
+
+
+async def asgi_get(application, path: str, params: Dict[str, str] | None = None) -> Tuple[int, bytes]:
+    """Send a single GET request straight into an ASGI application."""
+
+    return await asgi_request(application, "GET", path, params)
+
+
+def wsgi_request(
+    application,
+    method: str,
+    path: str,
+    params: Dict[str, str] | None = None,
+    body: bytes = b"",
+    content_type: str = "",
+) -> Tuple[int, bytes]:
+    """Send a single request straight into a WSGI application."""
+
+    import io
+    import sys
+
+    environ = {
+        "REQUEST_METHOD": method,
+        "SCRIPT_NAME": "",
+        "PATH_INFO": path,
+        "QUERY_STRING": urlencode(params or {}),
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_HOST": "localhost",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    if content_type:
+        environ.update(CONTENT_TYPE=content_type, CONTENT_LENGTH=str(len(body)))
+    status_line = ""
+
+    def start_response(status, headers, exc_info=None):
+        nonlocal status_line
+        status_line = status
+
+    response = application(environ, start_response)
+    try:
+        content = b"".join(response)
+    finally:
+        if hasattr(response, "close"):
+            response.close()
+    return int(status_line.split(" ", 1)[0]), content
+
+
+def wsgi_get(application, path: str, params: Dict[str, str] | None = None) -> Tuple[int, bytes]:
+    """Send a single GET request straight into a WSGI application."""
+
+    return wsgi_request(application, "GET", path, params)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
@@ -0,0 +1,78 @@
+"""Measure near-duplicate detection: signature throughput, lookup latency and clustering time.
+
+Populates a synthetic catalog in which every `--copy-every`-th recipe is a
+reworded copy of an earlier one, clusters it with `cluster_duplicates`, then
+times `find_duplicate` lookups against the stored LSH buckets::
+
+    python -m benchmarks.duplicates --recipes 20000 --copy-every 10 --workers 4
+"""
+
+import argparse
+import os
+import random
+import time
+
+from .common import percentile, populate_catalog, setup_django, synthetic_recipe_fields
+
+
+def _reworded(fields, rng):
+    ingredients = list(fields["ingredients"])
+    ingredients[0] = "1 " + ingredients[0].split(" ", 1)[-1]
+    instructions = list(fields["instructions"])
+    instructions[-1] = instructions[-1].replace("minutes", "min")
+    return {**fields, "ingredients": ingredients, "instructions": instructions}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=20_000)
+    parser.add_argument("--copy-every", type=int, default=10)
+    parser.add_argument("--lookups", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from scrape_me.duplicates import cluster_duplicates, find_duplicate, recipe_signature
+    from scrape_me.models import Recipe
+
+    populate_catalog(args.recipes)
+    rng = random.Random(99)
+    originals = list(Recipe.objects.order_by("pk").values_list("ingredients", "instructions")[: args.recipes])
+    copies = []
+    for index in range(0, args.recipes, args.copy_every):
+        ingredients, instructions = originals[index]
+        fields = synthetic_recipe_fields(args.recipes + index, rng)
+        fields.update(_reworded({"ingredients": ingredients, "instructions": instructions}, rng))
+        recipe = Recipe(**fields)
+        recipe.prepare_for_save()
+        copies.append(recipe)
+    Recipe.objects.bulk_create(copies, batch_size=2000)
+
+    started = time.perf_counter()
+    signatures = [recipe_signature(ingredients, instructions) for ingredients, instructions in originals[:2000]]
+    elapsed = time.perf_counter() - started
+    print(f"recipe_signature      {len(signatures) / elapsed:>10,.0f} recipes/s")
+
+    started = time.perf_counter()
+    stats = cluster_duplicates(workers=args.workers)
+    elapsed = time.perf_counter() - started
+    print(
+        f"cluster_duplicates    {elapsed:>10.1f}s  fingerprinted {stats.fingerprinted}"
+        f"  clusters {stats.clusters}  duplicates {stats.duplicates} (planted {len(copies)})"
+    )
+
+    samples = []
+    found = 0
+    for signature in rng.sample(signatures, min(args.lookups, len(signatures))):
+        started = time.perf_counter()
+        found += find_duplicate(signature) is not None
+        samples.append(time.perf_counter() - started)
+    print(
+        f"find_duplicate        p50 {percentile(samples, 50) * 1000:7.2f}ms"
+        f"  p95 {percentile(samples, 95) * 1000:7.2f}ms  matched {found}/{len(samples)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+"""Endpoint regression suite: latency, throughput and SQL queries per request against stored baselines.
+
+Builds (or reuses) a synthetic catalog of `--recipes` rows, then drives each
+scenario -- get-recipes in page, cursor, search and summary modes,
+parse-recipe-url hits and misses (stub page and scraper), and
+convert-raw-recipe through the local parser and a fake model -- with up to
+three drivers:
+
+* client: Django's test client, one request at a time, counting SQL queries;
+* wsgi: `config.wsgi.application` on `--concurrency` worker threads;
+* asgi: `config.asgi.application` with `--concurrency` requests in flight.
+
+Results are compared with `benchmarks/baselines/endpoints-<size>.json`; a
+scenario regresses when it issues more SQL queries per request than the
+baseline and, with `--check-timings`, when its p95 latency or throughput is
+worse by more than `--tolerance`. Any regression makes the run exit with
+status 1. Timings are machine-specific and noisy, so each baseline records
+the machine it was measured on and timings are never checked on another
+one; record a baseline on the machine that checks it::
+
+    python -m benchmarks.endpoints --recipes 10000 --save-baseline
+    python -m benchmarks.endpoints --recipes 10000 --check-timings
+    python -m benchmarks.endpoints --recipes 1000000 --drivers client --requests 100
+
+Catalogs are kept in `--catalog-dir` keyed by size and seed, and each run
+works on a copy, so repeated runs start from identical data.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+from unittest.mock import patch
+
+from .common import asgi_request, percentile, setup_django, synthetic_recipe_fields, wsgi_request
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+DRIVERS = ("client", "wsgi", "asgi")
+SEARCH_QUERIES = ["chicken", "soup", "creamy mushroom", "coconut curry", "paprika", "garlicky tofu bowl"]
+
+# (method, path, query parameters, JSON body or None)
+Request = Tuple[str, str, Dict[str, str], Dict[str, Any] | None]
+
+
+@dataclass
+class Scenario:
+    name: str
+    # Builds the n-th request; called with a per-driver random generator.
+    build: Callable[[int, random.Random], Request]
+
+
+def size_label(recipes: int) -> str:
+    for factor, suffix in ((1_000_000, "m"), (1_000, "k")):
+        if recipes >= factor and recipes % factor == 0:
+            return f"{recipes // factor}{suffix}"
+    return str(recipes)
+
+
+def prepare_catalog(recipes: int, seed: int, catalog_dir: Path) -> Path:
+    """Return a fresh working copy of the cached catalog, building the cache first if needed."""
+
+    catalog_dir.mkdir(parents=True, exist_ok=True)
+    cached = catalog_dir / f"catalog-{recipes}-seed{seed}.sqlite3"
+    if not cached.exists():
+        started = time.perf_counter()
+        building = cached.with_suffix(".building")
+        building.unlink(missing_ok=True)
+        # Build in a child process so this one configures Django only once.
+        code = (
+            "from benchmarks.common import populate_catalog, setup_django;"
+            f"setup_django({str(building)!r});"
+            f"populate_catalog({recipes}, seed={seed}, batch_size=5000)"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True, cwd=Path(__file__).resolve().parent.parent)
+        with sqlite3.connect(building) as raw:
+            raw.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            raw.execute("PRAGMA journal_mode=DELETE")
+        building.rename(cached)
+        print(f"built {recipes}-recipe catalog in {time.perf_counter() - started:.0f}s ({cached})")
+    working = Path(tempfile.mkdtemp(prefix="flavorbuddy-bench-")) / "bench.sqlite3"
+    shutil.copyfile(cached, working)
+    return working
+
+
+def _paste(fields: Dict[str, Any], structured: bool, index: int) -> str:
+    if structured:
+        return "\n".join(
+            [f"{fields['title']} #{index}", "", "Ingredients:"]
+            + [f"- {line}" for line in fields["ingredients"]]
+            + ["", "Instructions:"]
+            + [f"{number}. {step}" for number, step in enumerate(fields["instructions"], 1)]
+        )
+    return f"Batch {index}: {fields['title']}. Use {', '.join(fields['ingredients'])}. " + " ".join(
+        fields["instructions"]
+    )
+
+
+def build_scenarios(stored_urls: List[str], seed: int) -> List[Scenario]:
+    fields_rng = random.Random(seed)
+    fields = [synthetic_recipe_fields(index, fields_rng) for index in range(50)]
+
+    def pasted(structured: bool):
+        def build(index, rng):
+            return "POST", "/convert-raw-recipe", {}, {"raw_text": _paste(rng.choice(fields), structured, index)}
+
+        return build
+
+    def listing(params):
+        return lambda index, rng: ("GET", "/get-recipes", params(rng), None)
+
+    def parse(url):
+        return lambda index, rng: ("GET", "/parse-recipe-url", {"url": url(rng)}, None)
+
+    return [
+        Scenario("get-recipes", listing(lambda rng: {"page": str(rng.randint(1, 50))})),
+        Scenario("get-recipes-cursor", listing(lambda rng: {"cursor": "", "page_size": "20"})),
+        Scenario("get-recipes-search", listing(lambda rng: {"q": rng.choice(SEARCH_QUERIES), "page_size": "20"})),
+        Scenario("get-recipes-summary", listing(lambda rng: {"view": "summary", "page_size": "100"})),
+        Scenario("parse-recipe-url-hit", parse(lambda rng: rng.choice(stored_urls))),
+        Scenario("parse-recipe-url-miss", parse(lambda rng: f"https://bench.test/miss/{rng.getrandbits(64):016x}")),
+        Scenario("convert-raw-recipe-local", pasted(structured=True)),
+        Scenario("convert-raw-recipe-model", pasted(structured=False)),
+    ]
+
+
+def _summarize(samples: List[float], elapsed: float, queries: List[int] | None = None) -> Dict[str, float]:
+    summary = {
+        "requests": len(samples),
+        "rps": round(len(samples) / elapsed, 1),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+    }
+    if queries is not None:
+        summary["queries"] = sorted(queries)[len(queries) // 2]
+    return summary
+
+
+def _check(status: int, body: bytes, request: Request) -> None:
+    if status != 200:
+        raise RuntimeError(f"{request[0]} {request[1]} {request[2]} returned {status}: {body[:200]!r}")
+
+
+def run_client(scenario: Scenario, count: int, seed: int) -> Dict[str, float]:
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    client = Client(HTTP_HOST="localhost")
+    rng = random.Random(seed)
+    samples, queries = [], []
+    started_all = time.perf_counter()
+    for index in range(count):
+        request = scenario.build(index, rng)
+        method, path, params, body = request
+        # The query log is a bounded deque; once full, CaptureQueriesContext counts nothing.
+        connection.queries_log.clear()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            if method == "GET":
+                response = client.get(path, params)
+            else:
+                response = client.post(path, json.dumps(body), content_type="application/json")
+            samples.append(time.perf_counter() - started)
+        _check(response.status_code, response.content, request)
+        queries.append(len(captured))
+    return _summarize(samples, time.perf_counter() - started_all, queries)
+
+
+def _encoded(body: Dict[str, Any] | None) -> Tuple[bytes, str]:
+    return (json.dumps(body).encode(), "application/json") if body is not None else (b"", "")
+
+
+def run_wsgi(scenario: Scenario, count: int, seed: int, concurrency: int) -> Dict[str, float]:
+    from config.wsgi import application
+
+    rng = random.Random(seed)
+    requests = [scenario.build(index, rng) for index in range(count)]
+
+    def one(request: Request) -> float:
+        method, path, params, body = request
+        started = time.perf_counter()
+        status, content = wsgi_request(application, method, path, params, *_encoded(body))
+        elapsed = time.perf_counter() - started
+        _check(status, content, request)
+        return elapsed
+
+    started_all = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(one, requests))
+    return _summarize(samples, time.perf_counter() - started_all)
+
+
+def run_asgi(scenario: Scenario, count: int, seed: int, concurrency: int) -> Dict[str, float]:
+    from config.asgi import application
+
+    rng = random.Random(seed)
+    requests = [scenario.build(index, rng) for index in range(count)]
+
+    async def drive():
+        limit = asyncio.Semaphore(concurrency)
+
+        async def one(request: Request) -> float:
+            method, path, params, body = request
+            async with limit:
+                started = time.perf_counter()
+                status, content = await asgi_request(application, method, path, params, *_encoded(body))
+                elapsed = time.perf_counter() - started
+            _check(status, content, request)
+            return elapsed
+
+        return await asyncio.gather(*(one(request) for request in requests))
+
+    started_all = time.perf_counter()
+    samples = asyncio.run(drive())
+    return _summarize(samples, time.perf_counter() - started_all)
+
+
+def machine() -> Dict[str, Any]:
+    """What the timings depend on, recorded with each baseline."""
+
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, Dict[str, float]]],
+    baseline: Dict[str, Any],
+    tolerance: float,
+    check_timings: bool = False,
+) -> List[str]:
+    """Regressions of `results` against `baseline`, one message each.
+
+    Timings are only compared when asked to and when the baseline was
+    measured on this machine.
+    """
+
+    check_timings = check_timings and baseline.get("machine") == machine()
+    regressions = []
+    for scenario, drivers in results.items():
+        for driver, current in drivers.items():
+            expected = baseline.get("results", {}).get(scenario, {}).get(driver)
+            if expected is None:
+                continue
+            label = f"{scenario} [{driver}]"
+            if check_timings and current["p95_ms"] > expected["p95_ms"] * (1 + tolerance):
+                regressions.append(f"{label}: p95 {current['p95_ms']:.2f}ms > baseline {expected['p95_ms']:.2f}ms")
+            if check_timings and current["rps"] < expected["rps"] * (1 - tolerance):
+                regressions.append(f"{label}: {current['rps']:.1f} req/s < baseline {expected['rps']:.1f} req/s")
+            if "queries" in expected and current.get("queries", 0) > expected["queries"]:
+                regressions.append(f"{label}: {current['queries']} SQL queries > baseline {expected['queries']}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=10_000, help="Catalog size, e.g. 10000, 100000, 1000000.")
+    parser.add_argument("--requests", type=int, default=300, help="Requests per scenario and driver.")
+    parser.add_argument("--concurrency", type=int, default=8, help="In-flight requests for the wsgi/asgi drivers.")
+    parser.add_argument("--drivers", default=",".join(DRIVERS), help="Comma-separated subset of client,wsgi,asgi.")
+    parser.add_argument("--scenarios", help="Comma-separated scenario names (default: all).")
+    parser.add_argument("--model-latency", type=float, default=0.0, help="Seconds per fake model call.")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--catalog-dir", type=Path, default=Path(tempfile.gettempdir()) / "flavorbuddy-bench-catalogs")
+    parser.add_argument("--baseline", type=Path, help="Baseline JSON (default: baselines/endpoints-<size>.json).")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed p95/throughput slowdown (0.5 = 50%%).")
+    parser.add_argument("--check-timings", action="store_true", help="Also fail on p95/throughput regressions.")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline.")
+    args = parser.parse_args()
+
+    drivers = [driver.strip() for driver in args.drivers.split(",") if driver.strip()]
+    unknown = sorted(set(drivers) - set(DRIVERS))
+    if unknown:
+        parser.error(f"unknown driver(s): {', '.join(unknown)}")
+    baseline_path = args.baseline or BASELINE_DIR / f"endpoints-{size_label(args.recipes)}.json"
+
+    database = prepare_catalog(args.recipes, args.seed, args.catalog_dir)
+    scratch = database.parent
+    setup_django(
+        database,
+        RECIPE_HTML_STORE_DIR=scratch / "html_store",
+        RECIPE_INGREDIENT_INDEX_SNAPSHOT=scratch / "ingredient_index.snapshot",
+        RECIPE_SCRAPE_SUPPORTED_ONLY=False,
+    )
+
+    from scrape_me.fetching import FetchedPage
+    from scrape_me.models import Recipe
+
+    sample_rng = random.Random(args.seed)
+    max_id = Recipe.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+    stored_urls = list(
+        Recipe.objects.filter(pk__in=[sample_rng.randint(1, max_id) for _ in range(1000)])
+        .exclude(source_url=None)
+        .values_list("source_url", flat=True)
+    )
+    scenarios = build_scenarios(stored_urls, args.seed)
+    if args.scenarios:
+        wanted = {name.strip() for name in args.scenarios.split(",")}
+        scenarios = [scenario for scenario in scenarios if scenario.name in wanted]
+
+    page_rng = random.Random(args.seed)
+
+    def stub_scrape(html, url):
+        fields = synthetic_recipe_fields(page_rng.randint(0, 10**9), page_rng)
+        return {**fields, "instructions": "\n".join(fields["instructions"]), "canonical_url": url}
+
+    def fake_model(source_url, raw_text, system_prompt):
+        if args.model_latency:
+            time.sleep(args.model_latency)
+        return {"title": raw_text.split(".", 1)[0], "ingredients": [], "instructions": []}
+
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    with patch("scrape_me.views.fetch_recipe_page", return_value=FetchedPage("<html></html>")), patch(
+        "scrape_me.views.scrape_recipe_html", stub_scrape
+    ), patch("scrape_me.views._run_recipe_struct_model", fake_model), patch(
+        "scrape_me.views.get_recipe_system_prompt", return_value="benchmark"
+    ):
+        for scenario in scenarios:
+            for driver in drivers:
+                seed = zlib.crc32(f"{args.seed}:{scenario.name}:{driver}".encode())
+                # Warm caches and connections outside the measurement.
+                run_client(scenario, min(10, args.requests), seed + 1)
+                if driver == "client":
+                    summary = run_client(scenario, args.requests, seed)
+                elif driver == "wsgi":
+                    summary = run_wsgi(scenario, args.requests, seed, args.concurrency)
+                else:
+                    summary = run_asgi(scenario, args.requests, seed, args.concurrency)
+                results.setdefault(scenario.name, {})[driver] = summary
+                queries = f"  {summary['queries']:>3} queries" if "queries" in summary else ""
+                print(
+                    f"{scenario.name:<26} {driver:<6} {summary['rps']:>8,.1f} req/s"
+                    f"  p50 {summary['p50_ms']:8.2f}ms  p95 {summary['p95_ms']:8.2f}ms"
+                    f"  p99 {summary['p99_ms']:8.2f}ms{queries}"
+                )
+
+    report = {
+        "recipes": args.recipes,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "machine": machine(),
+        "results": results,
+    }
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+        print(f"saved baseline {baseline_path}")
+        return
+    if not baseline_path.exists():
+        print(f"no baseline at {baseline_path}; run with --save-baseline to record one")
+        return
+
+    baseline = json.loads(baseline_path.read_text())
+    if args.check_timings and baseline.get("machine") != machine():
+        print(f"{baseline_path} was measured on another machine; checking SQL queries only")
+    regressions = compare(results, baseline, args.tolerance, args.check_timings)
+    if regressions:
+        print(f"{len(regressions)} regression(s) against {baseline_path}:")
+        for message in regressions:
+            print(f"  {message}")
+        raise SystemExit(1)
+    checked = f"timings within {args.tolerance:.0%}" if args.check_timings else "SQL queries only"
+    print(f"no regressions against {baseline_path} ({checked})")
+
+
+if __name__ == "__main__":
+    main()
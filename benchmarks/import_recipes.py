@@ -0,0 +1,56 @@
+"""Compare `import_recipes` batching with one `Recipe.objects.create` per row.
+
+Generates an NDJSON dump of synthetic recipes and loads it into fresh tables
+both ways, then re-imports it to time the upsert path::
+
+    python -m benchmarks.import_recipes --recipes 20000
+"""
+
+import argparse
+import json
+import random
+import time
+
+from .common import setup_django, synthetic_recipe_fields
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=20_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.db import transaction
+
+    from scrape_me.importing import import_recipe_lines, recipe_from_row
+    from scrape_me.models import Recipe
+
+    rng = random.Random(1234)
+    lines = [json.dumps(synthetic_recipe_fields(index, rng)) for index in range(args.recipes)]
+
+    started = time.perf_counter()
+    for line in lines:
+        # What a restore looks like without the command: save() and a commit per row.
+        with transaction.atomic():
+            recipe_from_row(json.loads(line)).save()
+    per_row = time.perf_counter() - started
+    Recipe.objects.all().delete()
+
+    started = time.perf_counter()
+    stats = import_recipe_lines(lines, batch_size=args.batch_size)
+    batched = time.perf_counter() - started
+    assert stats.created == args.recipes, stats
+
+    started = time.perf_counter()
+    stats = import_recipe_lines(lines, batch_size=args.batch_size)
+    upsert = time.perf_counter() - started
+    assert stats.updated == args.recipes, stats
+
+    for name, elapsed in (("per-row save", per_row), ("import (insert)", batched), ("import (upsert)", upsert)):
+        print(f"{name:<16} {elapsed:7.2f}s {args.recipes / elapsed:10,.0f} rows/s  {per_row / elapsed:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
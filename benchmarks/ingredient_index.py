@@ -0,0 +1,79 @@
+"""Time "cook with what I have" queries against the in-memory ingredient index.
+
+Fills the index straight from synthetic ingredient lists (no database rows,
+so a million recipes take seconds rather than an import), then times
+queries for random pantries, plus a snapshot save and load::
+
+    python -m benchmarks.ingredient_index --recipes 1000000 --queries 500
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from .common import percentile, setup_django
+
+# Pantry staples show up in most recipes; the long tail in few.
+_STAPLES = ["salt", "black pepper", "olive oil", "butter", "garlic", "onion", "sugar", "flour", "egg", "water"]
+
+
+def synthetic_names(rng: random.Random, vocabulary: int):
+    names = rng.sample(_STAPLES, rng.randint(1, 4))
+    names += [f"ingredient {int(rng.paretovariate(1.2)) % vocabulary}" for _ in range(rng.randint(3, 12))]
+    return names
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=1_000_000)
+    parser.add_argument("--vocabulary", type=int, default=5000, help="Distinct non-staple ingredients.")
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from scrape_me.ingredient_index import IngredientIndex
+
+    rng = random.Random(1234)
+    index = IngredientIndex()
+    started = time.perf_counter()
+    for recipe_id in range(1, args.recipes + 1):
+        index._set_recipe(recipe_id, synthetic_names(rng, args.vocabulary), bulk=True)
+    index._rebuild_totals()
+    index._loaded = True
+    index._synced_at = float("inf")  # nothing to sync with
+    print(f"built {args.recipes} recipes in {time.perf_counter() - started:.1f}s")
+
+    snapshot = Path(tempfile.mkdtemp(prefix="flavorbuddy-bench-")) / "ingredient_index.snapshot"
+    started = time.perf_counter()
+    index.save_snapshot(snapshot)
+    saved = time.perf_counter()
+    loaded = IngredientIndex()
+    loaded.load_snapshot(snapshot)
+    loaded._synced_at = float("inf")
+    print(
+        f"snapshot {snapshot.stat().st_size / 1e6:.0f}MB: save {saved - started:.2f}s,"
+        f" load {time.perf_counter() - saved:.2f}s"
+    )
+
+    pantries = [
+        rng.sample(_STAPLES, rng.randint(1, 5))
+        + [f"ingredient {int(rng.paretovariate(1.2)) % args.vocabulary}" for _ in range(rng.randint(1, 6))]
+        for _ in range(args.queries)
+    ]
+    for label in ("cold", "warm"):
+        samples = []
+        for pantry in pantries:
+            started = time.perf_counter()
+            loaded.search(pantry, limit=20)
+            samples.append(time.perf_counter() - started)
+        print(
+            f"{label} queries  p50 {percentile(samples, 50) * 1000:6.2f}ms"
+            f"  p95 {percentile(samples, 95) * 1000:6.2f}ms  p99 {percentile(samples, 99) * 1000:6.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
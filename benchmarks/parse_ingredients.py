@@ -0,0 +1,61 @@
+"""Measure ingredient parsing throughput in lines/sec.
+
+Times `parse_ingredient` alone over the ingredient lines of a synthetic
+catalog, then the `parse_ingredients` backfill (parse and write) with one
+process and with a process pool::
+
+    python -m benchmarks.parse_ingredients --recipes 20000 --workers 4
+"""
+
+import argparse
+import os
+import random
+import time
+
+from .common import populate_catalog, setup_django, synthetic_recipe_fields
+
+# Real-world shapes the synthetic catalog does not produce.
+EXTRA_LINES = [
+    "1 ½ cups all-purpose flour, sifted",
+    "2-3 garlic cloves, minced",
+    "1 (14 oz) can diced tomatoes, drained",
+    "a pinch of salt",
+    "Salt and freshly ground pepper to taste",
+    "3 to 4 Tbsp. olive oil (extra virgin)",
+    "½ tsp ground cumin",
+    "2 large eggs, at room temperature",
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from scrape_me.ingredients import backfill_ingredients, parse_ingredient
+    from scrape_me.models import RecipeIngredient
+
+    rng = random.Random(1234)
+    lines = [line for index in range(args.recipes) for line in synthetic_recipe_fields(index, rng)["ingredients"]]
+    lines += EXTRA_LINES * (len(lines) // (10 * len(EXTRA_LINES)))
+    started = time.perf_counter()
+    for line in lines:
+        parse_ingredient(line)
+    elapsed = time.perf_counter() - started
+    print(f"parse_ingredient        {len(lines) / elapsed:>10,.0f} lines/s  ({len(lines)} lines)")
+
+    populate_catalog(args.recipes)
+    for workers in sorted({1, args.workers}):
+        RecipeIngredient.objects.all().delete()
+        started = time.perf_counter()
+        stats = backfill_ingredients(workers=workers, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - started
+        print(f"backfill, {workers:>2} worker(s)  {stats.lines / elapsed:>10,.0f} lines/s  ({stats.lines} lines)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Measure how much convert-raw-recipe traffic the local parser answers without the model.
+
+Posts a corpus of synthetic pastes in several layouts (clean headings and
+bullets, markdown, numbered steps, free prose) to convert-raw-recipe, once
+with the local fast path and once with every request sent to a fake model
+that sleeps for `--model-latency` seconds::
+
+    python -m benchmarks.raw_text_parser --pastes 400 --model-latency 0.8
+"""
+
+import argparse
+import json
+import random
+import time
+from unittest.mock import patch
+
+from .common import percentile, setup_django, synthetic_recipe_fields
+
+
+def _bulleted(fields, rng):
+    return "\n".join(
+        [fields["title"], fields["description"], f"Serves {rng.randint(2, 6)}", "", "Ingredients:"]
+        + [f"- {line}" for line in fields["ingredients"]]
+        + ["", "Instructions:"]
+        + [f"{number}. {step}" for number, step in enumerate(fields["instructions"], 1)]
+    )
+
+
+def _markdown(fields, rng):
+    return "\n".join(
+        [f"# {fields['title']}", f"Total time: {fields['total_time']} minutes", "", "## Ingredients"]
+        + [f"* {line}" for line in fields["ingredients"]]
+        + ["", "## Directions"]
+        + [f"* {step}" for step in fields["instructions"]]
+    )
+
+
+def _plain_lines(fields, rng):
+    return "\n".join(
+        [fields["title"], "", "INGREDIENTS"] + fields["ingredients"] + ["", "METHOD"] + fields["instructions"]
+    )
+
+
+def _prose(fields, rng):
+    return (
+        f"{fields['title']}. My grandmother used {', '.join(fields['ingredients'][:4])} and more. "
+        + " ".join(fields["instructions"])
+    )
+
+
+def _no_headings(fields, rng):
+    return "\n".join([fields["title"]] + fields["ingredients"] + fields["instructions"])
+
+
+# (layout, share of the corpus)
+LAYOUTS = [(_bulleted, 0.3), (_markdown, 0.15), (_plain_lines, 0.15), (_prose, 0.25), (_no_headings, 0.15)]
+
+
+def build_corpus(count: int, seed: int = 1234):
+    rng = random.Random(seed)
+    layouts, weights = zip(*LAYOUTS)
+    return [rng.choices(layouts, weights)[0](synthetic_recipe_fields(index, rng), rng) for index in range(count)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pastes", type=int, default=400)
+    parser.add_argument("--model-latency", type=float, default=0.8, help="Seconds per fake model call.")
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.test import Client, override_settings
+
+    corpus = build_corpus(args.pastes)
+    client = Client(HTTP_HOST="localhost")
+    model_calls = 0
+
+    def fake_model(source_url, raw_text):
+        nonlocal model_calls
+        model_calls += 1
+        time.sleep(args.model_latency)
+        return {"title": raw_text.split("\n", 1)[0], "ingredients": [], "instructions": []}
+
+    def run(min_confidence):
+        nonlocal model_calls
+        model_calls = 0
+        samples = []
+        with override_settings(RECIPE_LOCAL_PARSE_MIN_CONFIDENCE=min_confidence), patch(
+            "scrape_me.views._invoke_recipe_struct_model", fake_model
+        ):
+            for raw_text in corpus:
+                started = time.perf_counter()
+                response = client.post(
+                    "/convert-raw-recipe", data=json.dumps({"raw_text": raw_text}), content_type="application/json"
+                )
+                samples.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.content
+        return samples, model_calls
+
+    from django.conf import settings
+
+    for name, min_confidence in (
+        ("model only", 1.1),
+        ("local fast path", settings.RECIPE_LOCAL_PARSE_MIN_CONFIDENCE),
+    ):
+        samples, calls = run(min_confidence)
+        local_share = 1 - calls / len(corpus)
+        print(
+            f"{name:<16} answered locally {local_share:6.1%}"
+            f"  p50 {percentile(samples, 50) * 1000:8.2f}ms  p95 {percentile(samples, 95) * 1000:8.2f}ms"
+            f"  total {sum(samples):7.1f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Micro-benchmark the pre-rendered recipe JSON cache against plain JsonResponse encoding.
+
+Times building a get-recipes sized page of responses both ways, with the
+render cache warm::
+
+    python -m benchmarks.render_cache --page-size 20 --repeats 2000
+"""
+
+import argparse
+import time
+
+from .common import percentile, populate_catalog, setup_django
+
+
+def time_calls(fn, repeats: int):
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_django()
+    populate_catalog(args.page_size)
+
+    from django.http import HttpResponse, JsonResponse
+
+    from scrape_me.models import Recipe
+    from scrape_me.render_cache import render_cache
+    from scrape_me.serializers import encode_json_array, encode_json_object, serialize_recipe
+
+    recipes = list(Recipe.objects.all()[: args.page_size])
+    pagination = {"page": 1, "page_size": args.page_size, "total_pages": 1, "total_items": len(recipes)}
+
+    def plain():
+        return JsonResponse({"query": "", "results": [serialize_recipe(r) for r in recipes], "pagination": pagination})
+
+    def cached():
+        results = encode_json_array(render_cache.render_many(recipes))
+        body = encode_json_object({"query": "", "results": recipes, "pagination": pagination}, {"results": results})
+        return HttpResponse(body, content_type="application/json")
+
+    assert plain().content == cached().content
+    for name, fn in (("JsonResponse", plain), ("render cache", cached)):
+        samples = time_calls(fn, args.repeats)
+        print(
+            f"{name:<14} p50 {percentile(samples, 50) * 1e6:8.1f}us"
+            f"  p95 {percentile(samples, 95) * 1e6:8.1f}us  ({args.page_size} recipes/page)"
+        )
+    print(f"cache holds {render_cache.size} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Compare get-recipes search through the FTS5 index with the title__icontains scan.
+
+Builds a synthetic catalog and times the full get-recipes request (count plus
+first page) for a set of queries under each search backend::
+
+    python -m benchmarks.search_fts --recipes 100000
+"""
+
+import argparse
+import json
+import time
+
+from .common import percentile, populate_catalog, setup_django
+
+QUERIES = ["chicken", "soup", "creamy mushroom", "chick", "coconut curry", "garlicky tofu bowl", "paprika"]
+
+
+def time_backend(backend: str, repeats: int):
+    from django.test import RequestFactory, override_settings
+
+    from scrape_me.views import get_recipes
+
+    factory = RequestFactory()
+    timings = {}
+    matches = {}
+    with override_settings(RECIPE_SEARCH_BACKEND=backend):
+        for query in QUERIES:
+            samples = []
+            for _ in range(repeats):
+                request = factory.get("/get-recipes", {"q": query, "page_size": 20})
+                started = time.perf_counter()
+                response = get_recipes(request)
+                samples.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.content
+            timings[query] = samples
+            matches[query] = json.loads(response.content)["pagination"]["total_items"]
+    return timings, matches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    started = time.perf_counter()
+    populate_catalog(args.recipes)
+    print(f"populated {args.recipes} recipes (FTS indexed by triggers) in {time.perf_counter() - started:.1f}s")
+
+    results = {backend: time_backend(backend, args.repeats) for backend in ("icontains", "fts")}
+    # icontains only looks at titles, so FTS usually matches (and ranks) more rows.
+    print(f"{'query':<22} {'icontains p50':>14} {'hits':>7} {'fts p50':>10} {'hits':>7} {'speedup':>8}")
+    for query in QUERIES:
+        slow = percentile(results["icontains"][0][query], 50)
+        fast = percentile(results["fts"][0][query], 50)
+        print(
+            f"{query:<22} {slow * 1000:12.1f}ms {results['icontains'][1][query]:>7}"
+            f" {fast * 1000:8.1f}ms {results['fts'][1][query]:>7} {slow / fast:7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
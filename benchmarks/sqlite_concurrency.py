@@ -0,0 +1,165 @@
+"""Compare SQLite's default settings with the tuned profile under concurrent readers and writers.
+
+Forks `--readers` processes that run listing queries (newest first, one
+type in id order, most viewed, one recipe by id) and `--writers` processes
+that flush view counts and insert recipes, all against one database file,
+for `--seconds` per profile. Every operation is followed by Django's
+request-boundary connection handling, so CONN_MAX_AGE applies as it would
+to real requests::
+
+    python -m benchmarks.sqlite_concurrency --recipes 50000 --readers 4 --writers 2 --seconds 10
+"""
+
+import argparse
+import multiprocessing
+import random
+import sqlite3
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from .common import percentile, populate_catalog, setup_django
+
+PAGE_SIZE = 20
+
+
+def _reader(stop_at: float, max_id: int, seed: int):
+    from django.db import close_old_connections
+
+    from scrape_me.models import Recipe, RecipeType
+
+    rng = random.Random(seed)
+    queries = [
+        lambda: list(Recipe.objects.order_by("-created_at", "-id")[:PAGE_SIZE]),
+        lambda: list(Recipe.objects.filter(type=rng.choice(RecipeType.values)).order_by("id")[:PAGE_SIZE]),
+        lambda: list(Recipe.objects.order_by("-views", "-id")[:PAGE_SIZE]),
+        lambda: Recipe.objects.filter(pk=rng.randint(1, max_id)).first(),
+    ]
+    while time.perf_counter() < stop_at:
+        yield rng.choice(queries)
+        close_old_connections()
+
+
+def _writer(stop_at: float, max_id: int, seed: int):
+    from django.db import close_old_connections, transaction
+    from django.db.models import F
+
+    from scrape_me.models import Recipe
+
+    from .common import synthetic_recipe_fields
+
+    rng = random.Random(seed)
+
+    def flush_views():
+        # Shaped like a view_counts flush: one transaction, a handful of rows.
+        with transaction.atomic():
+            for recipe_id in rng.sample(range(1, max_id + 1), 10):
+                Recipe.objects.filter(pk=recipe_id).update(views=F("views") + rng.randint(1, 5))
+
+    def insert():
+        fields = synthetic_recipe_fields(rng.randint(0, 10**9), rng)
+        fields["source_url"] = f"{fields['source_url']}-{uuid.uuid4().hex}"
+        Recipe.objects.create(**fields)
+
+    while time.perf_counter() < stop_at:
+        yield rng.choice([flush_views, flush_views, insert])
+        close_old_connections()
+
+
+def _run_worker(role, stop_at, max_id, seed, results):
+    from django.db import OperationalError
+
+    operations = (_reader if role == "read" else _writer)(stop_at, max_id, seed)
+    samples, errors = [], 0
+    try:
+        for operation in operations:
+            started = time.perf_counter()
+            try:
+                operation()
+            except OperationalError:  # "database is locked"
+                errors += 1
+                continue
+            samples.append(time.perf_counter() - started)
+    finally:
+        results.put((role, samples, errors))
+
+
+def _apply_profile(profile: str, tuned: dict, database: Path) -> None:
+    from django.conf import settings
+    from django.db import connections
+
+    connections["default"].close()
+    default = settings.DATABASES["default"]
+    if profile == "tuned":
+        default.update(tuned)
+        journal_mode = "WAL"
+    else:
+        default.update(CONN_MAX_AGE=0, CONN_HEALTH_CHECKS=False, OPTIONS={})
+        journal_mode = "DELETE"
+    # The connection object read its options when it was built; rebuild it.
+    del connections["default"]
+    with sqlite3.connect(database) as raw:
+        raw.execute(f"PRAGMA journal_mode={journal_mode}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=50_000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    database = Path(tempfile.mkdtemp(prefix="flavorbuddy-bench-")) / "bench.sqlite3"
+    setup_django(database)
+    populate_catalog(args.recipes)
+
+    from django.conf import settings
+    from django.db import connection
+
+    from scrape_me.models import Recipe
+
+    default = settings.DATABASES["default"]
+    tuned = {key: default[key] for key in ("CONN_MAX_AGE", "CONN_HEALTH_CHECKS", "OPTIONS") if key in default}
+    if not tuned.get("OPTIONS"):
+        raise SystemExit("Run with SQLITE_PROFILE=tuned (the default) to compare against the tuned profile.")
+
+    for label, queryset in (
+        ("newest first", Recipe.objects.order_by("-created_at", "-id")[:PAGE_SIZE]),
+        ("one type", Recipe.objects.filter(type="url").order_by("id")[:PAGE_SIZE]),
+        ("most viewed", Recipe.objects.order_by("-views", "-id")[:PAGE_SIZE]),
+    ):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            print(f"{label:<13} {'; '.join(row[-1] for row in cursor.fetchall())}")
+
+    max_id = Recipe.objects.order_by("-pk").values_list("pk", flat=True).first()
+    context = multiprocessing.get_context("fork")
+    for profile in ("default", "tuned"):
+        _apply_profile(profile, tuned, database)
+        results = context.Queue()
+        stop_at = time.perf_counter() + args.seconds
+        workers = [
+            context.Process(target=_run_worker, args=(role, stop_at, max_id, seed, results))
+            for seed, role in enumerate(["read"] * args.readers + ["write"] * args.writers)
+        ]
+        for worker in workers:
+            worker.start()
+        collected = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+
+        for role in ("read", "write"):
+            samples = [sample for kind, worker_samples, _ in collected if kind == role for sample in worker_samples]
+            errors = sum(worker_errors for kind, _, worker_errors in collected if kind == role)
+            print(
+                f"{profile:<8} {role:<5} {len(samples) / args.seconds:>9,.0f} ops/s"
+                f"  p50 {percentile(samples, 50) * 1000:7.2f}ms  p95 {percentile(samples, 95) * 1000:7.2f}ms"
+                f"  p99 {percentile(samples, 99) * 1000:7.2f}ms  locked {errors}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -66,6 +66,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'scrape_me.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -98,12 +99,41 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+#
+# SQLITE_PROFILE=tuned (the default) applies the pragmas below on every new
+# connection: WAL lets readers run alongside the single writer, NORMAL
+# synchronous is durable under WAL except on power loss, and mmap / page
+# cache keep hot pages out of read() calls. Writers wait up to
+# SQLITE_BUSY_TIMEOUT seconds for the lock, and transactions take it up front
+# (IMMEDIATE) so two writers never deadlock upgrading a read lock.
+# SQLITE_PROFILE=default keeps SQLite's own settings.
+
+SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE', 'tuned')
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+    # Negative values are KiB rather than pages.
+    'cache_size': -int(os.environ.get('SQLITE_CACHE_SIZE_KB', str(64 * 1024))),
+    'temp_store': 'MEMORY',
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
     }
 }
+if SQLITE_PROFILE == 'tuned':
+    DATABASES['default'].update(
+        CONN_MAX_AGE=int(os.environ.get('DATABASE_CONN_MAX_AGE', '600')),
+        CONN_HEALTH_CHECKS=True,
+        OPTIONS={
+            'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()),
+            'timeout': float(os.environ.get('SQLITE_BUSY_TIMEOUT', '20')),
+            'transaction_mode': 'IMMEDIATE',
+        },
+    )
 
 
 # Password validation
@@ -137,6 +167,24 @@ USE_I18N = True
 USE_TZ = True
 
 
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # convert-raw-recipe model results (scrape_me/model_cache.py); kept in the
+    # database so they survive restarts and are shared between workers.
+    'model_results': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'scrape_me_model_result_cache',
+        'TIMEOUT': int(os.environ.get('RECIPE_MODEL_CACHE_TTL', str(30 * 24 * 60 * 60))),
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('RECIPE_MODEL_CACHE_MAX_ENTRIES', '5000'))},
+    },
+}
+
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
@@ -146,3 +194,118 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Recipe scraping
+
+# Seconds to wait for a recipe site before giving up on a fetch.
+RECIPE_FETCH_TIMEOUT = float(os.environ.get("RECIPE_FETCH_TIMEOUT", "15"))
+
+# Upper bound on simultaneous outbound connections per async worker.
+RECIPE_FETCH_MAX_CONNECTIONS = int(os.environ.get("RECIPE_FETCH_MAX_CONNECTIONS", "200"))
+
+# Passed to recipe_scrapers' `supported_only`; None keeps the library default.
+RECIPE_SCRAPE_SUPPORTED_ONLY = None
+
+# How long a worker may hold the cross-process claim on scraping one URL, and
+# how often other workers check whether it has finished.
+RECIPE_SCRAPE_LEASE_SECONDS = float(os.environ.get("RECIPE_SCRAPE_LEASE_SECONDS", "60"))
+RECIPE_SCRAPE_LEASE_POLL_INTERVAL = 0.25
+
+# Bulk ingestion (ingest-recipe-urls endpoint and `manage.py ingest_recipe_urls`).
+RECIPE_INGEST_CONCURRENCY = int(os.environ.get("RECIPE_INGEST_CONCURRENCY", "32"))
+RECIPE_INGEST_PER_HOST = int(os.environ.get("RECIPE_INGEST_PER_HOST", "4"))
+RECIPE_INGEST_CHUNK_SIZE = 200
+RECIPE_INGEST_MAX_URLS = 5000
+
+# Failed scrapes are answered from the failure cache (see
+# scrape_me/failure_cache.py) for a TTL that doubles with each repeat failure,
+# from BASE_TTL up to MAX_TTL seconds, keeping at most MAX_ENTRIES failures
+# (least recently used evicted first). Errors named in DOMAIN_ERRORS also
+# block every URL on the failing domain.
+RECIPE_FAILURE_CACHE_BASE_TTL = int(os.environ.get("RECIPE_FAILURE_CACHE_BASE_TTL", "60"))
+RECIPE_FAILURE_CACHE_MAX_TTL = int(os.environ.get("RECIPE_FAILURE_CACHE_MAX_TTL", "86400"))
+RECIPE_FAILURE_CACHE_MAX_ENTRIES = int(os.environ.get("RECIPE_FAILURE_CACHE_MAX_ENTRIES", "10000"))
+RECIPE_FAILURE_CACHE_DOMAIN_ERRORS = ("WebsiteNotImplementedError",)
+
+# "fts" searches get-recipes `q` through the SQLite FTS5 index (see
+# scrape_me/search.py); "icontains" keeps the plain title substring match.
+RECIPE_SEARCH_BACKEND = os.environ.get("RECIPE_SEARCH_BACKEND", "fts")
+
+# Seconds that filtered get-recipes / admin result counts are cached.
+RECIPE_COUNT_CACHE_TTL = int(os.environ.get("RECIPE_COUNT_CACHE_TTL", "30"))
+
+# Recipe views are buffered in memory and written every N views or N seconds,
+# whichever comes first (see scrape_me/view_counts.py).
+RECIPE_VIEW_FLUSH_THRESHOLD = int(os.environ.get("RECIPE_VIEW_FLUSH_THRESHOLD", "100"))
+RECIPE_VIEW_FLUSH_INTERVAL = float(os.environ.get("RECIPE_VIEW_FLUSH_INTERVAL", "10"))
+
+# Model result cache hits and misses are tallied in memory and added to their
+# TableCounter rows every N seconds (see scrape_me/model_cache.py).
+RECIPE_MODEL_CACHE_STATS_FLUSH_INTERVAL = float(os.environ.get("RECIPE_MODEL_CACHE_STATS_FLUSH_INTERVAL", "60"))
+
+# Memory budget for pre-rendered recipe JSON (see scrape_me/render_cache.py).
+RECIPE_RENDER_CACHE_MAX_BYTES = int(os.environ.get("RECIPE_RENDER_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# Rows fetched per database round trip by the NDJSON export.
+RECIPE_EXPORT_CHUNK_SIZE = int(os.environ.get("RECIPE_EXPORT_CHUNK_SIZE", "2000"))
+
+# Rows per transaction for `manage.py import_recipes`.
+RECIPE_IMPORT_BATCH_SIZE = int(os.environ.get("RECIPE_IMPORT_BATCH_SIZE", "1000"))
+
+# Fetched recipe pages are archived here, compressed with "gzip" or "zstd"
+# (needs the optional zstandard package), so they can be re-parsed offline.
+RECIPE_HTML_STORE_DIR = Path(os.environ.get("RECIPE_HTML_STORE_DIR", str(BASE_DIR / "html_store")))
+RECIPE_HTML_STORE_COMPRESSION = os.environ.get("RECIPE_HTML_STORE_COMPRESSION", "gzip")
+
+# Stored recipes are revalidated against their origin (conditional GET) once
+# they have not been checked for this many seconds.
+RECIPE_REFRESH_AFTER = int(os.environ.get("RECIPE_REFRESH_AFTER", str(24 * 60 * 60)))
+
+# Background refresh queue (`manage.py run_refresh_worker`): stale recipes are
+# served as stored and refreshed later. Workers wait DOMAIN_INTERVAL seconds
+# between requests to one domain, hold a job for up to LEASE_SECONDS, and
+# retry failures after BASE, 2*BASE, ... up to MAX seconds, MAX_ATTEMPTS times.
+RECIPE_REFRESH_DOMAIN_INTERVAL = float(os.environ.get("RECIPE_REFRESH_DOMAIN_INTERVAL", "2"))
+RECIPE_REFRESH_LEASE_SECONDS = float(os.environ.get("RECIPE_REFRESH_LEASE_SECONDS", "120"))
+RECIPE_REFRESH_RETRY_BASE = int(os.environ.get("RECIPE_REFRESH_RETRY_BASE", "60"))
+RECIPE_REFRESH_RETRY_MAX = int(os.environ.get("RECIPE_REFRESH_RETRY_MAX", "3600"))
+RECIPE_REFRESH_MAX_ATTEMPTS = int(os.environ.get("RECIPE_REFRESH_MAX_ATTEMPTS", "5"))
+RECIPE_REFRESH_POLL_INTERVAL = 1.0
+
+# Replicate model used by convert-raw-recipe.
+RECIPE_STRUCT_MODEL = os.environ.get("RECIPE_STRUCT_MODEL", "openai/gpt-5-nano")
+
+# convert-raw-recipe?async=true: model calls run at once, and jobs allowed to
+# wait for a slot before new ones are refused with 503.
+RECIPE_CONVERT_CONCURRENCY = int(os.environ.get("RECIPE_CONVERT_CONCURRENCY", "4"))
+RECIPE_CONVERT_QUEUE_DEPTH = int(os.environ.get("RECIPE_CONVERT_QUEUE_DEPTH", "32"))
+
+# convert-raw-recipe answers without the model when the local parser (see
+# scrape_me/raw_text_parser.py) scores the text at least this confident;
+# anything above 1 always uses the model.
+RECIPE_LOCAL_PARSE_MIN_CONFIDENCE = float(os.environ.get("RECIPE_LOCAL_PARSE_MIN_CONFIDENCE", "0.8"))
+
+# "Cook with what I have" index (see scrape_me/ingredient_index.py): loaded
+# from this snapshot (`manage.py build_ingredient_index`) on first use, then
+# synced with ingredient rows written by other processes every N seconds.
+RECIPE_INGREDIENT_INDEX_SNAPSHOT = Path(
+    os.environ.get("RECIPE_INGREDIENT_INDEX_SNAPSHOT", str(BASE_DIR / "ingredient_index.snapshot"))
+)
+RECIPE_INGREDIENT_INDEX_SYNC_INTERVAL = float(os.environ.get("RECIPE_INGREDIENT_INDEX_SYNC_INTERVAL", "5"))
+
+# Estimated content similarity (0..1, MinHash over ingredients and
+# instructions) at which a newly stored recipe is linked to an existing one
+# as a near-duplicate (see scrape_me/duplicates.py).
+RECIPE_DUPLICATE_THRESHOLD = float(os.environ.get("RECIPE_DUPLICATE_THRESHOLD", "0.8"))
+
+# Per-domain overrides of the recipe URL canonicalization rules (see
+# scrape_me/canonical_urls.py), keyed by domain, e.g.
+# {"example.com": {"keep_params": ["id"], "strip_subdomains": ["www.", "m."]}}.
+RECIPE_URL_DOMAIN_RULES = {}
+
+# Request metrics served at /metrics (see scrape_me/metrics.py). With several
+# worker processes, point METRICS_DIR at a directory they share (emptied on
+# deploy); each process writes its totals there every FLUSH_INTERVAL seconds.
+METRICS_DIR = os.environ.get("METRICS_DIR") or None
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", "5"))
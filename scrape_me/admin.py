@@ -1,10 +1,14 @@
 from django.contrib import admin
 
+from .counting import RecipePaginator
 from .models import Recipe
 
 
 @admin.register(Recipe)
 class RecipeAdmin(admin.ModelAdmin):
-    list_display = ("title", "source_url", "created_at", "updated_at")
+    list_display = ("title", "source_url", "type", "views", "created_at", "updated_at")
     search_fields = ("title", "source_url", "author")
-    list_filter = ("created_at",)
+    list_filter = ("created_at", "type")
+    paginator = RecipePaginator
+    # Avoid a second unfiltered COUNT(*) on filtered changelists.
+    show_full_result_count = False
@@ -1,6 +1,29 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
 
 
 class ScrapeMeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'scrape_me'
+
+    def ready(self):
+        from .metrics import install_query_recorder
+        from .models import Recipe
+        from .signals import (
+            create_cache_tables,
+            install_database_triggers,
+            invalidate_rendered_recipe,
+            note_ingredient_changes,
+            reindex_recipe_ingredients,
+            unindex_recipe_ingredients,
+        )
+
+        connection_created.connect(install_query_recorder)
+        post_migrate.connect(install_database_triggers, sender=self)
+        post_migrate.connect(create_cache_tables, sender=self)
+        post_save.connect(invalidate_rendered_recipe, sender=Recipe)
+        pre_save.connect(note_ingredient_changes, sender=Recipe)
+        post_save.connect(reindex_recipe_ingredients, sender=Recipe)
+        post_delete.connect(invalidate_rendered_recipe, sender=Recipe)
+        post_delete.connect(unindex_recipe_ingredients, sender=Recipe)
@@ -0,0 +1,58 @@
+"""Keyset-paginated batches of recipe rows, optionally mapped in a process pool.
+
+The bulk commands (ingredient backfill, reparse, fingerprinting, URL
+canonicalization) walk whole tables. They read rows in primary-key order
+with `pk > last seen` instead of OFFSET, so every batch is one indexed range
+scan however deep into the table it is.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterator, List, Tuple, TypeVar
+
+from django.db.models import QuerySet
+
+T = TypeVar("T")
+
+
+def keyset_batches(queryset: QuerySet, fields: Tuple[str, ...], batch_size: int) -> Iterator[List[tuple]]:
+    """Yield `(pk, *fields)` tuples of `queryset` in pk order, `batch_size` rows at a time."""
+
+    queryset = queryset.order_by("pk")
+    last_id = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_id).values_list("pk", *fields)[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1][0]
+
+
+def map_batches(
+    func: Callable[[tuple], T],
+    queryset: QuerySet,
+    fields: Tuple[str, ...],
+    *,
+    batch_size: int,
+    workers: int | None = None,
+    initializer: Callable[..., Any] | None = None,
+    initargs: tuple = (),
+) -> Iterator[List[T]]:
+    """Yield `func` applied to every row of each `keyset_batches` batch, one list per batch.
+
+    `workers` defaults to one process per CPU; with `workers=1` rows are
+    mapped in this process and `initializer` is not called. `func` must not
+    touch the database.
+    """
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for batch in keyset_batches(queryset, fields, batch_size):
+            yield [func(row) for row in batch]
+        return
+
+    # Each batch is fetched in full, so no cursor is open when workers fork.
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        chunksize = max(1, batch_size // (workers * 4))
+        for batch in keyset_batches(queryset, fields, batch_size):
+            yield list(pool.map(func, batch, chunksize=chunksize))
@@ -0,0 +1,121 @@
+"""In-memory counters that are written to the database in batches.
+
+Hot paths (recipe views, model cache hits) count in memory instead of
+writing a row per event. A subclass names the settings that control its
+flushes and implements `write`, which applies one batch of counts.
+"""
+
+import atexit
+import logging
+import threading
+from collections import Counter
+from typing import Hashable, TypeVar
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+B = TypeVar("B", bound="BufferedCounts")
+
+
+class BufferedCounts:
+    """Accumulate counts per key in memory and write them in batches.
+
+    A flush happens `interval_setting` seconds after the first pending count,
+    once `threshold_setting` counts are pending (when a threshold is set),
+    and at interpreter exit for buffers passed to `flush_on_exit`. Each flush
+    swaps the pending counts out under the lock and writes them in one
+    transaction; if that transaction fails the counts are put back, so counts
+    can be lost on a hard crash (at most one batch) but are never written
+    twice.
+    """
+
+    interval_setting: str
+    threshold_setting: str | None = None
+    # Names what is counted in log messages.
+    description = "counts"
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pending: Counter = Counter()
+        self._hits = 0
+        self._timer: threading.Timer | None = None
+
+    def record(self, key: Hashable) -> int:
+        """Count one event; returns this key's counts not yet written before this call."""
+
+        with self._lock:
+            self._pending[key] += 1
+            self._hits += 1
+            pending = self._pending[key]
+            flush_now = self.threshold_setting is not None and self._hits >= getattr(settings, self.threshold_setting)
+            interval = getattr(settings, self.interval_setting)
+            if not flush_now and self._timer is None and interval:
+                self._timer = threading.Timer(interval, self._timed_flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if flush_now:
+            self.flush()
+        return pending
+
+    def pending(self, key: Hashable) -> int:
+        with self._lock:
+            return self._pending.get(key, 0)
+
+    def _take_batch(self) -> Counter:
+        with self._lock:
+            batch, self._pending, self._hits = self._pending, Counter(), 0
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            return batch
+
+    def write(self, batch: Counter) -> None:
+        """Apply one batch of counts; runs inside a transaction."""
+
+        raise NotImplementedError
+
+    def flush(self) -> int:
+        """Write all pending counts; returns how many were written."""
+
+        batch = self._take_batch()
+        if not batch:
+            return 0
+        try:
+            with transaction.atomic():
+                self.write(batch)
+        except DatabaseError:
+            # Nothing was committed, so it is safe to retry with the next flush.
+            logger.exception("Failed to flush %d %s; will retry.", sum(batch.values()), self.description)
+            with self._lock:
+                self._pending.update(batch)
+                self._hits += sum(batch.values())
+            return 0
+        return sum(batch.values())
+
+    def _timed_flush(self) -> None:
+        try:
+            self.flush()
+        finally:
+            # Timer threads get their own connections; don't leak them.
+            connections.close_all()
+
+    def discard(self) -> None:
+        """Drop pending counts without writing them (used by tests)."""
+
+        self._take_batch()
+
+
+def flush_on_exit(buffer: B) -> B:
+    """Register `buffer` to be flushed at interpreter exit; returns it."""
+
+    def flush() -> None:  # pragma: no cover - process shutdown
+        try:
+            buffer.flush()
+        except Exception:
+            logger.exception("Failed to flush %s at exit.", buffer.description)
+
+    atexit.register(flush)
+    return buffer
@@ -0,0 +1,359 @@
+"""Canonical recipe URLs and the alias table.
+
+Many URLs load the same recipe page: http and https, upper-case hosts,
+`www.`, tracking parameters (`utm_*`, `fbclid`, ...), fragments, and AMP or
+print variants. `canonicalize_recipe_url` maps all of them to one form, which
+is what `Recipe.source_url` stores and what lookups and scrape leases key on.
+Rules are the `DEFAULT_RULE` plus per-domain overrides from `DOMAIN_RULES`
+and the `RECIPE_URL_DOMAIN_RULES` setting, matched on the host or any parent
+domain.
+
+Variants the rules cannot tie together, such as a page whose
+`<link rel="canonical">` names a different URL, are recorded as
+`RecipeAlias` rows. `find_recipe` resolves a canonical URL against both
+`source_url` and the aliases in one query, each side served by a unique index.
+"""
+
+import ipaddress
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q, QuerySet
+
+from .batching import keyset_batches
+from .models import ConvertJob, Recipe, RecipeAlias
+
+# Query parameters that never identify a recipe: ad, analytics and share-link
+# tracking, plus the switches to AMP and print views.
+TRACKING_PARAMS = frozenset(
+    {
+        "fbclid", "gclid", "gclsrc", "dclid", "msclkid", "yclid", "twclid", "ttclid", "igshid", "li_fat_id",
+        "mc_cid", "mc_eid", "_ga", "_gl", "_hsenc", "_hsmi", "mkt_tok", "ref", "ref_src", "ref_url",
+        "cmpid", "s_cid", "pk_campaign", "pk_kwd", "pk_source", "amp", "print", "printview",
+    }
+)
+TRACKING_PREFIXES = ("utm_", "hsa_")
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Path forms of AMP and print variants: "/amp", "/print" and "/print/123"
+# segments at the end, an "/amp/" prefix, and "recipe.amp.html".
+_VARIANT_SUFFIX = re.compile(r"/(?:amp|print(?:/\d+)?)/*$", re.IGNORECASE)
+_AMP_PREFIX = re.compile(r"^/amp(?=/)", re.IGNORECASE)
+_AMP_EXTENSION = re.compile(r"\.amp(?=\.html?$)", re.IGNORECASE)
+_SLASHES = re.compile(r"/{2,}")
+
+
+@dataclass(frozen=True)
+class DomainRule:
+    """How URLs on one domain are canonicalized."""
+
+    # Serve the canonical URL over https (never for IP addresses and localhost).
+    https: bool = True
+    # Host prefixes removed when more than a registrable domain remains.
+    strip_subdomains: Tuple[str, ...] = ("www.",)
+    # Query parameters to keep; None keeps everything except tracking ones.
+    keep_params: FrozenSet[str] | None = None
+    # Extra parameters to drop on top of TRACKING_PARAMS.
+    drop_params: FrozenSet[str] = frozenset()
+    # (pattern, replacement) pairs applied to the path in order.
+    path_rewrites: Tuple[Tuple[str, str], ...] = ()
+    _compiled: Tuple[Tuple[re.Pattern, str], ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        compiled = tuple((re.compile(pattern), replacement) for pattern, replacement in self.path_rewrites)
+        object.__setattr__(self, "_compiled", compiled)
+
+
+DEFAULT_RULE = DomainRule()
+
+# Sites whose recipe pages are identified by their path alone, so any query
+# string is noise; mobile hosts of sites that serve the same page on both.
+DOMAIN_RULES: Dict[str, DomainRule] = {
+    "allrecipes.com": DomainRule(keep_params=frozenset(), strip_subdomains=("www.", "m.")),
+    "bbcgoodfood.com": DomainRule(keep_params=frozenset()),
+    "budgetbytes.com": DomainRule(keep_params=frozenset()),
+    "cooking.nytimes.com": DomainRule(keep_params=frozenset()),
+    "epicurious.com": DomainRule(keep_params=frozenset()),
+    "food.com": DomainRule(keep_params=frozenset(), strip_subdomains=("www.", "m.")),
+    "foodnetwork.com": DomainRule(keep_params=frozenset()),
+    "seriouseats.com": DomainRule(keep_params=frozenset()),
+    "simplyrecipes.com": DomainRule(keep_params=frozenset()),
+}
+
+
+def domain_rule(host: str) -> DomainRule:
+    """The rule for `host`: the most specific of its domain and parent domains, else the default."""
+
+    overrides = settings.RECIPE_URL_DOMAIN_RULES
+    labels = host.split(".")
+    for start in range(len(labels) - 1):
+        domain = ".".join(labels[start:])
+        if domain in overrides:
+            return replace(DOMAIN_RULES.get(domain, DEFAULT_RULE), **overrides[domain])
+        if domain in DOMAIN_RULES:
+            return DOMAIN_RULES[domain]
+    return DEFAULT_RULE
+
+
+def _is_local(host: str) -> bool:
+    if host == "localhost" or host.endswith(".localhost"):
+        return True
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+def _keep_param(name: str, rule: DomainRule) -> bool:
+    if rule.keep_params is not None:
+        return name in rule.keep_params
+    lowered = name.lower()
+    return not (
+        lowered in TRACKING_PARAMS or lowered in rule.drop_params or lowered.startswith(TRACKING_PREFIXES)
+    )
+
+
+def canonicalize_recipe_url(url: str) -> str:
+    """Return the canonical form of a recipe URL.
+
+    Anything that is not an absolute http(s) URL is only stripped of
+    surrounding whitespace and trailing slashes.
+    """
+
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url.rstrip("/")
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").rstrip(".")
+    if scheme not in _DEFAULT_PORTS or not host:
+        return url.rstrip("/")
+    if port == _DEFAULT_PORTS[scheme]:
+        port = None
+
+    rule = domain_rule(host)
+    for prefix in rule.strip_subdomains:
+        if host.startswith(prefix) and host.count(".") > 1:
+            host = host[len(prefix):]
+            break
+    # A non-default port says nothing about which scheme the server speaks.
+    if rule.https and port is None and not _is_local(host):
+        scheme = "https"
+    netloc = f"[{host}]" if ":" in host else host
+    if port is not None:
+        netloc = f"{netloc}:{port}"
+
+    path = _SLASHES.sub("/", parts.path)
+    path = _AMP_EXTENSION.sub("", _AMP_PREFIX.sub("", path))
+    while True:
+        stripped = _VARIANT_SUFFIX.sub("", path)
+        if stripped == path:
+            break
+        path = stripped
+    for pattern, replacement in rule._compiled:
+        path = pattern.sub(replacement, path)
+    path = path.rstrip("/")
+
+    params = [
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True) if _keep_param(name, rule)
+    ]
+    # Stable sort: parameter order does not matter, repeated values keep theirs.
+    query = urlencode(sorted(params, key=lambda param: param[0]))
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def declared_canonical_url(data: Dict[str, Any], canonical_url: str) -> str | None:
+    """The page's own `rel=canonical` URL from a scraper payload, when it names another page on the same site.
+
+    Links to another site are left to near-duplicate detection, and links to
+    the site's home page (a common template bug) are ignored.
+    """
+
+    declared = data.get("canonical_url")
+    if not isinstance(declared, str) or not declared:
+        return None
+    declared = canonicalize_recipe_url(declared)
+    if declared == canonical_url:
+        return None
+    requested_parts, declared_parts = urlsplit(canonical_url), urlsplit(declared)
+    if declared_parts.netloc != requested_parts.netloc or not declared_parts.path.strip("/"):
+        return None
+    return declared
+
+
+def recipe_lookup(canonical_url: str) -> QuerySet:
+    """The recipe stored under `canonical_url` or aliased to it, as a single query."""
+
+    return Recipe.objects.filter(
+        Q(source_url=canonical_url) | Q(pk__in=RecipeAlias.objects.filter(url=canonical_url).values("recipe_id"))
+    )
+
+
+def find_recipe(canonical_url: str) -> Recipe | None:
+    return recipe_lookup(canonical_url).first()
+
+
+async def afind_recipe(canonical_url: str) -> Recipe | None:
+    return await recipe_lookup(canonical_url).afirst()
+
+
+def stored_recipe_ids(canonical_urls: List[str]) -> Dict[str, int]:
+    """Ids of the recipes stored under or aliased to each of `canonical_urls`."""
+
+    ids = dict(RecipeAlias.objects.filter(url__in=canonical_urls).values_list("url", "recipe_id"))
+    ids.update(Recipe.objects.filter(source_url__in=canonical_urls).values_list("source_url", "id"))
+    return ids
+
+
+def add_aliases(recipe_id: int, urls: Iterable[str]) -> None:
+    """Map each URL to the recipe; URLs that already point somewhere are left alone."""
+
+    RecipeAlias.objects.bulk_create(
+        [RecipeAlias(url=url, recipe_id=recipe_id) for url in set(urls) if url], ignore_conflicts=True
+    )
+
+
+# -- one-off clean-up and reporting ---------------------------------------------
+
+
+@dataclass
+class MergeStats:
+    scanned: int = 0
+    renamed: int = 0
+    merged: int = 0
+
+
+def _variant_groups(batch_size: int, stats: MergeStats) -> Dict[str, List[int]]:
+    """Ids of stored recipes whose source_url is not canonical, grouped by canonical URL."""
+
+    groups: Dict[str, List[int]] = defaultdict(list)
+    queryset = Recipe.objects.exclude(source_url=None)
+    for batch in keyset_batches(queryset, ("source_url",), batch_size):
+        for recipe_id, source_url in batch:
+            canonical_url = canonicalize_recipe_url(source_url)
+            if canonical_url != source_url:
+                groups[canonical_url].append(recipe_id)
+        stats.scanned += len(batch)
+    return groups
+
+
+def _merge_group(canonical_url: str, keeper_id: int, merged_ids: List[int]) -> None:
+    with transaction.atomic():
+        keeper = Recipe.objects.get(pk=keeper_id)
+        if merged_ids:
+            keeper.views += sum(Recipe.objects.filter(pk__in=merged_ids).values_list("views", flat=True))
+            if keeper.duplicate_of_id in merged_ids:
+                keeper.duplicate_of_id = None
+            # Re-point whatever referenced the merged rows before they go.
+            Recipe.objects.filter(duplicate_of__in=merged_ids).exclude(pk=keeper_id).update(duplicate_of=keeper_id)
+            RecipeAlias.objects.filter(recipe__in=merged_ids).update(recipe=keeper_id)
+            ConvertJob.objects.filter(recipe__in=merged_ids).update(recipe=keeper_id)
+            Recipe.objects.filter(pk__in=merged_ids).delete()
+        keeper.source_url = canonical_url
+        keeper.save(update_fields=["source_url", "views", "duplicate_of", "updated_at"])
+
+
+def merge_url_variants(
+    *, batch_size: int = 1000, dry_run: bool = False, progress: Callable[[MergeStats], None] | None = None
+) -> MergeStats:
+    """Rewrite stored source_urls to their canonical form, merging rows that collapse onto one URL.
+
+    In each group the row already stored under the canonical URL is kept, or
+    else the oldest one. The rest are deleted after their views, aliases,
+    near-duplicate links and convert jobs are moved to the kept row.
+    """
+
+    stats = MergeStats()
+    groups = _variant_groups(batch_size, stats)
+    canonical_urls = list(groups)
+    keepers: Dict[str, int] = {}
+    for start in range(0, len(canonical_urls), batch_size):
+        chunk = canonical_urls[start : start + batch_size]
+        keepers.update(Recipe.objects.filter(source_url__in=chunk).values_list("source_url", "id"))
+
+    for canonical_url, recipe_ids in groups.items():
+        keeper_id = keepers.get(canonical_url, min(recipe_ids))
+        merged_ids = [recipe_id for recipe_id in recipe_ids if recipe_id != keeper_id]
+        if not dry_run:
+            _merge_group(canonical_url, keeper_id, merged_ids)
+        stats.merged += len(merged_ids)
+        stats.renamed += canonical_url not in keepers
+        if progress is not None:
+            progress(stats)
+    return stats
+
+
+@dataclass
+class HitRateReport:
+    """Replay of logged request URLs keyed the old way and the canonical way."""
+
+    requests: int = 0
+    legacy_hits: int = 0
+    canonical_hits: int = 0
+    legacy_keys: int = 0
+    canonical_keys: int = 0
+
+    @property
+    def legacy_rate(self) -> float:
+        return self.legacy_hits / self.requests if self.requests else 0.0
+
+    @property
+    def canonical_rate(self) -> float:
+        return self.canonical_hits / self.requests if self.requests else 0.0
+
+
+def _legacy_recipe_url(url: str) -> str:
+    # URL normalization before canonicalization: whitespace and trailing slashes only.
+    return url.strip().rstrip("/")
+
+
+def _stored_keys(keys: Set[str], lookup: Callable[[List[str]], Iterable[str]], batch_size: int) -> Set[str]:
+    keys = sorted(keys)
+    stored: Set[str] = set()
+    for start in range(0, len(keys), batch_size):
+        stored.update(lookup(keys[start : start + batch_size]))
+    return stored
+
+
+def _replay_hits(keys: List[str], stored: Set[str]) -> int:
+    seen = set(stored)
+    hits = 0
+    for key in keys:
+        hits += key in seen
+        seen.add(key)
+    return hits
+
+
+def hit_rate_report(urls: Iterable[str], *, batch_size: int = 500) -> HitRateReport:
+    """Count how many of `urls` would be served without a scrape under each keying.
+
+    A request hits when its key is already stored (as a source_url, or for
+    canonical keys also as an alias) or was requested earlier in the sample,
+    since that first request would have scraped and stored it.
+    """
+
+    pairs = [(url, canonicalize_recipe_url(url)) for url in urls]
+    pairs = [(url, key) for url, key in pairs if key.startswith(("http://", "https://"))]
+    legacy = [_legacy_recipe_url(url) for url, _ in pairs]
+    canonical = [key for _, key in pairs]
+    stored_legacy = _stored_keys(
+        set(legacy),
+        lambda chunk: Recipe.objects.filter(source_url__in=chunk).values_list("source_url", flat=True),
+        batch_size,
+    )
+    stored_canonical = _stored_keys(set(canonical), stored_recipe_ids, batch_size)
+    return HitRateReport(
+        requests=len(canonical),
+        legacy_hits=_replay_hits(legacy, stored_legacy),
+        canonical_hits=_replay_hits(canonical, stored_canonical),
+        legacy_keys=len(set(legacy)),
+        canonical_keys=len(set(canonical)),
+    )
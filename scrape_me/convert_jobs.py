@@ -0,0 +1,129 @@
+"""Background job mode for convert-raw-recipe.
+
+`convert-raw-recipe?async=true` stores a `ConvertJob` and hands it to a
+bounded in-process thread pool: at most `RECIPE_CONVERT_CONCURRENCY` model
+calls run at once and at most `RECIPE_CONVERT_QUEUE_DEPTH` more wait for a
+slot. Past that the request is refused with 503 instead of queueing without
+bound. Job state lives in the database, so any web worker can answer a poll.
+
+Jobs run in the process that accepted them; if that process exits, its
+queued and running jobs are not resumed and stay in their last state.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.utils import timezone
+
+from .importing import ImportRowError, recipe_from_row
+from .models import ConvertJob, Recipe, RecipeType
+
+logger = logging.getLogger(__name__)
+
+
+class ConvertJobPool:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pool: ThreadPoolExecutor | None = None
+        self._slots: threading.BoundedSemaphore | None = None
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=settings.RECIPE_CONVERT_CONCURRENCY, thread_name_prefix="convert-job"
+                )
+                self._slots = threading.BoundedSemaphore(
+                    settings.RECIPE_CONVERT_CONCURRENCY + settings.RECIPE_CONVERT_QUEUE_DEPTH
+                )
+            return self._pool
+
+    def submit(self, job: ConvertJob, convert: Callable[[str | None, str], Dict[str, Any]]) -> bool:
+        """Queue `job` to run `convert(source_url, raw_text)`; False if the pool is full."""
+
+        executor = self._executor()
+        if not self._slots.acquire(blocking=False):
+            return False
+        try:
+            executor.submit(self._run, job.pk, convert)
+        except BaseException:
+            self._slots.release()
+            raise
+        return True
+
+    def _run(self, job_id, convert) -> None:
+        try:
+            run_convert_job(job_id, convert)
+        except Exception as exc:
+            logger.exception("Convert job %s crashed.", job_id)
+            try:
+                ConvertJob.objects.filter(pk=job_id).update(
+                    status=ConvertJob.Status.FAILED, error=f"Internal error: {exc}", finished_at=timezone.now()
+                )
+            except Exception:
+                logger.exception("Could not mark convert job %s as failed.", job_id)
+        finally:
+            self._slots.release()
+            # Pool threads get their own connections; don't leak them.
+            connections.close_all()
+
+
+convert_jobs = ConvertJobPool()
+
+
+def store_converted_recipe(result: Dict[str, Any], source_url: str | None) -> Recipe:
+    """Save a model result as an AI_GENERATED recipe.
+
+    The row is validated like an imported one. If `source_url` already
+    belongs to another recipe the new row is stored without it.
+    """
+
+    recipe = recipe_from_row({**result, "source_url": source_url, "views": 0, "type": RecipeType.AI_GENERATED})
+    try:
+        with transaction.atomic():
+            recipe.save()
+    except IntegrityError:
+        recipe.pk, recipe.source_url = None, None
+        recipe.save()
+    return recipe
+
+
+def run_convert_job(job_id, convert: Callable[[str | None, str], Dict[str, Any]]) -> None:
+    """Run one queued job to completion, recording its result or error."""
+
+    if not ConvertJob.objects.filter(pk=job_id, status=ConvertJob.Status.QUEUED).update(
+        status=ConvertJob.Status.RUNNING
+    ):
+        return
+    job = ConvertJob.objects.get(pk=job_id)
+
+    updates: Dict[str, Any] = {}
+    try:
+        result = convert(job.source_url, job.raw_text)
+    except Exception as exc:  # RecipeStructError, or anything the model client raises
+        updates.update(status=ConvertJob.Status.FAILED, error=str(exc))
+    else:
+        updates.update(status=ConvertJob.Status.SUCCEEDED, result=result)
+        if job.persist:
+            try:
+                updates["recipe"] = store_converted_recipe(result, job.source_url)
+            except ImportRowError as exc:
+                updates["error"] = f"Result was not stored as a recipe: {exc}"
+    updates["finished_at"] = timezone.now()
+    ConvertJob.objects.filter(pk=job_id).update(**updates)
+
+
+def serialize_convert_job(job: ConvertJob) -> Dict[str, Any]:
+    return {
+        "job_id": str(job.pk),
+        "status": job.status,
+        "result": job.result,
+        "error": job.error or None,
+        "recipe_id": job.recipe_id,
+        "created_at": job.created_at.isoformat(),
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
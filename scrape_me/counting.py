@@ -0,0 +1,85 @@
+"""Row counting strategies for recipe listings.
+
+* The unfiltered recipe total is read from a `TableCounter` row that SQLite
+  triggers keep exact on every insert and delete (including bulk writes).
+* Filtered totals (search, admin filters) are cached for a short TTL.
+* Callers that can live without totals skip counting altogether and detect a
+  next page by fetching one extra row.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection as default_connection, transaction
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+from .models import Recipe, TableCounter
+
+RECIPE_COUNTER = "recipe"
+
+_TRIGGER_NAMES = ("scrape_me_recipe_count_ai", "scrape_me_recipe_count_ad")
+
+
+def _install_statements():
+    recipe_table = Recipe._meta.db_table
+    counter_table = TableCounter._meta.db_table
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS scrape_me_recipe_count_ai AFTER INSERT ON {recipe_table} BEGIN "
+        f"UPDATE {counter_table} SET value = value + 1 WHERE name = '{RECIPE_COUNTER}'; END",
+        f"CREATE TRIGGER IF NOT EXISTS scrape_me_recipe_count_ad AFTER DELETE ON {recipe_table} BEGIN "
+        f"UPDATE {counter_table} SET value = value - 1 WHERE name = '{RECIPE_COUNTER}'; END",
+    ]
+
+
+def ensure_recipe_counter(connection=None) -> bool:
+    """Install the counter triggers if missing and re-seed the counter; True if it did."""
+
+    connection = connection or default_connection
+    if connection.vendor != "sqlite":
+        return False
+
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name IN (%s, %s)",
+            _TRIGGER_NAMES,
+        )
+        if cursor.fetchone()[0] == len(_TRIGGER_NAMES):
+            return False
+        for statement in _install_statements():
+            cursor.execute(statement)
+        TableCounter.objects.using(connection.alias).update_or_create(
+            name=RECIPE_COUNTER,
+            defaults={"value": Recipe.objects.using(connection.alias).count()},
+        )
+    return True
+
+
+def exact_recipe_count() -> int:
+    """Total number of recipes, from the maintained counter when available."""
+
+    value = TableCounter.objects.filter(name=RECIPE_COUNTER).values_list("value", flat=True).first()
+    if value is None:
+        return Recipe.objects.count()
+    return value
+
+
+def count_recipes(queryset: QuerySet) -> int:
+    """Count `queryset` as cheaply as its shape allows."""
+
+    if queryset.model is Recipe and not queryset.query.has_filters() and not queryset.query.extra_tables:
+        return exact_recipe_count()
+
+    sql, params = queryset.query.sql_with_params()
+    key = "recipe-count:" + hashlib.sha256(repr((sql, params)).encode("utf-8")).hexdigest()
+    return cache.get_or_set(key, queryset.count, timeout=settings.RECIPE_COUNT_CACHE_TTL)
+
+
+class RecipePaginator(Paginator):
+    """Paginator whose `count` goes through `count_recipes` instead of COUNT(*)."""
+
+    @cached_property
+    def count(self):
+        return count_recipes(self.object_list)
@@ -0,0 +1,269 @@
+"""Near-duplicate recipe detection with MinHash and locality-sensitive hashing.
+
+A recipe's fingerprint is a MinHash signature over its normalized content:
+the ingredient keys (quantities and units dropped, see `ingredient_keys`) and
+the word 3-grams of its instructions. Two signatures agree in a position with
+probability equal to the Jaccard similarity of the underlying sets, so the
+share of equal positions estimates how alike two recipes are.
+
+Signatures are split into `BANDS` bands of `ROWS` values; each band hashes to
+one `RecipeLshBucket` row. Recipes that share any bucket are candidates and
+only candidates are compared, so a lookup is one indexed query however large
+the catalog is. With 16 bands of 8 rows, pairs at 0.8 similarity collide in
+some band ~99.9% of the time and pairs at 0.5 only ~6%.
+
+A recipe whose best candidate reaches `RECIPE_DUPLICATE_THRESHOLD` is linked
+to that candidate's cluster through `Recipe.duplicate_of`, which always points
+at the cluster's first stored recipe.
+"""
+
+import hashlib
+import re
+from array import array
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Callable, Dict, Iterable, Iterator, List, Set, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
+
+from .batching import map_batches
+from .ingredient_index import ingredient_keys
+from .ingredients import parse_ingredient
+from .models import Recipe, RecipeFingerprint, RecipeLshBucket
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# Each shingle is expanded into NUM_PERM 32-bit hash values in one SHAKE-128
+# call; position i of every expansion acts as the i-th hash function.
+_SIGNATURE_BYTES = NUM_PERM * 4
+_WORD = re.compile(r"[a-z0-9]+")
+_SHINGLE_WORDS = 3
+
+# Candidate pairs verified per signature query in `cluster_duplicates`.
+_PAIR_CHUNK = 5000
+
+
+def _hash64(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def recipe_shingles(ingredients: Iterable[str], instructions: Iterable[str]) -> Set[int]:
+    shingles = set()
+    for line in ingredients or []:
+        if isinstance(line, str):
+            shingles.update(_hash64(f"i:{key}") for key in ingredient_keys(parse_ingredient(line).name))
+    words = [word for step in instructions or [] if isinstance(step, str) for word in _WORD.findall(step.lower())]
+    if len(words) < _SHINGLE_WORDS:
+        shingles.update(_hash64(f"w:{word}") for word in words)
+    for start in range(len(words) - _SHINGLE_WORDS + 1):
+        shingles.add(_hash64("w:" + " ".join(words[start : start + _SHINGLE_WORDS])))
+    return shingles
+
+
+def minhash(shingles: Set[int]) -> array | None:
+    """32-bit MinHash signature of `shingles`, or None for an empty set."""
+
+    if not shingles:
+        return None
+    expansions = []
+    for shingle in shingles:
+        values = array("I")
+        values.frombytes(hashlib.shake_128(shingle.to_bytes(8, "little")).digest(_SIGNATURE_BYTES))
+        expansions.append(values)
+    return array("I", map(min, zip(*expansions)))
+
+
+def recipe_signature(ingredients: Iterable[str], instructions: Iterable[str]) -> array | None:
+    return minhash(recipe_shingles(ingredients, instructions))
+
+
+def band_buckets(signature: array) -> List[int]:
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS : (band + 1) * ROWS].tobytes()
+        digest = hashlib.blake2b(bytes([band]) + rows, digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, "little", signed=True))
+    return buckets
+
+
+def similarity(first: array, second: array) -> float:
+    return sum(1 for a, b in zip(first, second) if a == b) / NUM_PERM
+
+
+def _signature_from_bytes(data) -> array:
+    signature = array("I")
+    signature.frombytes(bytes(data))
+    return signature
+
+
+def find_duplicate(signature: array, *, exclude_id: int | None = None) -> int | None:
+    """The cluster root of the most similar stored recipe at or above the threshold, if any."""
+
+    candidates = RecipeLshBucket.objects.filter(bucket__in=band_buckets(signature))
+    if exclude_id is not None:
+        candidates = candidates.exclude(recipe_id=exclude_id)
+    candidate_ids = set(candidates.values_list("recipe_id", flat=True))
+    if not candidate_ids:
+        return None
+
+    threshold = settings.RECIPE_DUPLICATE_THRESHOLD
+    best = None
+    fingerprints = RecipeFingerprint.objects.filter(recipe_id__in=candidate_ids).values_list(
+        "recipe_id", "signature", "recipe__duplicate_of_id"
+    )
+    for recipe_id, stored, root_id in fingerprints:
+        score = similarity(signature, _signature_from_bytes(stored))
+        # Most similar wins; ties go to the older recipe.
+        if score >= threshold and (best is None or (score, -recipe_id) > best[0]):
+            best = ((score, -recipe_id), root_id or recipe_id)
+    return best[1] if best else None
+
+
+def _store_fingerprints(signatures: Dict[int, array | None]) -> None:
+    RecipeFingerprint.objects.filter(recipe_id__in=list(signatures)).delete()
+    RecipeLshBucket.objects.filter(recipe_id__in=list(signatures)).delete()
+    stored = {recipe_id: signature for recipe_id, signature in signatures.items() if signature is not None}
+    RecipeFingerprint.objects.bulk_create(
+        [
+            RecipeFingerprint(recipe_id=recipe_id, signature=signature.tobytes())
+            for recipe_id, signature in stored.items()
+        ],
+        batch_size=500,
+    )
+    RecipeLshBucket.objects.bulk_create(
+        [
+            RecipeLshBucket(recipe_id=recipe_id, bucket=bucket)
+            for recipe_id, signature in stored.items()
+            for bucket in set(band_buckets(signature))
+        ],
+        batch_size=500,
+    )
+
+
+def fingerprint_recipe(recipe: Recipe) -> int | None:
+    """Store the recipe's fingerprint and link it to the cluster of its nearest duplicate.
+
+    Returns the id of the recipe it duplicates, or None.
+    """
+
+    signature = recipe_signature(recipe.ingredients, recipe.instructions)
+    duplicate_of = find_duplicate(signature, exclude_id=recipe.pk) if signature is not None else None
+    with transaction.atomic():
+        _store_fingerprints({recipe.pk: signature})
+        if duplicate_of != recipe.duplicate_of_id:
+            Recipe.objects.filter(pk=recipe.pk).update(duplicate_of=duplicate_of)
+            recipe.duplicate_of_id = duplicate_of
+    return duplicate_of
+
+
+# -- batch clustering ---------------------------------------------------------
+
+
+@dataclass
+class ClusterStats:
+    fingerprinted: int = 0
+    clusters: int = 0
+    duplicates: int = 0
+
+
+def _signature_job(job: Tuple[int, list, list]) -> Tuple[int, array | None]:
+    recipe_id, ingredients, instructions = job
+    return recipe_id, recipe_signature(ingredients, instructions)
+
+
+def _candidate_pairs() -> Iterator[Tuple[int, int]]:
+    """Every pair of recipes sharing a bucket (buckets hold a handful of near-copies)."""
+
+    rows = RecipeLshBucket.objects.order_by("bucket", "recipe_id").values_list("bucket", "recipe_id")
+    current, members = None, []
+    for bucket, recipe_id in rows.iterator(chunk_size=10000):
+        if bucket != current:
+            yield from combinations(members, 2)
+            current, members = bucket, []
+        members.append(recipe_id)
+    yield from combinations(members, 2)
+
+
+def _find(parents: Dict[int, int], recipe_id: int) -> int:
+    root = recipe_id
+    while parents.get(root, root) != root:
+        root = parents[root]
+    while parents.get(recipe_id, recipe_id) != root:
+        parents[recipe_id], recipe_id = root, parents[recipe_id]
+    return root
+
+
+def _verify(pairs: Set[Tuple[int, int]], parents: Dict[int, int], threshold: float) -> None:
+    ids = {recipe_id for pair in pairs for recipe_id in pair}
+    signatures = {
+        recipe_id: _signature_from_bytes(stored)
+        for recipe_id, stored in RecipeFingerprint.objects.filter(recipe_id__in=ids).values_list(
+            "recipe_id", "signature"
+        )
+    }
+    for first, second in pairs:
+        first_root, second_root = _find(parents, first), _find(parents, second)
+        if first_root != second_root and similarity(signatures[first], signatures[second]) >= threshold:
+            # The oldest (lowest id) recipe becomes the cluster root.
+            low, high = sorted((first_root, second_root))
+            parents[high] = low
+
+
+def cluster_duplicates(
+    queryset: QuerySet | None = None,
+    *,
+    rebuild: bool = False,
+    workers: int | None = None,
+    batch_size: int = 1000,
+    progress: Callable[[ClusterStats], None] | None = None,
+) -> ClusterStats:
+    """Fingerprint recipes that have none (all of them with `rebuild`), then re-link every cluster.
+
+    Signatures are computed in a process pool; clustering only compares
+    recipes that share an LSH bucket.
+    """
+
+    queryset = Recipe.objects.all() if queryset is None else queryset
+    if not rebuild:
+        queryset = queryset.filter(fingerprint__isnull=True)
+    stats = ClusterStats()
+
+    def store(results: List[Tuple[int, array | None]]) -> None:
+        with transaction.atomic():
+            _store_fingerprints(dict(results))
+        stats.fingerprinted += len(results)
+        if progress is not None:
+            progress(stats)
+
+    fields = ("ingredients", "instructions")
+    for results in map_batches(_signature_job, queryset, fields, batch_size=batch_size, workers=workers):
+        store(results)
+
+    threshold = settings.RECIPE_DUPLICATE_THRESHOLD
+    parents: Dict[int, int] = {}
+    # A similar pair usually shares several buckets; verify it once per chunk.
+    pairs: Set[Tuple[int, int]] = set()
+    for pair in _candidate_pairs():
+        pairs.add(pair)
+        if len(pairs) >= _PAIR_CHUNK:
+            _verify(pairs, parents, threshold)
+            pairs = set()
+    if pairs:
+        _verify(pairs, parents, threshold)
+
+    links = {recipe_id: _find(parents, recipe_id) for recipe_id in parents}
+    links = {recipe_id: root for recipe_id, root in links.items() if recipe_id != root}
+    stats.duplicates = len(links)
+    stats.clusters = len(set(links.values()))
+    with transaction.atomic():
+        Recipe.objects.exclude(duplicate_of=None).update(duplicate_of=None)
+        Recipe.objects.bulk_update(
+            [Recipe(pk=recipe_id, duplicate_of_id=root) for recipe_id, root in links.items()],
+            ["duplicate_of"],
+            batch_size=500,
+        )
+    return stats
@@ -0,0 +1,80 @@
+"""Streaming NDJSON export of the recipe catalog.
+
+Recipes are read with `QuerySet.iterator(chunk_size=...)` and encoded one
+chunk at a time, so memory stays flat however large the catalog is. Both the
+export-recipes endpoint and `manage.py export_recipes` consume `iter_export`.
+"""
+
+import zlib
+from datetime import datetime, time
+from typing import Iterable, Iterator
+
+from django.conf import settings
+from django.db.models import QuerySet
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Recipe, RecipeType
+from .serializers import encode_json, serialize_recipe
+
+
+def parse_since(value: str) -> datetime:
+    """Parse an ISO date or datetime; naive values are in the current time zone."""
+
+    value = value.strip()
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            parsed = datetime.combine(day, time.min) if day is not None else None
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValueError(f"Invalid 'since' value {value!r}. Use an ISO date or datetime.")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def export_queryset(recipe_type: str | None = None, since: datetime | None = None) -> QuerySet:
+    """Recipes to export in id order, optionally of one type or updated at/after `since`."""
+
+    if recipe_type is not None and recipe_type not in RecipeType.values:
+        raise ValueError(f"Invalid 'type' value {recipe_type!r}. Choose from: {', '.join(RecipeType.values)}.")
+
+    queryset = Recipe.objects.order_by("id")
+    if recipe_type is not None:
+        queryset = queryset.filter(type=recipe_type)
+    if since is not None:
+        queryset = queryset.filter(updated_at__gte=since)
+    return queryset
+
+
+def iter_ndjson(queryset: QuerySet, chunk_size: int | None = None) -> Iterator[bytes]:
+    """Yield the queryset as NDJSON, one block of `chunk_size` lines at a time."""
+
+    chunk_size = chunk_size or settings.RECIPE_EXPORT_CHUNK_SIZE
+    lines = []
+    for recipe in queryset.iterator(chunk_size=chunk_size):
+        lines.append(encode_json(serialize_recipe(recipe)) + b"\n")
+        if len(lines) >= chunk_size:
+            yield b"".join(lines)
+            lines = []
+    if lines:
+        yield b"".join(lines)
+
+
+def gzip_stream(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip-compress a byte stream incrementally."""
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def iter_export(queryset: QuerySet, *, compress: bool = False, chunk_size: int | None = None) -> Iterator[bytes]:
+    stream = iter_ndjson(queryset, chunk_size)
+    return gzip_stream(stream) if compress else stream
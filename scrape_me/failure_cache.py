@@ -0,0 +1,141 @@
+"""Negative cache of failed scrapes, shared by all worker processes.
+
+Failures are stored as `ScrapeFailureRecord` rows keyed by URL hash or
+domain. A record answers lookups until its `retry_at`; it is kept past that
+so the next failure backs off further, and forgotten at `expires_at`. The
+table holds at most `RECIPE_FAILURE_CACHE_MAX_ENTRIES` records: when a write
+goes over, expired records are dropped first and then the least recently
+used ones.
+"""
+
+import hashlib
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable
+from urllib.parse import urlparse
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from .models import ScrapeFailureRecord
+
+
+@dataclass
+class ScrapeFailure:
+    """A remembered scrape failure for a URL or a whole domain."""
+
+    error_class: str
+    message: str
+    failures: int
+    retry_at: float
+
+    @property
+    def retry_after(self) -> int:
+        return max(0, math.ceil(self.retry_at - time.time()))
+
+
+def _url_key(normalized_url: str) -> str:
+    return "url:" + hashlib.sha256(normalized_url.encode("utf-8")).hexdigest()
+
+
+def _domain_key(domain: str) -> str:
+    return "domain:" + domain.lower()
+
+
+def _domain_of(normalized_url: str) -> str:
+    return urlparse(normalized_url).netloc.lower()
+
+
+def _failure(record: ScrapeFailureRecord) -> ScrapeFailure:
+    return ScrapeFailure(record.error_class, record.message, record.failures, record.retry_at)
+
+
+def _cull(now: float) -> None:
+    records = ScrapeFailureRecord.objects
+    excess = records.count() - settings.RECIPE_FAILURE_CACHE_MAX_ENTRIES
+    if excess <= 0:
+        return
+    excess -= records.filter(expires_at__lte=now).delete()[0]
+    if excess > 0:
+        least_recent = list(records.order_by("used_at").values_list("key", flat=True)[:excess])
+        records.filter(key__in=least_recent).delete()
+
+
+def _store(key: str, exc: BaseException) -> ScrapeFailure:
+    now = time.time()
+    previous = ScrapeFailureRecord.objects.filter(key=key, expires_at__gt=now).first()
+    failures = (previous.failures if previous else 0) + 1
+    base_ttl = settings.RECIPE_FAILURE_CACHE_BASE_TTL
+    max_ttl = settings.RECIPE_FAILURE_CACHE_MAX_TTL
+    ttl = min(base_ttl * 2 ** (failures - 1), max_ttl)
+    record = ScrapeFailureRecord(
+        key=key,
+        error_class=type(exc).__name__,
+        message=str(exc),
+        failures=failures,
+        retry_at=now + ttl,
+        # Keep the record past its retry time so the next failure backs off further;
+        # it is forgotten after one more maximum TTL without failures.
+        expires_at=now + ttl + max_ttl,
+        used_at=now,
+    )
+    try:
+        with transaction.atomic():
+            record.save()
+    except IntegrityError:  # inserted by another worker in the meantime
+        record.save(force_update=True)
+    if previous is None:
+        _cull(now)
+    return _failure(record)
+
+
+def lookup_failure(normalized_url: str) -> ScrapeFailure | None:
+    """Return the cached failure that should answer a scrape of this URL, if any."""
+
+    return lookup_failures([normalized_url]).get(normalized_url)
+
+
+def lookup_failures(normalized_urls: Iterable[str]) -> Dict[str, ScrapeFailure]:
+    """`lookup_failure` for many URLs with one query; URLs without a failure are left out."""
+
+    keys = {url: (_url_key(url), _domain_key(_domain_of(url))) for url in normalized_urls}
+    now = time.time()
+    stored = ScrapeFailureRecord.objects.in_bulk([key for url_keys in keys.values() for key in url_keys])
+    failures, used = {}, set()
+    for url, url_keys in keys.items():
+        for key in url_keys:
+            record = stored.get(key)
+            if record is not None and record.retry_at > now:
+                failures[url] = _failure(record)
+                used.add(key)
+                break
+    if used:
+        ScrapeFailureRecord.objects.filter(key__in=used).update(used_at=now)
+    return failures
+
+
+def record_failure(normalized_url: str, exc: BaseException) -> ScrapeFailure:
+    """Remember that scraping `normalized_url` raised `exc`."""
+
+    if type(exc).__name__ in settings.RECIPE_FAILURE_CACHE_DOMAIN_ERRORS:
+        _store(_domain_key(_domain_of(normalized_url)), exc)
+    return _store(_url_key(normalized_url), exc)
+
+
+# Lookups and writes hit the database, so async code goes through these.
+alookup_failure = sync_to_async(lookup_failure)
+alookup_failures = sync_to_async(lookup_failures)
+arecord_failure = sync_to_async(record_failure)
+
+
+def purge_failures(urls: Iterable[str] = (), domains: Iterable[str] = ()) -> None:
+    """Forget failures for the given URLs and domains, or all of them when none are given."""
+
+    urls, domains = list(urls), list(domains)
+    records = ScrapeFailureRecord.objects.all()
+    if urls or domains:
+        keys = [_url_key(url) for url in urls] + [_domain_key(domain) for domain in domains]
+        records = records.filter(key__in=keys)
+    records.delete()
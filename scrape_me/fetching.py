@@ -0,0 +1,124 @@
+import asyncio
+import json
+from dataclasses import dataclass
+from typing import Any, Dict
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+from weakref import WeakKeyDictionary
+
+from django.conf import settings
+from recipe_scrapers import HEADERS, scrape_html
+
+from .metrics import domain_label, scrape_fetch_latency, scrape_parse_latency, timed_stage
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - environment specific
+    httpx = None
+
+
+_ASYNC_CLIENTS: "WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = WeakKeyDictionary()
+
+
+@dataclass(frozen=True)
+class FetchedPage:
+    """A downloaded page with the validators the origin sent for it."""
+
+    html: str
+    etag: str = ""
+    last_modified: str = ""
+
+
+def _request_headers(etag: str, last_modified: str) -> Dict[str, str]:
+    headers = dict(HEADERS)
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def _decode(body: bytes, charset: str | None) -> str:
+    # Pages are often served as latin-1/cp1252; undecodable bytes must not fail the scrape.
+    try:
+        return body.decode(charset or "utf-8", errors="replace")
+    except LookupError:  # unknown charset name
+        return body.decode("utf-8", errors="replace")
+
+
+def fetch_recipe_page(url: str, etag: str = "", last_modified: str = "") -> FetchedPage | None:
+    """Download a recipe page the same way `recipe_scrapers.scrape_me` does.
+
+    Passing the `etag` / `last_modified` stored from an earlier fetch makes
+    the request conditional; None is returned when the origin answers
+    304 Not Modified.
+    """
+
+    request = Request(url, headers=_request_headers(etag, last_modified))
+    with timed_stage(scrape_fetch_latency, domain_label(url)):
+        try:
+            with urlopen(request, timeout=settings.RECIPE_FETCH_TIMEOUT) as response:
+                return FetchedPage(
+                    _decode(response.read(), response.headers.get_content_charset()),
+                    response.headers.get("ETag", ""),
+                    response.headers.get("Last-Modified", ""),
+                )
+        except HTTPError as exc:
+            if exc.code == 304:
+                return None
+            raise
+
+
+def _get_async_client():
+    """Return an httpx client bound to the running event loop.
+
+    Connection pools cannot be shared between event loops, so one client is
+    kept per loop and dropped together with it.
+    """
+
+    loop = asyncio.get_running_loop()
+    client = _ASYNC_CLIENTS.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            headers=HEADERS,
+            timeout=settings.RECIPE_FETCH_TIMEOUT,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=settings.RECIPE_FETCH_MAX_CONNECTIONS),
+        )
+        _ASYNC_CLIENTS[loop] = client
+    return client
+
+
+async def fetch_recipe_page_async(url: str, etag: str = "", last_modified: str = "") -> FetchedPage | None:
+    """Download a recipe page without blocking the event loop; see `fetch_recipe_page`."""
+
+    if httpx is None:
+        return await asyncio.to_thread(fetch_recipe_page, url, etag, last_modified)
+
+    conditional = {key: value for key, value in _request_headers(etag, last_modified).items() if key.startswith("If-")}
+    with timed_stage(scrape_fetch_latency, domain_label(url)):
+        response = await _get_async_client().get(url, headers=conditional)
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        return FetchedPage(
+            _decode(response.content, response.charset_encoding),
+            response.headers.get("ETag", ""),
+            response.headers.get("Last-Modified", ""),
+        )
+
+
+def scrape_recipe_html(html: str, url: str) -> Dict[str, Any]:
+    """Parse downloaded recipe HTML and return the scraper payload as a dict."""
+
+    options = {}
+    if settings.RECIPE_SCRAPE_SUPPORTED_ONLY is not None:
+        options["supported_only"] = settings.RECIPE_SCRAPE_SUPPORTED_ONLY
+
+    with timed_stage(scrape_parse_latency, domain_label(url)):
+        scraper = scrape_html(html, org_url=url, **options)
+        data = scraper.to_json()
+        if isinstance(data, str):
+            data = json.loads(data)
+    return data
+
@@ -0,0 +1,121 @@
+"""Content-addressed on-disk store for fetched recipe pages.
+
+Each page is stored once, compressed, under the SHA-256 of its UTF-8 bytes
+(`<root>/<first two hex digits>/<digest>.html.gz` or `.html.zst`), and the
+digest is kept on `Recipe.html_sha256`. `manage.py reparse_recipes` rebuilds
+recipe fields from these files without touching the network.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - environment specific
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+_SUFFIXES = {"gzip": ".html.gz", "zstd": ".html.zst"}
+
+
+class HtmlNotStored(LookupError):
+    """Raised when no page is stored under a digest."""
+
+
+def html_digest(html: str) -> str:
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+def _compress(data: bytes, compression: str) -> bytes:
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data: bytes, suffix: str) -> bytes:
+    if suffix == _SUFFIXES["zstd"]:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read .zst pages.")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class HtmlStore:
+    """Write-once store of compressed HTML pages keyed by their SHA-256."""
+
+    def __init__(self, root: Path | str | None = None, compression: str | None = None) -> None:
+        self._root = Path(root) if root is not None else None
+        self._compression = compression
+
+    @property
+    def root(self) -> Path:
+        return self._root if self._root is not None else Path(settings.RECIPE_HTML_STORE_DIR)
+
+    @property
+    def compression(self) -> str:
+        compression = self._compression or settings.RECIPE_HTML_STORE_COMPRESSION
+        if compression not in _SUFFIXES:
+            raise ValueError(f"Unknown HTML store compression {compression!r}.")
+        if compression == "zstd" and zstandard is None:
+            # Optional dependency; gzip is always available.
+            return "gzip"
+        return compression
+
+    def _path(self, digest: str, suffix: str) -> Path:
+        return self.root / digest[:2] / f"{digest}{suffix}"
+
+    def put(self, html: str) -> str:
+        """Store a page (a no-op if it is already stored) and return its digest."""
+
+        digest = html_digest(html)
+        if self.exists(digest):
+            return digest
+
+        compression = self.compression
+        path = self._path(digest, _SUFFIXES[compression])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file and rename so readers never see a partial page.
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(_compress(html.encode("utf-8"), compression))
+            os.replace(temp_path, path)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+        return digest
+
+    def get(self, digest: str) -> str:
+        for suffix in _SUFFIXES.values():
+            try:
+                data = self._path(digest, suffix).read_bytes()
+            except FileNotFoundError:
+                continue
+            return _decompress(data, suffix).decode("utf-8")
+        raise HtmlNotStored(digest)
+
+    def exists(self, digest: str) -> bool:
+        return any(self._path(digest, suffix).exists() for suffix in _SUFFIXES.values())
+
+
+html_store = HtmlStore()
+
+
+def store_html(html: str) -> str:
+    """Store a fetched page, returning its digest or "" if it could not be written.
+
+    Archiving is best effort: a full or read-only disk must not fail the scrape.
+    """
+
+    try:
+        return html_store.put(html)
+    except OSError:
+        logger.exception("Failed to store fetched HTML.")
+        return ""
@@ -0,0 +1,256 @@
+"""Bulk import of recipe dumps (NDJSON, as written by `manage.py export_recipes`).
+
+Rows are validated and normalized like `Recipe.save()` and the scrape path,
+then written with one `bulk_create` upsert per batch, each batch in its own
+transaction. Rows are matched on `source_url`; rows without one are always
+inserted. Bulk writes skip the post_save hook, so each batch stores the
+parsed ingredient rows of the recipes it wrote itself.
+"""
+
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .ingredients import store_recipe_ingredients
+from .models import Recipe, RecipeType
+from .normalizers import (
+    is_scrapable_url,
+    normalize_description,
+    normalize_instructions,
+    normalize_recipe_url,
+)
+
+# Columns overwritten when an imported row matches a stored source_url.
+UPSERT_FIELDS = [
+    "description",
+    "title",
+    "author",
+    "total_time",
+    "yields",
+    "image",
+    "ingredients",
+    "instructions",
+    "views",
+    "type",
+    "updated_at",
+]
+
+_CHAR_FIELDS = ("title", "author", "yields")
+
+# Invalid rows beyond this many are counted but their messages are dropped.
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportRowError(ValueError):
+    """Raised for an input row that cannot be imported."""
+
+
+@dataclass
+class ImportStats:
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    invalid: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def processed(self) -> int:
+        return self.created + self.updated + self.skipped + self.invalid
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+
+def _string(row: Dict[str, Any], name: str) -> str:
+    value = row.get(name)
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        raise ImportRowError(f"'{name}' must be a string.")
+    value = value.strip()
+    max_length = Recipe._meta.get_field(name).max_length
+    if max_length and len(value) > max_length:
+        raise ImportRowError(f"'{name}' is longer than {max_length} characters.")
+    return value
+
+
+def _timestamp(row: Dict[str, Any], name: str) -> datetime | None:
+    value = row.get(name)
+    if value is None:
+        return None
+    try:
+        parsed = parse_datetime(value) if isinstance(value, str) else None
+    except ValueError:  # well-formed but out of range, e.g. month 13
+        parsed = None
+    if parsed is None:
+        raise ImportRowError(f"'{name}' must be an ISO datetime.")
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+def recipe_from_row(row: Any) -> Recipe:
+    """Build an unsaved, normalized Recipe from one decoded input row."""
+
+    if not isinstance(row, dict):
+        raise ImportRowError("Row must be a JSON object.")
+
+    source_url = row.get("source_url")
+    if source_url is not None:
+        if not isinstance(source_url, str):
+            raise ImportRowError("'source_url' must be a string.")
+        source_url = normalize_recipe_url(source_url) or None
+        if source_url is not None and not is_scrapable_url(source_url):
+            raise ImportRowError(f"Invalid source_url {source_url!r}.")
+
+    ingredients = row.get("ingredients") or []
+    if isinstance(ingredients, str):
+        ingredients = [line.strip() for line in ingredients.splitlines() if line.strip()]
+    if not isinstance(ingredients, list) or not all(isinstance(line, str) for line in ingredients):
+        raise ImportRowError("'ingredients' must be a list of strings.")
+
+    total_time = row.get("total_time")
+    if total_time is not None and (isinstance(total_time, bool) or not isinstance(total_time, int) or total_time < 0):
+        raise ImportRowError("'total_time' must be a non-negative integer.")
+
+    views = row.get("views") or 0
+    if isinstance(views, bool) or not isinstance(views, int) or views < 0:
+        raise ImportRowError("'views' must be a non-negative integer.")
+
+    recipe_type = row.get("type") or ""
+    if recipe_type and recipe_type not in RecipeType.values:
+        raise ImportRowError(f"Invalid type {recipe_type!r}.")
+
+    image = row.get("image") or ""
+    if not isinstance(image, str):
+        raise ImportRowError("'image' must be a string.")
+
+    recipe = Recipe(
+        source_url=source_url,
+        description=normalize_description(row.get("description")),
+        ingredients=ingredients,
+        instructions=normalize_instructions(row.get("instructions")),
+        total_time=total_time,
+        views=views,
+        type=recipe_type,
+        image=image.strip(),
+        **{name: _string(row, name) for name in _CHAR_FIELDS},
+    )
+    recipe.prepare_for_save()
+    # Kept aside because bulk_create stamps auto_now(_add) fields itself.
+    recipe._imported_timestamps = (_timestamp(row, "created_at"), _timestamp(row, "updated_at"))
+    return recipe
+
+
+def _restore_timestamps(recipes: List[Recipe]) -> None:
+    restored = []
+    for recipe in recipes:
+        created_at, updated_at = recipe._imported_timestamps
+        if recipe.pk is None or (created_at is None and updated_at is None):
+            continue
+        recipe.created_at = created_at or recipe.created_at
+        recipe.updated_at = updated_at or recipe.updated_at
+        restored.append(recipe)
+    if restored:
+        Recipe.objects.bulk_update(restored, ["created_at", "updated_at"])
+
+
+def write_batch(recipes: List[Recipe], on_conflict: str = "update") -> Tuple[int, int, int]:
+    """Insert or upsert one batch in a transaction; returns `(created, updated, skipped)`."""
+
+    # Within a batch the last row for a source_url wins, as it would row by row.
+    by_url: Dict[str, Recipe] = {}
+    unkeyed: List[Recipe] = []
+    for recipe in recipes:
+        if recipe.source_url:
+            by_url[recipe.source_url] = recipe
+        else:
+            unkeyed.append(recipe)
+    batch = unkeyed + list(by_url.values())
+
+    with transaction.atomic():
+        existing = set(Recipe.objects.filter(source_url__in=list(by_url)).values_list("source_url", flat=True))
+        if on_conflict == "update":
+            Recipe.objects.bulk_create(
+                batch, update_conflicts=True, unique_fields=["source_url"], update_fields=UPSERT_FIELDS
+            )
+            _restore_timestamps(batch)
+            store_recipe_ingredients({recipe.pk: recipe.ingredients for recipe in batch})
+            return len(batch) - len(existing), len(existing), 0
+
+        fresh = [recipe for recipe in batch if recipe.source_url not in existing]
+        # Rows with a source_url get no id back from an ignore_conflicts insert.
+        Recipe.objects.bulk_create([recipe for recipe in fresh if not recipe.source_url])
+        keyed = [recipe for recipe in fresh if recipe.source_url]
+        Recipe.objects.bulk_create(keyed, ignore_conflicts=True)
+        if keyed:
+            ids = dict(
+                Recipe.objects.filter(source_url__in=[recipe.source_url for recipe in keyed]).values_list(
+                    "source_url", "id"
+                )
+            )
+            for recipe in keyed:
+                recipe.pk = ids.get(recipe.source_url)
+        _restore_timestamps(fresh)
+        store_recipe_ingredients({recipe.pk: recipe.ingredients for recipe in fresh if recipe.pk is not None})
+        return len(fresh), 0, len(batch) - len(fresh)
+
+
+def import_recipe_lines(
+    lines: Iterable[str | bytes],
+    *,
+    batch_size: int | None = None,
+    on_conflict: str = "update",
+    progress: Callable[[ImportStats], None] | None = None,
+) -> ImportStats:
+    """Import NDJSON lines; invalid rows are counted and reported, not fatal.
+
+    `on_conflict` is "update" (overwrite the stored row for a known
+    source_url) or "skip" (keep it). `progress` is called after each batch.
+    """
+
+    if on_conflict not in {"update", "skip"}:
+        raise ValueError("on_conflict must be 'update' or 'skip'.")
+    batch_size = batch_size or settings.RECIPE_IMPORT_BATCH_SIZE
+
+    stats = ImportStats()
+    batch: List[Recipe] = []
+
+    def flush() -> None:
+        created, updated, skipped = write_batch(batch, on_conflict)
+        stats.created += created
+        stats.updated += updated
+        # Rows superseded by a later duplicate in the same batch count as skipped.
+        stats.skipped += skipped + len(batch) - created - updated - skipped
+        batch.clear()
+        if progress is not None:
+            progress(stats)
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise ImportRowError(f"Invalid JSON: {exc.msg}.") from exc
+            batch.append(recipe_from_row(row))
+        except ImportRowError as exc:
+            stats.invalid += 1
+            if len(stats.errors) < MAX_REPORTED_ERRORS:
+                stats.errors.append((line_number, str(exc)))
+            continue
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+    return stats
@@ -0,0 +1,184 @@
+import asyncio
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Set, Tuple
+from urllib.parse import urlparse
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .canonical_urls import add_aliases, declared_canonical_url, stored_recipe_ids
+from .duplicates import find_duplicate, fingerprint_recipe, recipe_signature
+from .failure_cache import alookup_failures, arecord_failure
+from .fetching import fetch_recipe_page_async, scrape_recipe_html
+from .html_store import store_html
+from .ingredients import store_recipe_ingredients
+from .models import Recipe, RecipeType
+from .normalizers import is_scrapable_url, normalize_recipe_url, recipe_fields_from_scrape
+from .refresh import origin_validators
+
+
+class IngestStatus:
+    CREATED = "created"
+    EXISTS = "exists"
+    DUPLICATE = "duplicate"
+    NEAR_DUPLICATE = "near_duplicate"
+    INVALID = "invalid"
+    FAILED = "failed"
+
+
+def _write_chunk(recipes: List[Recipe]) -> Tuple[Dict[str, int], Set[str]]:
+    """Insert a chunk of scraped recipes.
+
+    Returns the ids of all their URLs and the set of URLs this insert created.
+    Rows stored concurrently by parse-recipe-url are left untouched: they are
+    neither overwritten nor re-indexed with this chunk's payload.
+    """
+
+    for recipe in recipes:
+        recipe.prepare_for_save()
+    urls = [recipe.source_url for recipe in recipes]
+    with transaction.atomic():
+        existing = set(Recipe.objects.filter(source_url__in=urls).values_list("source_url", flat=True))
+        Recipe.objects.bulk_create(recipes, ignore_conflicts=True)
+        ids = dict(Recipe.objects.filter(source_url__in=urls).values_list("source_url", "id"))
+    created = [recipe for recipe in recipes if recipe.source_url in ids and recipe.source_url not in existing]
+    store_recipe_ingredients({ids[recipe.source_url]: recipe.ingredients for recipe in created})
+    for recipe in created:
+        recipe.pk = ids[recipe.source_url]
+        fingerprint_recipe(recipe)
+    return ids, {recipe.source_url for recipe in created}
+
+
+def _stored_duplicate(fields: Dict[str, Any]) -> int | None:
+    signature = recipe_signature(fields["ingredients"], fields["instructions"])
+    return find_duplicate(signature) if signature is not None else None
+
+
+def _alias_declared_url(normalized_url: str, declared_url: str) -> int | None:
+    """Alias `normalized_url` to the recipe stored under the page's declared canonical URL, if any."""
+
+    recipe_id = stored_recipe_ids([declared_url]).get(declared_url)
+    if recipe_id is not None:
+        add_aliases(recipe_id, [normalized_url])
+    return recipe_id
+
+
+async def ingest_recipe_urls(
+    urls: Iterable[str],
+    *,
+    concurrency: int | None = None,
+    per_host: int | None = None,
+    chunk_size: int | None = None,
+    skip_duplicates: bool = False,
+) -> List[Dict[str, Any]]:
+    """Scrape and store many recipe URLs, returning one report entry per input URL.
+
+    URLs are canonicalized exactly like `parse_recipe_url`. Already stored or
+    aliased URLs are skipped with one lookup per table, the rest are fetched
+    with at most `concurrency` requests in flight overall and `per_host` per
+    host, and scraped rows are written with `bulk_create` every `chunk_size`
+    results. Rows match the single-URL path except that no view is counted.
+
+    Scraped recipes that are near-duplicates of a stored one are linked to it
+    like on the single-URL path, or with `skip_duplicates` not stored at all
+    (status "near_duplicate", with the stored recipe's id). Copies still
+    waiting in the same unwritten chunk are linked rather than skipped.
+    """
+
+    concurrency = concurrency or settings.RECIPE_INGEST_CONCURRENCY
+    per_host = per_host or settings.RECIPE_INGEST_PER_HOST
+    chunk_size = chunk_size or settings.RECIPE_INGEST_CHUNK_SIZE
+
+    report: List[Dict[str, Any]] = []
+    entries_by_url: Dict[str, Dict[str, Any]] = {}
+    for url in urls:
+        normalized_url = normalize_recipe_url(url)
+        entry: Dict[str, Any] = {"url": url, "source_url": normalized_url}
+        report.append(entry)
+        if not (is_scrapable_url(normalized_url) and is_scrapable_url(url.strip())):
+            entry.update(source_url=None, status=IngestStatus.INVALID, error="Invalid URL provided.")
+        elif normalized_url in entries_by_url:
+            entry["status"] = IngestStatus.DUPLICATE
+        else:
+            entries_by_url[normalized_url] = entry
+
+    existing = await sync_to_async(stored_recipe_ids)(list(entries_by_url))
+    failures = await alookup_failures([url for url in entries_by_url if url not in existing])
+    pending_urls = []
+    for normalized_url, entry in entries_by_url.items():
+        if normalized_url in existing:
+            entry.update(status=IngestStatus.EXISTS, id=existing[normalized_url])
+            continue
+        failure = failures.get(normalized_url)
+        if failure:
+            entry.update(status=IngestStatus.FAILED, error=failure.message, cached=True)
+        else:
+            pending_urls.append(normalized_url)
+
+    global_limit = asyncio.Semaphore(concurrency)
+    host_limits: Dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(per_host))
+    write_lock = asyncio.Lock()
+    buffer: List[Recipe] = []
+
+    async def flush() -> None:
+        async with write_lock:
+            if not buffer:
+                return
+            chunk = buffer[:]
+            buffer.clear()
+            ids, created = await sync_to_async(_write_chunk)(chunk)
+            for recipe in chunk:
+                status = IngestStatus.CREATED if recipe.source_url in created else IngestStatus.EXISTS
+                entries_by_url[recipe.source_url].update(status=status, id=ids.get(recipe.source_url))
+
+    async def ingest_one(normalized_url: str) -> None:
+        entry = entries_by_url[normalized_url]
+        # The normalized URL is only a storage key; fetch what was submitted.
+        fetch_url = entry["url"].strip()
+        # Wait for a per-host slot before taking a global one so a single slow
+        # host cannot tie up the whole pool.
+        async with host_limits[urlparse(normalized_url).netloc.lower()]:
+            async with global_limit:
+                try:
+                    page = await fetch_recipe_page_async(fetch_url)
+                    data = await sync_to_async(scrape_recipe_html, thread_sensitive=False)(page.html, fetch_url)
+                except Exception as exc:  # recipe_scrapers raises various exceptions per site
+                    await arecord_failure(normalized_url, exc)
+                    entry.update(status=IngestStatus.FAILED, error=str(exc))
+                    return
+        declared_url = declared_canonical_url(data, normalized_url)
+        if declared_url:
+            existing_id = await sync_to_async(_alias_declared_url)(normalized_url, declared_url)
+            if existing_id is not None:
+                entry.update(status=IngestStatus.EXISTS, id=existing_id)
+                return
+        fields = recipe_fields_from_scrape(data)
+        if skip_duplicates:
+            duplicate_of = await sync_to_async(_stored_duplicate)(fields)
+            if duplicate_of is not None:
+                entry.update(status=IngestStatus.NEAR_DUPLICATE, id=duplicate_of)
+                return
+        html_sha256 = await sync_to_async(store_html, thread_sensitive=False)(page.html)
+
+        buffer.append(
+            Recipe(
+                source_url=normalized_url,
+                type=RecipeType.URL,
+                html_sha256=html_sha256,
+                last_checked_at=timezone.now(),
+                **origin_validators(page),
+                **fields,
+            )
+        )
+        if len(buffer) >= chunk_size:
+            await flush()
+
+    await asyncio.gather(*(ingest_one(normalized_url) for normalized_url in pending_urls))
+    await flush()
+    return report
+
+
+def summarize_ingest_report(report: List[Dict[str, Any]]) -> Dict[str, int]:
+    return dict(Counter(entry["status"] for entry in report))
@@ -0,0 +1,403 @@
+"""In-memory inverted index for "cook with what I have" queries.
+
+Each recipe is indexed under the ingredient keys of its parsed ingredient
+rows (`RecipeIngredient.name`, reduced by `ingredient_keys`). Per key the
+index keeps a sorted `array` of recipe ids; keys used by many recipes also
+get a bitmap (a Python int with one bit per recipe id), built on first use.
+A query adds the bitmaps of the requested keys into bit-sliced counters, so
+"how many requested ingredients does each recipe have" costs a few big-int
+operations per key rather than a pass over every recipe, and then walks the
+recipes grouped by how many ingredients are missing.
+
+The index is loaded on first use from the snapshot written by
+`manage.py build_ingredient_index` (or built from the database if there is
+none) and then kept current: ingredient rows written by this process are
+applied on commit, and rows written by other processes are picked up every
+`RECIPE_INGREDIENT_INDEX_SYNC_INTERVAL` seconds by scanning ingredient rows
+newer than the last one seen. A recipe left with no rows at all writes none
+to find, so its id is logged as a `RecipeIngredientRemoval` and the sync
+scans those too. Writing a snapshot prunes the removals it covers and
+records how far it pruned; a process whose index is older than that
+rebuilds instead of syncing.
+"""
+
+import bisect
+import os
+import pickle
+import re
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+
+from .models import RecipeIngredient, RecipeIngredientRemoval, TableCounter
+
+SNAPSHOT_VERSION = 2
+
+# TableCounter row holding the last RecipeIngredientRemoval id pruned.
+PRUNED_REMOVALS_COUNTER = "ingredient-removals-pruned"
+
+# Keys with at least this many recipes keep their bitmap between queries.
+_CACHED_BITMAP_MIN_RECIPES = 1024
+
+_SEPARATORS = re.compile(r"\s+(?:and|or|&)\s+|\s*/\s*")
+_NON_WORD = re.compile(r"[^a-z\s-]+")
+_DESCRIPTORS = frozenset(
+    """
+    boneless chopped cooked crushed cubed diced dried extra fine finely fresh freshly frozen grated ground
+    halved large lean light low medium minced organic peeled pitted plain raw ripe roasted roughly salted
+    shredded skinless sliced small smoked soft softened thick thin thinly toasted trimmed unsalted virgin
+    warm whole canned
+    """.split()
+)
+
+
+def _singular(word: str) -> str:
+    if len(word) <= 3 or word.endswith(("ss", "us", "is")):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("oes", "ches", "shes", "xes")):
+        return word[:-2]
+    if word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+def ingredient_keys(name: str) -> List[str]:
+    """Index keys for an ingredient name: "Fresh tomatoes and basil" -> ["tomato", "basil"]."""
+
+    keys = []
+    for part in _SEPARATORS.split(name.lower()):
+        words = [word for word in _NON_WORD.sub(" ", part).split() if word not in _DESCRIPTORS]
+        if words:
+            words[-1] = _singular(words[-1])
+            keys.append(" ".join(words))
+    return keys
+
+
+def _bitmap(recipe_ids: Iterable[int], size: int) -> int:
+    buffer = bytearray(size // 8 + 1)
+    for recipe_id in recipe_ids:
+        buffer[recipe_id >> 3] |= 1 << (recipe_id & 7)
+    return int.from_bytes(buffer, "little")
+
+
+@dataclass(frozen=True)
+class IngredientMatch:
+    recipe_id: int
+    matched: int
+    total: int
+    missing_ingredients: List[str]
+
+    @property
+    def missing(self) -> int:
+        return self.total - self.matched
+
+
+class IngredientIndex:
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._reset()
+
+    def _reset(self) -> None:
+        self._key_ids: Dict[str, int] = {}
+        self._keys: List[str] = []
+        self._postings: List[array] = []
+        self._bitmaps: Dict[int, int] = {}
+        # Per recipe id: where its key ids start in _recipe_keys and how many there are.
+        self._offsets = array("q")
+        self._lengths = array("H")
+        self._recipe_keys = array("I")
+        # Number of keys -> bitmap of the recipes with that many.
+        self._by_total: Dict[int, int] = {}
+        self._synced_row_id = 0
+        self._synced_removal_id = 0
+        self._synced_at = 0.0
+
+    # -- maintenance ---------------------------------------------------------
+
+    def clear(self) -> None:
+        """Forget everything; the next query loads the index again."""
+
+        with self._lock:
+            self._reset()
+            self._loaded = False
+
+    def _key_id(self, key: str) -> int:
+        key_id = self._key_ids.get(key)
+        if key_id is None:
+            key_id = self._key_ids[key] = len(self._keys)
+            self._keys.append(key)
+            self._postings.append(array("I"))
+        return key_id
+
+    def _keys_of(self, recipe_id: int) -> array:
+        if recipe_id >= len(self._offsets) or self._offsets[recipe_id] < 0:
+            return array("I")
+        start = self._offsets[recipe_id]
+        return self._recipe_keys[start : start + self._lengths[recipe_id]]
+
+    def _set_recipe(self, recipe_id: int, names: Iterable[str], *, bulk: bool = False) -> None:
+        new = sorted({self._key_id(key) for name in names for key in ingredient_keys(name)})
+        old = list(self._keys_of(recipe_id))
+        if new == old:
+            return
+        bit = 1 << recipe_id
+
+        for key_id in set(old).difference(new):
+            postings = self._postings[key_id]
+            position = bisect.bisect_left(postings, recipe_id)
+            if position < len(postings) and postings[position] == recipe_id:
+                del postings[position]
+            if key_id in self._bitmaps:
+                self._bitmaps[key_id] &= ~bit
+        for key_id in set(new).difference(old):
+            bisect.insort(self._postings[key_id], recipe_id)
+            if key_id in self._bitmaps:
+                self._bitmaps[key_id] |= bit
+
+        if recipe_id >= len(self._offsets):
+            grow = recipe_id + 1 - len(self._offsets)
+            self._offsets.extend([-1] * grow)
+            self._lengths.extend([0] * grow)
+        if not bulk:
+            if old:
+                self._by_total[len(old)] &= ~bit
+            if new:
+                self._by_total[len(new)] = self._by_total.get(len(new), 0) | bit
+        if len(new) <= len(old):
+            start = self._offsets[recipe_id]
+            self._recipe_keys[start : start + len(new)] = array("I", new)
+        else:
+            self._offsets[recipe_id] = len(self._recipe_keys)
+            self._recipe_keys.extend(new)
+        self._lengths[recipe_id] = len(new)
+        if not new:
+            self._offsets[recipe_id] = -1
+
+    def _rebuild_totals(self) -> None:
+        buffers: Dict[int, bytearray] = {}
+        size = len(self._lengths) // 8 + 1
+        for recipe_id, total in enumerate(self._lengths):
+            if total:
+                buffer = buffers.get(total)
+                if buffer is None:
+                    buffer = buffers[total] = bytearray(size)
+                buffer[recipe_id >> 3] |= 1 << (recipe_id & 7)
+        self._by_total = {total: int.from_bytes(buffer, "little") for total, buffer in buffers.items()}
+
+    def _rows_by_recipe(self, queryset) -> Iterable[Tuple[int, List[str]]]:
+        current, names = None, []
+        rows = queryset.order_by("recipe_id", "position").values_list("recipe_id", "name")
+        for recipe_id, name in rows.iterator(chunk_size=5000):
+            if recipe_id != current:
+                if current is not None:
+                    yield current, names
+                current, names = recipe_id, []
+            names.append(name)
+        if current is not None:
+            yield current, names
+
+    def build(self) -> None:
+        """Rebuild the whole index from the stored ingredient rows."""
+
+        with self._lock:
+            self._reset()
+            synced_row_id = RecipeIngredient.objects.aggregate(last=Max("id"))["last"] or 0
+            synced_removal_id = RecipeIngredientRemoval.objects.aggregate(last=Max("id"))["last"] or 0
+            for recipe_id, names in self._rows_by_recipe(RecipeIngredient.objects.all()):
+                self._set_recipe(recipe_id, names, bulk=True)
+            self._rebuild_totals()
+            self._synced_row_id = synced_row_id
+            self._synced_removal_id = synced_removal_id
+            self._synced_at = time.monotonic()
+            self._loaded = True
+
+    def update_recipes(self, names_by_recipe: Dict[int, Iterable[str]]) -> None:
+        """Re-index recipes whose ingredient rows were rewritten; no-op until loaded."""
+
+        with self._lock:
+            if self._loaded:
+                for recipe_id, names in names_by_recipe.items():
+                    self._set_recipe(recipe_id, names)
+
+    def remove_recipe(self, recipe_id: int) -> None:
+        self.update_recipes({recipe_id: []})
+
+    def _sync(self) -> None:
+        pruned = TableCounter.objects.filter(name=PRUNED_REMOVALS_COUNTER).values_list("value", flat=True).first()
+        if pruned is not None and pruned > self._synced_removal_id:
+            # Removals this index has not seen are gone.
+            self.build()
+            return
+        rows = RecipeIngredient.objects.filter(id__gt=self._synced_row_id)
+        removals = RecipeIngredientRemoval.objects.filter(id__gt=self._synced_removal_id)
+        changed = rows.aggregate(last=Max("id"))["last"]
+        removed = removals.aggregate(last=Max("id"))["last"]
+        recipe_ids = set()
+        if changed is not None:
+            recipe_ids.update(rows.filter(id__lte=changed).values_list("recipe_id", flat=True))
+        if removed is not None:
+            recipe_ids.update(removals.filter(id__lte=removed).values_list("recipe_id", flat=True))
+        if recipe_ids:
+            names_by_recipe: Dict[int, List[str]] = {recipe_id: [] for recipe_id in recipe_ids}
+            for recipe_id, names in self._rows_by_recipe(RecipeIngredient.objects.filter(recipe_id__in=recipe_ids)):
+                names_by_recipe[recipe_id] = names
+            for recipe_id, names in names_by_recipe.items():
+                self._set_recipe(recipe_id, names)
+        self._synced_row_id = changed if changed is not None else self._synced_row_id
+        self._synced_removal_id = removed if removed is not None else self._synced_removal_id
+        self._synced_at = time.monotonic()
+
+    def ensure_current(self) -> None:
+        """Load the index on first use and pick up rows written elsewhere since the last sync."""
+
+        with self._lock:
+            if not self._loaded:
+                if not self.load_snapshot():
+                    self.build()
+                    return
+            if time.monotonic() - self._synced_at >= settings.RECIPE_INGREDIENT_INDEX_SYNC_INTERVAL:
+                self._sync()
+
+    # -- snapshots -----------------------------------------------------------
+
+    def save_snapshot(self, path: Path | None = None) -> Path:
+        path = Path(path or settings.RECIPE_INGREDIENT_INDEX_SNAPSHOT)
+        with self._lock:
+            # Compact: updates leave superseded key lists behind in _recipe_keys.
+            offsets, recipe_keys = array("q", [-1]) * len(self._offsets), array("I")
+            for recipe_id, length in enumerate(self._lengths):
+                if length:
+                    offsets[recipe_id] = len(recipe_keys)
+                    recipe_keys.extend(self._keys_of(recipe_id))
+            self._offsets, self._recipe_keys = offsets, recipe_keys
+            state = {
+                "version": SNAPSHOT_VERSION,
+                "keys": self._keys,
+                "postings": self._postings,
+                "offsets": self._offsets,
+                "lengths": self._lengths,
+                "recipe_keys": self._recipe_keys,
+                "by_total": self._by_total,
+                "synced_row_id": self._synced_row_id,
+                "synced_removal_id": self._synced_removal_id,
+            }
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            with open(temporary, "wb") as handle:
+                pickle.dump(state, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, path)
+            self._prune_removals(self._synced_removal_id)
+        return path
+
+    @staticmethod
+    def _prune_removals(through: int) -> None:
+        # Processes starting from the snapshot no longer need these; running
+        # ones that have not seen them yet rebuild (see _sync).
+        with transaction.atomic():
+            RecipeIngredientRemoval.objects.filter(id__lte=through).delete()
+            counter, _ = TableCounter.objects.get_or_create(name=PRUNED_REMOVALS_COUNTER)
+            if counter.value < through:
+                TableCounter.objects.filter(pk=counter.pk).update(value=through)
+
+    def load_snapshot(self, path: Path | None = None) -> bool:
+        """Replace the index with a snapshot; False if there is no usable one."""
+
+        path = Path(path or settings.RECIPE_INGREDIENT_INDEX_SNAPSHOT)
+        try:
+            with open(path, "rb") as handle:
+                state = pickle.load(handle)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return False
+        if not isinstance(state, dict) or state.get("version") != SNAPSHOT_VERSION:
+            return False
+        with self._lock:
+            self._reset()
+            self._keys = state["keys"]
+            self._key_ids = {key: key_id for key_id, key in enumerate(self._keys)}
+            self._postings = state["postings"]
+            self._offsets = state["offsets"]
+            self._lengths = state["lengths"]
+            self._recipe_keys = state["recipe_keys"]
+            self._by_total = state["by_total"]
+            self._synced_row_id = state["synced_row_id"]
+            self._synced_removal_id = state["synced_removal_id"]
+            self._loaded = True
+            # Catch up with rows written after the snapshot on first use.
+            self._synced_at = float("-inf")
+        return True
+
+    # -- queries -------------------------------------------------------------
+
+    def _key_bitmap(self, key_id: int) -> int:
+        bitmap = self._bitmaps.get(key_id)
+        if bitmap is None:
+            postings = self._postings[key_id]
+            bitmap = _bitmap(postings, len(self._offsets))
+            if len(postings) >= _CACHED_BITMAP_MIN_RECIPES:
+                self._bitmaps[key_id] = bitmap
+        return bitmap
+
+    def search(
+        self, names: Iterable[str], *, limit: int = 20, max_missing: int | None = None
+    ) -> List[IngredientMatch]:
+        """Recipes using any of `names`, fewest missing ingredients first, then most matched, newest first."""
+
+        self.ensure_current()
+        with self._lock:
+            wanted = {self._key_ids[key] for name in names for key in ingredient_keys(name) if key in self._key_ids}
+
+            # counts[i] holds bit i of "number of wanted keys" for every recipe.
+            counts: List[int] = []
+            for key_id in wanted:
+                carry = self._key_bitmap(key_id)
+                for position in range(len(counts)):
+                    counts[position], carry = counts[position] ^ carry, counts[position] & carry
+                    if not carry:
+                        break
+                if carry:
+                    counts.append(carry)
+            if not counts:
+                return []
+
+            mask = (1 << max(count.bit_length() for count in counts)) - 1
+            by_matched: Dict[int, int] = {}
+            for matched in range(min(len(wanted), (1 << len(counts)) - 1), 0, -1):
+                selected = mask
+                for position, count in enumerate(counts):
+                    selected &= count if matched >> position & 1 else count ^ mask
+                if selected:
+                    by_matched[matched] = selected
+
+            largest_total = max(self._by_total, default=0)
+            max_missing = largest_total if max_missing is None else min(max_missing, largest_total)
+            results: List[IngredientMatch] = []
+            for missing in range(max_missing + 1):
+                for matched, selected in by_matched.items():
+                    hits = selected & self._by_total.get(matched + missing, 0)
+                    while hits and len(results) < limit:
+                        recipe_id = hits.bit_length() - 1
+                        hits ^= 1 << recipe_id
+                        keys = self._keys_of(recipe_id)
+                        missing_keys = sorted(self._keys[key_id] for key_id in keys if key_id not in wanted)
+                        results.append(IngredientMatch(recipe_id, matched, len(keys), missing_keys))
+                    if len(results) >= limit:
+                        return results
+            return results
+
+    @property
+    def recipe_count(self) -> int:
+        with self._lock:
+            return sum(1 for length in self._lengths if length)
+
+
+ingredient_index = IngredientIndex()
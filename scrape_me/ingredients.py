@@ -0,0 +1,245 @@
+"""Structured ingredient lines: quantity, unit, name and notes.
+
+`Recipe.ingredients` keeps the lines as scraped. `parse_ingredient` splits one
+line with precompiled patterns and unit/fraction tables, and the results are
+stored as `RecipeIngredient` rows (one per line, indexed by name) so
+ingredient-aware queries do not re-parse text; writes are also applied to
+the in-memory ingredient index once committed. Rows are written whenever a
+saved recipe's ingredients change (a post_save hook) and by the bulk ingest
+and reparse paths; `manage.py parse_ingredients` backfills the rest,
+parsing in a process pool.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from django.db import transaction
+from django.db.models import QuerySet
+
+from .batching import map_batches
+from .ingredient_index import ingredient_index
+from .models import Recipe, RecipeIngredient, RecipeIngredientRemoval
+
+_FRACTIONS = {
+    "½": 1 / 2, "⅓": 1 / 3, "⅔": 2 / 3, "¼": 1 / 4, "¾": 3 / 4, "⅕": 1 / 5, "⅖": 2 / 5, "⅗": 3 / 5,
+    "⅘": 4 / 5, "⅙": 1 / 6, "⅚": 5 / 6, "⅛": 1 / 8, "⅜": 3 / 8, "⅝": 5 / 8, "⅞": 7 / 8,
+}
+_NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "half": 0.5, "dozen": 12,
+}
+# Canonical unit -> spellings accepted after a quantity (matched case-insensitively).
+_UNITS = {
+    "tsp": ["teaspoon", "teaspoons", "tsp", "tsps", "tspn"],
+    "tbsp": ["tablespoon", "tablespoons", "tbsp", "tbsps", "tbs", "tbl", "tblsp"],
+    "cup": ["cup", "cups", "c"],
+    "fl oz": ["fl oz", "fl. oz", "fluid ounce", "fluid ounces"],
+    "pint": ["pint", "pints", "pt"],
+    "quart": ["quart", "quarts", "qt"],
+    "gallon": ["gallon", "gallons", "gal"],
+    "ml": ["ml", "milliliter", "milliliters", "millilitre", "millilitres"],
+    "cl": ["cl", "centiliter", "centiliters"],
+    "dl": ["dl", "deciliter", "deciliters"],
+    "l": ["l", "liter", "liters", "litre", "litres"],
+    "mg": ["mg", "milligram", "milligrams"],
+    "g": ["g", "gr", "gram", "grams", "gramme", "grammes"],
+    "kg": ["kg", "kilo", "kilos", "kilogram", "kilograms"],
+    "oz": ["oz", "ounce", "ounces"],
+    "lb": ["lb", "lbs", "pound", "pounds"],
+    "pinch": ["pinch", "pinches"],
+    "dash": ["dash", "dashes"],
+    "clove": ["clove", "cloves"],
+    "can": ["can", "cans", "tin", "tins"],
+    "jar": ["jar", "jars"],
+    "package": ["package", "packages", "pkg", "packet", "packets"],
+    "slice": ["slice", "slices"],
+    "stick": ["stick", "sticks"],
+    "sprig": ["sprig", "sprigs"],
+    "bunch": ["bunch", "bunches"],
+    "handful": ["handful", "handfuls"],
+    "piece": ["piece", "pieces"],
+    "cm": ["cm", "centimeter", "centimeters", "centimetre", "centimetres"],
+    "inch": ["inch", "inches", "in"],
+}
+_UNIT_LOOKUP = {alias: unit for unit, aliases in _UNITS.items() for alias in aliases}
+
+_FRACTION_CHARS = "".join(_FRACTIONS)
+_NUMBER = (
+    rf"(?:\d+\s+\d+\s*/\s*\d+|\d+\s*/\s*\d+|\d+\s*[{_FRACTION_CHARS}]|[{_FRACTION_CHARS}]|\d+(?:[.,]\d+)?)"
+)
+_QUANTITY = re.compile(
+    rf"^(?P<low>{_NUMBER})(?:\s*(?:-|–|to)\s*(?P<high>{_NUMBER}))?"
+    rf"|^(?P<word>{'|'.join(sorted(_NUMBER_WORDS, key=len, reverse=True))})\b(?!\s+(?:few|couple|little|bit)\b)",
+    re.IGNORECASE,
+)
+# "(14 oz)" between quantity and unit, as in "1 (14 oz) can tomatoes".
+_SIZE = re.compile(r"^\s*\((?P<size>[^)]*)\)")
+_UNIT = re.compile(
+    rf"^\s*(?P<unit>{'|'.join(re.escape(alias) for alias in sorted(_UNIT_LOOKUP, key=len, reverse=True))})"
+    r"\.?(?![\w])(?:\s+of\b)?",
+    re.IGNORECASE,
+)
+_BULLET = re.compile(r"^(?:[-*•·–]|\d{1,2}[.)])\s+")
+_PARENTHETICAL = re.compile(r"\s*\(([^)]*)\)")
+_TRAILING_NOTE = re.compile(
+    r"[\s,]+(?P<note>to taste|as needed|optional|for serving|for garnish|plus more[^,]*|or more[^,]*)$",
+    re.IGNORECASE,
+)
+_SPACE = re.compile(r"\s+")
+_SLASH = re.compile(r"\s*/\s*")
+
+_NAME_LENGTH = RecipeIngredient._meta.get_field("name").max_length
+_NOTES_LENGTH = RecipeIngredient._meta.get_field("notes").max_length
+_UNIT_LENGTH = RecipeIngredient._meta.get_field("unit").max_length
+
+
+@dataclass(frozen=True)
+class ParsedIngredient:
+    quantity: float | None
+    quantity_max: float | None
+    unit: str
+    name: str
+    notes: str
+
+
+def _number(text: str) -> float:
+    text = _SLASH.sub("/", text.strip()).replace(",", ".")
+    if text[-1] in _FRACTIONS:
+        whole = text[:-1].strip()
+        return (float(whole) if whole else 0.0) + _FRACTIONS[text[-1]]
+    if "/" in text:
+        whole, _, fraction = text.rpartition(" ")
+        numerator, denominator = (float(part) for part in fraction.split("/"))
+        return (float(whole) if whole else 0.0) + (numerator / denominator if denominator else 0.0)
+    return float(text)
+
+
+def parse_ingredient(line: str) -> ParsedIngredient:
+    """Split one ingredient line, e.g. "1 ½ cups flour, sifted" -> 1.5, "cup", "flour", "sifted"."""
+
+    text = _BULLET.sub("", _SPACE.sub(" ", line).strip())
+    quantity = quantity_max = None
+    notes: List[str] = []
+
+    match = _QUANTITY.match(text)
+    if match:
+        if match.group("word"):
+            quantity = float(_NUMBER_WORDS[match.group("word").lower()])
+        else:
+            quantity = _number(match.group("low"))
+            if match.group("high"):
+                quantity_max = _number(match.group("high"))
+        text = text[match.end():]
+
+    size = _SIZE.match(text)
+    if size and quantity is not None:
+        notes.append(size.group("size").strip())
+        text = text[size.end():]
+
+    unit = ""
+    unit_match = _UNIT.match(text) if quantity is not None else None
+    if unit_match:
+        unit = _UNIT_LOOKUP[_SPACE.sub(" ", unit_match.group("unit").lower())]
+        text = text[unit_match.end():]
+
+    text = text.strip()
+    if quantity is not None and match.group("word") and not unit and text.lower().startswith("of "):
+        text = text[3:]
+
+    name, _, rest = text.partition(",")
+    notes.extend(part.strip() for part in _PARENTHETICAL.findall(name))
+    name = _PARENTHETICAL.sub("", name)
+    trailing = _TRAILING_NOTE.search(name)
+    if trailing:
+        notes.append(trailing.group("note"))
+        name = name[: trailing.start()]
+    if rest.strip():
+        notes.append(rest.strip())
+
+    return ParsedIngredient(
+        quantity=quantity,
+        quantity_max=quantity_max,
+        unit=unit[:_UNIT_LENGTH],
+        name=name.strip(" .-").lower()[:_NAME_LENGTH],
+        notes=", ".join(note for note in notes if note)[:_NOTES_LENGTH],
+    )
+
+
+def parse_ingredient_lines(lines: Iterable[str]) -> List[ParsedIngredient]:
+    return [parse_ingredient(line) for line in lines if isinstance(line, str) and line.strip()]
+
+
+def _write_parsed(parsed: Dict[int, List[ParsedIngredient]]) -> int:
+    rows = [
+        RecipeIngredient(
+            recipe_id=recipe_id,
+            position=position,
+            quantity=item.quantity,
+            quantity_max=item.quantity_max,
+            unit=item.unit,
+            name=item.name,
+            notes=item.notes,
+        )
+        for recipe_id, items in parsed.items()
+        for position, item in enumerate(items)
+    ]
+    emptied = [recipe_id for recipe_id, items in parsed.items() if not items]
+    with transaction.atomic():
+        if emptied:
+            # Other processes only notice new rows; tell them about recipes left without any.
+            cleared = RecipeIngredient.objects.filter(recipe_id__in=emptied).values_list("recipe_id", flat=True)
+            RecipeIngredientRemoval.objects.bulk_create(
+                RecipeIngredientRemoval(recipe_id=recipe_id) for recipe_id in set(cleared)
+            )
+        RecipeIngredient.objects.filter(recipe_id__in=list(parsed)).delete()
+        RecipeIngredient.objects.bulk_create(rows)
+        names = {recipe_id: [item.name for item in items] for recipe_id, items in parsed.items()}
+        transaction.on_commit(lambda: ingredient_index.update_recipes(names))
+    return len(rows)
+
+
+def store_recipe_ingredients(ingredients_by_recipe: Dict[int, Iterable[str]]) -> int:
+    """Replace the parsed ingredient rows of each recipe id; returns the rows written."""
+
+    return _write_parsed(
+        {recipe_id: parse_ingredient_lines(lines) for recipe_id, lines in ingredients_by_recipe.items()}
+    )
+
+
+@dataclass
+class BackfillStats:
+    recipes: int = 0
+    lines: int = 0
+
+
+def _parse_job(job: Tuple[int, List[str]]) -> Tuple[int, List[ParsedIngredient]]:
+    recipe_id, lines = job
+    return recipe_id, parse_ingredient_lines(lines if isinstance(lines, list) else [])
+
+
+def backfill_ingredients(
+    queryset: QuerySet | None = None,
+    *,
+    workers: int | None = None,
+    batch_size: int = 1000,
+    progress: Callable[[BackfillStats], None] | None = None,
+) -> BackfillStats:
+    """(Re)build the ingredient rows of every recipe in `queryset`.
+
+    `workers` defaults to one process per CPU; `workers=1` parses in this
+    process. Each batch is written in one transaction.
+    """
+
+    queryset = Recipe.objects.all() if queryset is None else queryset
+    stats = BackfillStats()
+
+    def apply(results: List[Tuple[int, List[ParsedIngredient]]]) -> None:
+        stats.lines += _write_parsed(dict(results))
+        stats.recipes += len(results)
+        if progress is not None:
+            progress(stats)
+
+    for results in map_batches(_parse_job, queryset, ("ingredients",), batch_size=batch_size, workers=workers):
+        apply(results)
+    return stats
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from scrape_me.duplicates import cluster_duplicates
+
+
+class Command(BaseCommand):
+    help = "Fingerprint recipes and link near-duplicates across the whole catalog."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild", action="store_true", help="Recompute every fingerprint, not only missing ones."
+        )
+        parser.add_argument("--workers", type=int, help="Fingerprinting processes (default: one per CPU).")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Recipes per write transaction.")
+
+    def handle(self, *args, **options):
+        if options["workers"] is not None and options["workers"] < 1:
+            raise CommandError("--workers must be at least 1.")
+
+        stats = cluster_duplicates(
+            rebuild=options["rebuild"],
+            workers=options["workers"],
+            batch_size=options["batch_size"],
+            progress=lambda stats: self.stderr.write(f"{stats.fingerprinted} recipes fingerprinted"),
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"fingerprinted: {stats.fingerprinted}, clusters: {stats.clusters}, duplicates: {stats.duplicates}"
+            )
+        )
@@ -0,0 +1,41 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from scrape_me.export import export_queryset, iter_export, parse_since
+
+
+class Command(BaseCommand):
+    help = "Write every stored recipe as NDJSON (one JSON object per line) to a file or stdout."
+
+    def add_arguments(self, parser):
+        parser.add_argument("-o", "--output", default="-", help="Output file; '-' (default) writes to stdout.")
+        parser.add_argument("--gzip", action="store_true", help="Gzip the output (implied by a .gz output name).")
+        parser.add_argument("--type", dest="recipe_type", help="Only export recipes of this type.")
+        parser.add_argument("--since", help="Only export recipes updated at or after this ISO date/datetime.")
+        parser.add_argument("--chunk-size", type=int, help="Rows fetched from the database per round trip.")
+
+    def handle(self, *args, **options):
+        output = options["output"]
+        compress = options["gzip"] or output.endswith(".gz")
+        try:
+            since = parse_since(options["since"]) if options["since"] else None
+            queryset = export_queryset(options["recipe_type"], since)
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+        chunks = iter_export(queryset, compress=compress, chunk_size=options["chunk_size"])
+
+        if output == "-":
+            stream = sys.stdout.buffer
+            for chunk in chunks:
+                stream.write(chunk)
+            stream.flush()
+            return
+
+        try:
+            with open(output, "wb") as handle:
+                for chunk in chunks:
+                    handle.write(chunk)
+        except OSError as exc:
+            raise CommandError(f"Cannot write {output}: {exc}") from exc
+        self.stderr.write(self.style.SUCCESS(f"Exported recipes to {output}"))
@@ -0,0 +1,56 @@
+import gzip
+import io
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from scrape_me.importing import import_recipe_lines
+
+
+def _open_lines(source: str):
+    if source == "-":
+        return sys.stdin
+    if source.endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(source, "rb"), encoding="utf-8")
+    return open(source, encoding="utf-8")
+
+
+class Command(BaseCommand):
+    help = "Import recipes from NDJSON files (one JSON object per line, optionally .gz) or stdin."
+
+    def add_arguments(self, parser):
+        parser.add_argument("files", nargs="*", help="NDJSON files; reads stdin when omitted.")
+        parser.add_argument("--batch-size", type=int, help="Rows written per transaction.")
+        parser.add_argument(
+            "--on-conflict",
+            choices=("update", "skip"),
+            default="update",
+            help="What to do with rows whose source_url is already stored (default: update).",
+        )
+        parser.add_argument("--quiet", action="store_true", help="Do not report progress after each batch.")
+
+    def handle(self, *args, **options):
+        def report_progress(stats):
+            self.stderr.write(f"{stats.processed} rows ({stats.rows_per_second:,.0f} rows/s)")
+
+        progress = None if options["quiet"] else report_progress
+        totals = {"created": 0, "updated": 0, "skipped": 0, "invalid": 0}
+        for source in options["files"] or ["-"]:
+            try:
+                with _open_lines(source) as lines:
+                    stats = import_recipe_lines(
+                        lines,
+                        batch_size=options["batch_size"],
+                        on_conflict=options["on_conflict"],
+                        progress=progress,
+                    )
+            except OSError as exc:
+                raise CommandError(f"Cannot read {source}: {exc}") from exc
+
+            for line_number, error in stats.errors:
+                self.stderr.write(self.style.WARNING(f"{source}:{line_number}: {error}"))
+            for key in totals:
+                totals[key] += getattr(stats, key)
+            self.stdout.write(f"{source}: {stats.processed} rows at {stats.rows_per_second:,.0f} rows/s")
+
+        self.stdout.write(self.style.SUCCESS(", ".join(f"{key}: {count}" for key, count in totals.items())))
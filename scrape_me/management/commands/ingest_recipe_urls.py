@@ -0,0 +1,59 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from scrape_me.ingest import ingest_recipe_urls, summarize_ingest_report
+
+
+class Command(BaseCommand):
+    help = "Scrape and store recipe URLs read from files (one per line) or stdin."
+
+    def add_arguments(self, parser):
+        parser.add_argument("files", nargs="*", help="Files with one URL per line; reads stdin when omitted.")
+        parser.add_argument("--concurrency", type=int, help="Maximum fetches in flight overall.")
+        parser.add_argument("--per-host", type=int, help="Maximum fetches in flight per host.")
+        parser.add_argument("--chunk-size", type=int, help="Rows written per bulk_create.")
+        parser.add_argument(
+            "--skip-duplicates",
+            action="store_true",
+            help="Do not store recipes whose content nearly matches a stored recipe.",
+        )
+        parser.add_argument("--json", action="store_true", help="Print the full report as JSON.")
+
+    def handle(self, *args, **options):
+        urls = []
+        for source in options["files"] or ["-"]:
+            if source == "-":
+                lines = sys.stdin.read().splitlines()
+            else:
+                try:
+                    lines = Path(source).read_text(encoding="utf-8").splitlines()
+                except OSError as exc:
+                    raise CommandError(f"Cannot read {source}: {exc}") from exc
+            urls.extend(line.strip() for line in lines if line.strip() and not line.startswith("#"))
+
+        if not urls:
+            raise CommandError("No URLs given.")
+
+        report = asyncio.run(
+            ingest_recipe_urls(
+                urls,
+                concurrency=options["concurrency"],
+                per_host=options["per_host"],
+                chunk_size=options["chunk_size"],
+                skip_duplicates=options["skip_duplicates"],
+            )
+        )
+        summary = summarize_ingest_report(report)
+
+        if options["json"]:
+            self.stdout.write(json.dumps({"results": report, "summary": summary}, indent=2))
+            return
+
+        for entry in report:
+            detail = entry.get("error") or (f"id={entry['id']}" if entry.get("id") else "")
+            self.stdout.write(f"{entry['status']:<14} {entry['url']} {detail}".rstrip())
+        self.stdout.write(self.style.SUCCESS(", ".join(f"{status}: {count}" for status, count in sorted(summary.items()))))
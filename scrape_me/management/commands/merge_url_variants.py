@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from scrape_me.canonical_urls import merge_url_variants
+
+
+class Command(BaseCommand):
+    help = "Rewrite stored recipe URLs to their canonical form and merge rows that are variants of one URL."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Recipes read per query.")
+        parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing.")
+
+    def handle(self, *args, **options):
+        stats = merge_url_variants(batch_size=options["batch_size"], dry_run=options["dry_run"])
+        prefix = "would be " if options["dry_run"] else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"scanned: {stats.scanned}, {prefix}renamed: {stats.renamed}, {prefix}merged: {stats.merged}"
+            )
+        )
@@ -0,0 +1,22 @@
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+
+from scrape_me.model_cache import MODEL_CACHE_ALIAS, model_cache_stats, reset_model_cache_stats
+
+
+class Command(BaseCommand):
+    help = "Show hit/miss totals of the convert-raw-recipe model result cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Zero the hit/miss totals after printing them.")
+        parser.add_argument("--clear", action="store_true", help="Also drop every cached model result.")
+
+    def handle(self, *args, **options):
+        stats = model_cache_stats()
+        hit_rate = "n/a" if stats["hit_rate"] is None else f"{stats['hit_rate']:.1%}"
+        self.stdout.write(f"hits: {stats['hits']}, misses: {stats['misses']}, hit rate: {hit_rate}")
+        if options["reset"]:
+            reset_model_cache_stats()
+        if options["clear"]:
+            caches[MODEL_CACHE_ALIAS].clear()
+            self.stdout.write("Cleared cached model results.")
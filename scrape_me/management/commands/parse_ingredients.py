@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from scrape_me.ingredients import backfill_ingredients
+from scrape_me.models import Recipe
+
+
+class Command(BaseCommand):
+    help = "Parse recipe ingredient lines into RecipeIngredient rows, in parallel."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all", action="store_true", help="Re-parse every recipe, not only those without parsed ingredients."
+        )
+        parser.add_argument("--workers", type=int, help="Parser processes (default: one per CPU).")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Recipes per write transaction.")
+
+    def handle(self, *args, **options):
+        if options["workers"] is not None and options["workers"] < 1:
+            raise CommandError("--workers must be at least 1.")
+
+        queryset = Recipe.objects.all()
+        if not options["all"]:
+            queryset = queryset.filter(parsed_ingredients__isnull=True)
+
+        stats = backfill_ingredients(
+            queryset,
+            workers=options["workers"],
+            batch_size=options["batch_size"],
+            progress=lambda stats: self.stderr.write(f"{stats.recipes} recipes parsed"),
+        )
+        self.stdout.write(self.style.SUCCESS(f"recipes: {stats.recipes}, ingredient lines: {stats.lines}"))
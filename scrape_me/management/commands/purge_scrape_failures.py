@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from scrape_me.failure_cache import purge_failures
+from scrape_me.normalizers import normalize_recipe_url
+
+
+class Command(BaseCommand):
+    help = "Forget cached scrape failures so the affected URLs are fetched again."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", action="append", default=[], help="Recipe URL to purge (repeatable).")
+        parser.add_argument("--domain", action="append", default=[], help="Domain to purge (repeatable).")
+        parser.add_argument("--all", action="store_true", help="Purge every cached failure.")
+
+    def handle(self, *args, **options):
+        urls = [normalize_recipe_url(url) for url in options["url"]]
+        domains = [domain.strip().lower() for domain in options["domain"]]
+        if not (urls or domains or options["all"]):
+            raise CommandError("Pass --url, --domain or --all.")
+        if options["all"] and (urls or domains):
+            raise CommandError("--all cannot be combined with --url or --domain.")
+
+        purge_failures(urls=urls, domains=domains)
+        self.stdout.write(self.style.SUCCESS("Purged cached scrape failures."))
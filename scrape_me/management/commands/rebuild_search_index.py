@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from scrape_me.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the SQLite FTS5 recipe search index from the recipe table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="Database alias to rebuild.")
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        if connection.vendor != "sqlite":
+            raise CommandError("The full-text search index is only available on SQLite.")
+
+        rebuild_search_index(connection)
+        self.stdout.write(self.style.SUCCESS("Rebuilt the recipe search index."))
@@ -0,0 +1,55 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from scrape_me.models import Recipe
+from scrape_me.normalizers import normalize_recipe_url
+from scrape_me.refresh import RefreshOutcome, refresh_recipe, stale_recipes
+from scrape_me.refresh_queue import enqueue_refresh
+
+
+class Command(BaseCommand):
+    help = "Revalidate stored recipes against their origin; unchanged pages cost only a 304."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", action="append", default=[], help="Refresh this recipe URL (repeatable).")
+        parser.add_argument(
+            "--older-than",
+            type=float,
+            help="Only refresh recipes not checked for this many seconds (default: RECIPE_REFRESH_AFTER).",
+        )
+        parser.add_argument("--limit", type=int, help="Refresh at most this many recipes.")
+        parser.add_argument(
+            "--enqueue",
+            action="store_true",
+            help="Queue the recipes for run_refresh_worker instead of refreshing them here.",
+        )
+
+    def handle(self, *args, **options):
+        if options["url"]:
+            urls = [normalize_recipe_url(url) for url in options["url"]]
+            recipes = Recipe.objects.filter(source_url__in=urls).order_by("pk")
+        else:
+            recipes = stale_recipes(options["older_than"])
+        if options["limit"]:
+            recipes = recipes[: options["limit"]]
+
+        if options["enqueue"]:
+            queued = 0
+            for recipe in recipes.iterator():
+                enqueue_refresh(recipe)
+                queued += 1
+            self.stdout.write(self.style.SUCCESS(f"Queued {queued} recipes for refresh."))
+            return
+
+        outcomes = Counter()
+        for recipe in recipes.iterator():
+            try:
+                outcome = refresh_recipe(recipe)
+            except Exception as exc:  # recipe_scrapers raises various exceptions per site
+                outcome = RefreshOutcome.FAILED
+                self.stderr.write(self.style.WARNING(f"{recipe.source_url}: {exc}"))
+            outcomes[outcome] += 1
+            self.stdout.write(f"{outcome:<12} {recipe.source_url}")
+
+        self.stdout.write(self.style.SUCCESS(", ".join(f"{key}: {count}" for key, count in sorted(outcomes.items()))))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from scrape_me.models import Recipe
+from scrape_me.normalizers import normalize_recipe_url
+from scrape_me.reparse import reparse_recipes
+
+
+class Command(BaseCommand):
+    help = "Rebuild scraped recipe fields from archived HTML, in parallel and without fetching anything."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", action="append", default=[], help="Only re-parse this recipe URL (repeatable).")
+        parser.add_argument("--workers", type=int, help="Parser processes (default: one per CPU).")
+        parser.add_argument("--batch-size", type=int, default=500, help="Recipes per write transaction.")
+        parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing.")
+
+    def handle(self, *args, **options):
+        if options["workers"] is not None and options["workers"] < 1:
+            raise CommandError("--workers must be at least 1.")
+
+        queryset = Recipe.objects.all()
+        if options["url"]:
+            queryset = queryset.filter(source_url__in=[normalize_recipe_url(url) for url in options["url"]])
+
+        stats = reparse_recipes(
+            queryset,
+            workers=options["workers"],
+            batch_size=options["batch_size"],
+            dry_run=options["dry_run"],
+            progress=lambda stats: self.stderr.write(f"{stats.processed} recipes re-parsed"),
+        )
+
+        for recipe_id, error in stats.errors:
+            self.stderr.write(self.style.WARNING(f"recipe {recipe_id}: {error}"))
+        verb = "would change" if options["dry_run"] else "changed"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb}: {stats.changed}, unchanged: {stats.unchanged}, "
+                f"missing html: {stats.missing}, failed: {stats.failed}"
+            )
+        )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from scrape_me.refresh_queue import run_worker
+
+
+class Command(BaseCommand):
+    help = "Run queued background recipe refreshes; start several processes to work in parallel."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Exit once no job is due instead of polling.")
+        parser.add_argument("--max-jobs", type=int, help="Exit after running this many jobs.")
+        parser.add_argument("--poll-interval", type=float, help="Seconds to sleep when no job can be claimed.")
+
+    def handle(self, *args, **options):
+        try:
+            processed = run_worker(
+                max_jobs=options["max_jobs"],
+                exit_when_idle=options["once"],
+                poll_interval=options["poll_interval"],
+            )
+        except KeyboardInterrupt:
+            # A job interrupted mid-run is retried once its lease expires.
+            self.stdout.write("Interrupted.")
+            return
+        self.stdout.write(self.style.SUCCESS(f"Ran {processed} refresh jobs."))
@@ -0,0 +1,46 @@
+import re
+import sys
+from urllib.parse import unquote_plus
+
+from django.core.management.base import BaseCommand, CommandError
+
+from scrape_me.canonical_urls import hit_rate_report
+
+# `url=` query parameter of a logged parse-recipe-url request line.
+_URL_PARAM = re.compile(r"[?&]url=([^&\s\"']+)")
+
+
+def _logged_url(line: str) -> str | None:
+    match = _URL_PARAM.search(line)
+    if match:
+        return unquote_plus(match.group(1))
+    line = line.strip()
+    return line.split()[0] if line else None
+
+
+class Command(BaseCommand):
+    help = "Compare the cache hit rate of logged recipe URLs under the old and the canonical URL keys."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "log",
+            help="File with one recipe URL or access-log line (with a url= parameter) per line; '-' reads stdin.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            stream = sys.stdin if options["log"] == "-" else open(options["log"], encoding="utf-8")
+        except OSError as exc:
+            raise CommandError(f"Cannot read {options['log']}: {exc}") from exc
+        with stream:
+            urls = [url for url in map(_logged_url, stream) if url]
+
+        report = hit_rate_report(urls)
+        self.stdout.write(f"requests: {report.requests}")
+        self.stdout.write(f"legacy URLs:    {report.legacy_keys} distinct, hit rate {report.legacy_rate:.1%}")
+        self.stdout.write(f"canonical URLs: {report.canonical_keys} distinct, hit rate {report.canonical_rate:.1%}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"improvement: {(report.canonical_rate - report.legacy_rate) * 100:+.1f} percentage points"
+            )
+        )
@@ -0,0 +1,354 @@
+"""Request and pipeline metrics, exposed at /metrics in the Prometheus text format.
+
+`MetricsMiddleware` times every request and counts the SQL it issues; hooks
+in the fetching, parsing, rendering and model code time those stages. Each
+observation increments a few numbers in this process's registry under one
+lock, so the overhead is a couple of microseconds.
+
+Worker processes share nothing, so with `METRICS_DIR` set every process
+writes its totals to its own file there (at most every
+`METRICS_FLUSH_INTERVAL` seconds, and at exit) and /metrics sums all the
+files, as prometheus_client's multiprocess mode does. Files of exited
+processes are kept so that totals never go backwards; empty the directory
+when deploying. Without `METRICS_DIR`, /metrics reports only the process
+that serves it.
+"""
+
+import atexit
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0, 30.0, 60.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+# Domains beyond this many distinct ones are reported as "other".
+MAX_DOMAINS = 200
+
+
+class Histogram:
+    """A labelled histogram; series are created on first observation."""
+
+    def __init__(self, registry: "MetricsRegistry", name: str, documentation: str, labelnames: Sequence[str], buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(float(bound) for bound in sorted(buckets))
+        self._registry = registry
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        # One count per bucket (not cumulative) plus +Inf, then the sum.
+        index = bisect.bisect_left(self.buckets, value)
+        registry = self._registry
+        with registry._lock:
+            series = registry._series[self.name].get(labelvalues)
+            if series is None:
+                series = registry._series[self.name][labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+            registry._changed()
+
+    @contextmanager
+    def time(self, *labelvalues: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labelvalues)
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Histogram] = {}
+        self._series: Dict[str, Dict[Tuple[str, ...], List[float]]] = {}
+        self._timer: threading.Timer | None = None
+        self._file_id = uuid.uuid4().hex
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets=LATENCY_BUCKETS):
+        metric = Histogram(self, name, documentation, labelnames, buckets)
+        self._metrics[name] = metric
+        self._series[name] = {}
+        return metric
+
+    def _changed(self) -> None:
+        # Called with the lock held.
+        if self._timer is None and settings.METRICS_DIR:
+            self._timer = threading.Timer(settings.METRICS_FLUSH_INTERVAL, self._timed_write)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def snapshot(self) -> Dict[str, Dict[str, list]]:
+        """This process's series: {metric: {"buckets": [...], "series": [[labelvalues, values], ...]}}."""
+
+        with self._lock:
+            return {
+                name: {
+                    "buckets": list(self._metrics[name].buckets),
+                    "series": [[list(labelvalues), list(values)] for labelvalues, values in series.items()],
+                }
+                for name, series in self._series.items()
+            }
+
+    def _path(self, directory: Path) -> Path:
+        return directory / f"metrics-{os.getpid()}-{self._file_id}.json"
+
+    def write(self) -> None:
+        """Write this process's totals to its file in METRICS_DIR (a no-op without one)."""
+
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not settings.METRICS_DIR:
+            return
+        directory = Path(settings.METRICS_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(directory)
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(self.snapshot()), encoding="utf-8")
+        os.replace(temporary, path)
+
+    def _timed_write(self) -> None:
+        with self._lock:
+            self._timer = None
+        try:
+            self.write()
+        except OSError:
+            logger.exception("Failed to write metrics to %s.", settings.METRICS_DIR)
+
+    def collect(self) -> Dict[str, Dict[Tuple[str, ...], List[float]]]:
+        """Series summed over every process that wrote to METRICS_DIR (or just this one)."""
+
+        snapshots = []
+        if settings.METRICS_DIR:
+            self.write()
+            for path in sorted(Path(settings.METRICS_DIR).glob("metrics-*.json")):
+                try:
+                    snapshots.append(json.loads(path.read_text(encoding="utf-8")))
+                except (OSError, ValueError):  # removed or half-written by hand; skip it
+                    continue
+        else:
+            snapshots.append(self.snapshot())
+
+        totals: Dict[str, Dict[Tuple[str, ...], List[float]]] = {name: {} for name in self._metrics}
+        for snapshot in snapshots:
+            for name, data in snapshot.items():
+                metric = self._metrics.get(name)
+                # Files from a deploy with other buckets cannot be summed with ours.
+                if metric is None or tuple(data["buckets"]) != metric.buckets:
+                    continue
+                for labelvalues, values in data["series"]:
+                    current = totals[name].setdefault(tuple(labelvalues), [0] * len(values))
+                    totals[name][tuple(labelvalues)] = [total + value for total, value in zip(current, values)]
+        return totals
+
+    def render(self) -> str:
+        """Prometheus text exposition of `collect()`."""
+
+        lines = []
+        for name, series in self.collect().items():
+            metric = self._metrics[name]
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} histogram")
+            bounds = [_format_bound(bound) for bound in metric.buckets] + ["+Inf"]
+            for labelvalues in sorted(series):
+                values = series[labelvalues]
+                labels = [f'{label}="{_escape(value)}"' for label, value in zip(metric.labelnames, labelvalues)]
+                cumulative = 0
+                for bound, count in zip(bounds, values):
+                    cumulative += count
+                    bucket_labels = ",".join(labels + [f'le="{bound}"'])
+                    lines.append(f"{name}_bucket{{{bucket_labels}}} {cumulative}")
+                selector = f"{{{','.join(labels)}}}" if labels else ""
+                lines.append(f"{name}_sum{selector} {float(values[-1])!r}")
+                lines.append(f"{name}_count{selector} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Drop this process's series (used by tests and in forked children)."""
+
+        with self._lock:
+            for series in self._series.values():
+                series.clear()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def _after_fork(self) -> None:
+        # The child starts from zero under its own file; the parent keeps reporting its totals.
+        self._lock = threading.Lock()
+        self._timer = None
+        self._file_id = uuid.uuid4().hex
+        for series in self._series.values():
+            series.clear()
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound))
+
+
+registry = MetricsRegistry()
+
+view_latency = registry.histogram(
+    "flavorbuddy_view_seconds", "Time spent handling a request, by view.", ("view", "method", "status")
+)
+view_sql_queries = registry.histogram(
+    "flavorbuddy_view_sql_queries", "SQL queries issued per request, by view.", ("view",), QUERY_COUNT_BUCKETS
+)
+view_sql_seconds = registry.histogram(
+    "flavorbuddy_view_sql_seconds", "Time spent in SQL per request, by view.", ("view",)
+)
+serialize_latency = registry.histogram(
+    "flavorbuddy_serialize_seconds", "Time spent rendering recipes to JSON, by response kind.", ("kind",)
+)
+scrape_fetch_latency = registry.histogram(
+    "flavorbuddy_scrape_fetch_seconds", "Time spent downloading recipe pages, by domain.", ("domain", "outcome"),
+    SLOW_BUCKETS,
+)
+scrape_parse_latency = registry.histogram(
+    "flavorbuddy_scrape_parse_seconds", "Time spent parsing recipe pages, by domain.", ("domain", "outcome")
+)
+model_call_latency = registry.histogram(
+    "flavorbuddy_model_call_seconds", "Time spent waiting for the recipe structuring model.", ("model", "outcome"),
+    SLOW_BUCKETS,
+)
+
+os.register_at_fork(after_in_child=registry._after_fork)
+
+
+@atexit.register
+def _write_on_exit() -> None:  # pragma: no cover - process shutdown
+    try:
+        registry.write()
+    except Exception:
+        logger.exception("Failed to write metrics at exit.")
+
+
+_domains: set = set()
+
+
+def domain_label(url: str) -> str:
+    """The URL's host without "www.", or "other" once MAX_DOMAINS distinct hosts have been seen."""
+
+    host = (urlsplit(url).hostname or "").removeprefix("www.")
+    if host in _domains:
+        return host
+    if len(_domains) >= MAX_DOMAINS:
+        return "other"
+    _domains.add(host)
+    return host
+
+
+@contextmanager
+def timed_stage(histogram: Histogram, *labelvalues: str) -> Iterator[None]:
+    """Time a block, adding an "ok" or "error" outcome label."""
+
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        histogram.observe(time.perf_counter() - started, *labelvalues, outcome)
+
+
+# -- per-request SQL cost -----------------------------------------------------
+
+
+class SqlCost:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.seconds = 0.0
+
+
+# Set by the middleware for the duration of a request. Context variables are
+# copied into sync_to_async threads, so queries run there are counted too.
+_request_sql: ContextVar[SqlCost | None] = ContextVar("request_sql", default=None)
+
+
+def _record_query(execute, sql, params, many, context):
+    cost = _request_sql.get()
+    if cost is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        cost.queries += 1
+        cost.seconds += time.perf_counter() - started
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """connection_created hook: count this connection's queries against the current request."""
+
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+class MetricsMiddleware:
+    """Record latency and SQL cost of every request, labelled by the view's URL name."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        cost = SqlCost()
+        token = _request_sql.set(cost)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_sql.reset(token)
+        self._observe(request, response, time.perf_counter() - started, cost)
+        return response
+
+    async def __acall__(self, request):
+        cost = SqlCost()
+        token = _request_sql.set(cost)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_sql.reset(token)
+        self._observe(request, response, time.perf_counter() - started, cost)
+        return response
+
+    @staticmethod
+    def _observe(request, response, elapsed: float, cost: SqlCost) -> None:
+        match = request.resolver_match
+        view = (match.url_name or match.view_name) if match else "unmatched"
+        view_latency.observe(elapsed, view, request.method, str(response.status_code))
+        view_sql_queries.observe(cost.queries, view)
+        view_sql_seconds.observe(cost.seconds, view)
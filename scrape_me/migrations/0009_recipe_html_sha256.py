@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scrape_me', '0008_tablecounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='html_sha256',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
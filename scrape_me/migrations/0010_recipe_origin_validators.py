@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scrape_me', '0009_recipe_html_sha256'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='last_checked_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='origin_etag',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='origin_last_modified',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:42
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scrape_me', '0010_recipe_origin_validators'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DomainThrottle',
+            fields=[
+                ('domain', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('next_allowed_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RefreshJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('domain', models.CharField(max_length=255)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('lease_token', models.CharField(blank=True, max_length=32)),
+                ('lease_expires_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('recipe', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='refresh_job', to='scrape_me.recipe')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['run_after'], name='refreshjob_run_after_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scrape_me', '0012_convertjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeIngredient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField()),
+                ('quantity', models.FloatField(blank=True, null=True)),
+                ('quantity_max', models.FloatField(blank=True, null=True)),
+                ('unit', models.CharField(blank=True, max_length=16)),
+                ('name', models.CharField(max_length=255)),
+                ('notes', models.CharField(blank=True, max_length=255)),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='parsed_ingredients', to='scrape_me.recipe')),
+            ],
+            options={
+                'ordering': ['recipe', 'position'],
+                'indexes': [models.Index(fields=['name'], name='recipeingredient_name_idx')],
+                'constraints': [models.UniqueConstraint(fields=('recipe', 'position'), name='recipeingredient_recipe_position_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scrape_me', '0013_recipeingredient'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeFingerprint',
+            fields=[
+                ('recipe', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='fingerprint', serialize=False, to='scrape_me.recipe')),
+                ('signature', models.BinaryField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='scrape_me.recipe'),
+        ),
+        migrations.CreateModel(
+            name='RecipeLshBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.BigIntegerField()),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='scrape_me.recipe')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['bucket', 'recipe'], name='recipelshbucket_bucket_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scrape_me', '0014_recipe_duplicates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.CharField(max_length=2048, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='scrape_me.recipe')),
+            ],
+        ),
+    ]
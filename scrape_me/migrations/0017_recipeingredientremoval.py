@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scrape_me', '0016_recipe_type_views_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeIngredientRemoval',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recipe_id', models.BigIntegerField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scrape_me', '0017_recipeingredientremoval'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScrapeFailureRecord',
+            fields=[
+                ('key', models.CharField(max_length=300, primary_key=True, serialize=False)),
+                ('error_class', models.CharField(max_length=255)),
+                ('message', models.TextField()),
+                ('failures', models.PositiveIntegerField()),
+                ('retry_at', models.FloatField()),
+                ('expires_at', models.FloatField()),
+                ('used_at', models.FloatField(db_index=True)),
+            ],
+        ),
+    ]
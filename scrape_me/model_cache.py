@@ -0,0 +1,105 @@
+"""Persistent cache of RecipeStruct model results for convert-raw-recipe.
+
+Results are stored in the `model_results` cache (a database cache, so they
+survive restarts and are shared by all workers) under a hash of everything
+that determines the model's answer: the system prompt, the model name, the
+normalized raw text and the source URL. Entries expire after
+`RECIPE_MODEL_CACHE_TTL` seconds and the cache culls itself beyond
+`MAX_ENTRIES`. Hit and miss totals are kept in `TableCounter` rows; each
+process tallies them in memory and adds its tallies to the rows every
+`RECIPE_MODEL_CACHE_STATS_FLUSH_INTERVAL` seconds and at exit, so lookups
+do not write to the database.
+"""
+
+import hashlib
+import json
+import re
+import unicodedata
+from collections import Counter
+from typing import Any, Callable, Dict
+
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .buffered_counts import BufferedCounts, flush_on_exit
+from .models import TableCounter
+
+MODEL_CACHE_ALIAS = "model_results"
+HIT_COUNTER = "model-cache-hits"
+MISS_COUNTER = "model-cache-misses"
+
+_HORIZONTAL_SPACE = re.compile(r"[^\S\n]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def normalize_raw_text(raw_text: str) -> str:
+    """Canonical form of pasted text: NFC, unified newlines, no trailing or repeated blanks."""
+
+    text = unicodedata.normalize("NFC", raw_text).replace("\r\n", "\n").replace("\r", "\n")
+    lines = [_HORIZONTAL_SPACE.sub(" ", line).strip() for line in text.split("\n")]
+    return _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
+
+
+def model_result_key(system_prompt: str, model: str, raw_text: str, source_url: str | None) -> str:
+    material = json.dumps(
+        [system_prompt, model, normalize_raw_text(raw_text), source_url or ""],
+        ensure_ascii=False,
+    )
+    return "recipe-struct:" + hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _add(name: str, increment: int) -> None:
+    if TableCounter.objects.filter(name=name).update(value=F("value") + increment):
+        return
+    try:
+        with transaction.atomic():
+            TableCounter.objects.create(name=name, value=increment)
+    except IntegrityError:
+        TableCounter.objects.filter(name=name).update(value=F("value") + increment)
+
+
+class ModelCacheCounts(BufferedCounts):
+    """Hit and miss tallies of this process, added to their counters in batches."""
+
+    interval_setting = "RECIPE_MODEL_CACHE_STATS_FLUSH_INTERVAL"
+    description = "model cache stats"
+
+    def write(self, batch: Counter) -> None:
+        for name, increment in batch.items():
+            _add(name, increment)
+
+
+model_cache_counts = flush_on_exit(ModelCacheCounts())
+
+
+def cached_model_result(key: str, call: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """Return the cached result for `key`, or run `call` and cache what it returns.
+
+    Errors raised by `call` propagate and are not cached.
+    """
+
+    cache = caches[MODEL_CACHE_ALIAS]
+    result = cache.get(key)
+    if result is not None:
+        model_cache_counts.record(HIT_COUNTER)
+        return result
+
+    model_cache_counts.record(MISS_COUNTER)
+    result = call()
+    cache.set(key, result)
+    return result
+
+
+def model_cache_stats() -> Dict[str, Any]:
+    """Totals over all processes; other processes' latest tallies may not be flushed yet."""
+
+    model_cache_counts.flush()
+    counts = dict(TableCounter.objects.filter(name__in=[HIT_COUNTER, MISS_COUNTER]).values_list("name", "value"))
+    hits, misses = counts.get(HIT_COUNTER, 0), counts.get(MISS_COUNTER, 0)
+    return {"hits": hits, "misses": misses, "hit_rate": hits / (hits + misses) if hits + misses else None}
+
+
+def reset_model_cache_stats() -> None:
+    model_cache_counts.discard()
+    TableCounter.objects.filter(name__in=[HIT_COUNTER, MISS_COUNTER]).delete()
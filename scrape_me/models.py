@@ -1,4 +1,8 @@
-from django.db import models
+import uuid
+from datetime import timedelta
+
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
 
 
 class RecipeType(models.TextChoices):
@@ -26,12 +30,32 @@ class Recipe(models.Model):
         choices=RecipeType.choices,
         default=RecipeType.USER_INPUT,
     )
+    # SHA-256 of the fetched page in the HTML store (scrape_me/html_store.py).
+    html_sha256 = models.CharField(max_length=64, blank=True, default="")
+    # Origin validators from the last full fetch, sent back on refresh so an
+    # unchanged page costs a 304 (see scrape_me/refresh.py).
+    origin_etag = models.CharField(max_length=255, blank=True, default="")
+    origin_last_modified = models.CharField(max_length=64, blank=True, default="")
+    last_checked_at = models.DateTimeField(null=True, blank=True)
+    # First stored recipe of this one's near-duplicate cluster (see
+    # scrape_me/duplicates.py); null for recipes that are not a copy.
+    duplicate_of = models.ForeignKey(
+        "self", null=True, blank=True, on_delete=models.SET_NULL, related_name="duplicates"
+    )
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        ordering = ["-created_at"]
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            # Serves the default ordering and keyset (cursor) pagination.
+            models.Index(fields=["-created_at", "-id"], name="recipe_created_id_idx"),
+            # Type-filtered exports and listings, in id order.
+            models.Index(fields=["type", "id"], name="recipe_type_id_idx"),
+            # Most-viewed ordering.
+            models.Index(fields=["-views", "-id"], name="recipe_views_id_idx"),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover - trivial representation
         if self.title:
@@ -42,11 +66,232 @@ class Recipe(models.Model):
             return f"Recipe {self.pk}"
         return "Recipe"
 
-    def save(self, *args, **kwargs):
+    def prepare_for_save(self) -> None:
+        """Apply the field clean-up done on save; call before `bulk_create`."""
+
         self.description = (self.description or "").strip()
         if self.source_url:
             if not self.type or self.type == RecipeType.USER_INPUT:
                 self.type = RecipeType.URL
         elif not self.type:
             self.type = RecipeType.USER_INPUT
+
+    def save(self, *args, **kwargs):
+        self.prepare_for_save()
         super().save(*args, **kwargs)
+
+
+class TableCounter(models.Model):
+    """Row counts maintained by database triggers (see scrape_me/counting.py)."""
+
+    name = models.CharField(max_length=64, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self) -> str:  # pragma: no cover - trivial representation
+        return f"{self.name}: {self.value}"
+
+
+class ScrapeLease(models.Model):
+    """Cross-process claim on scraping a URL so only one worker fetches it."""
+
+    url = models.URLField(unique=True)
+    token = models.CharField(max_length=32)
+    expires_at = models.DateTimeField()
+
+    def __str__(self) -> str:  # pragma: no cover - trivial representation
+        return self.url
+
+    @classmethod
+    def acquire(cls, url: str, ttl_seconds: float) -> str | None:
+        """Claim `url` for `ttl_seconds`; returns a release token, or None if held elsewhere."""
+
+        now = timezone.now()
+        cls.objects.filter(url=url, expires_at__lte=now).delete()
+        token = uuid.uuid4().hex
+        try:
+            with transaction.atomic():
+                cls.objects.create(url=url, token=token, expires_at=now + timedelta(seconds=ttl_seconds))
+        except IntegrityError:
+            return None
+        return token
+
+    @classmethod
+    def release(cls, url: str, token: str) -> None:
+        cls.objects.filter(url=url, token=token).delete()
+
+
+class RefreshJob(models.Model):
+    """A queued background refresh of one stored recipe (see scrape_me/refresh_queue.py).
+
+    There is at most one job per recipe, so enqueueing is idempotent. Workers
+    claim a job by taking its lease; a job whose lease has expired (its worker
+    died) can be claimed again. Finished jobs are deleted.
+    """
+
+    recipe = models.OneToOneField(Recipe, on_delete=models.CASCADE, related_name="refresh_job")
+    domain = models.CharField(max_length=255)
+    run_after = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    lease_token = models.CharField(max_length=32, blank=True)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["run_after"], name="refreshjob_run_after_idx")]
+
+    def __str__(self) -> str:  # pragma: no cover - trivial representation
+        return f"Refresh recipe {self.recipe_id}"
+
+    @classmethod
+    def claim(cls, job_id: int, lease_seconds: float) -> str | None:
+        """Lease a due, unclaimed job; returns the lease token, or None if another worker has it."""
+
+        now = timezone.now()
+        token = uuid.uuid4().hex
+        claimed = (
+            cls.objects.filter(pk=job_id, run_after__lte=now)
+            .filter(models.Q(lease_expires_at__isnull=True) | models.Q(lease_expires_at__lte=now))
+            .update(lease_token=token, lease_expires_at=now + timedelta(seconds=lease_seconds))
+        )
+        return token if claimed else None
+
+
+class DomainThrottle(models.Model):
+    """Earliest time the next background request to a domain may start, shared by all workers."""
+
+    domain = models.CharField(max_length=255, primary_key=True)
+    next_allowed_at = models.DateTimeField()
+
+    def __str__(self) -> str:  # pragma: no cover - trivial representation
+        return self.domain
+
+    @classmethod
+    def acquire(cls, domain: str, interval_seconds: float) -> bool:
+        """Take the domain's next request slot; False if it was used less than `interval_seconds` ago."""
+
+        now = timezone.now()
+        next_allowed_at = now + timedelta(seconds=interval_seconds)
+        if cls.objects.filter(domain=domain, next_allowed_at__lte=now).update(next_allowed_at=next_allowed_at):
+            return True
+        try:
+            with transaction.atomic():
+                cls.objects.create(domain=domain, next_allowed_at=next_allowed_at)
+        except IntegrityError:
+            return False
+        return True
+
+
+class ScrapeFailureRecord(models.Model):
+    """A remembered scrape failure for a URL or domain key (see scrape_me/failure_cache.py).
+
+    Times are Unix timestamps. `used_at` is bumped whenever the record answers
+    a lookup, so the least recently used records are evicted first.
+    """
+
+    key = models.CharField(max_length=300, primary_key=True)
+    error_class = models.CharField(max_length=255)
+    message = models.TextField()
+    failures = models.PositiveIntegerField()
+    retry_at = models.FloatField()
+    expires_at = models.FloatField()
+    used_at = models.FloatField(db_index=True)
+
+    def __str__(self) -> str:  # pragma: no cover - trivial representation
+        return self.key
+
+
+class ConvertJob(models.Model):
+    """A convert-raw-recipe request run in the background (see scrape_me/convert_jobs.py)."""
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        SUCCEEDED = "succeeded", "Succeeded"
+        FAILED = "failed", "Failed"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.QUEUED)
+    raw_text = models.TextField()
+    source_url = models.CharField(max_length=2048, blank=True, null=True)
+    persist = models.BooleanField(default=False)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    recipe = models.ForeignKey(Recipe, null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:  # pragma: no cover - trivial representation
+        return f"{self.id} ({self.status})"
+
+
+class RecipeIngredient(models.Model):
+    """One parsed line of `Recipe.ingredients` (see scrape_me/ingredients.py)."""
+
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name="parsed_ingredients")
+    # Index of the line in `Recipe.ingredients`.
+    position = models.PositiveSmallIntegerField()
+    quantity = models.FloatField(null=True, blank=True)
+    # Upper bound of a range such as "2-3 cloves".
+    quantity_max = models.FloatField(null=True, blank=True)
+    unit = models.CharField(max_length=16, blank=True)
+    name = models.CharField(max_length=255)
+    notes = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        ordering = ["recipe", "position"]
+        constraints = [
+            models.UniqueConstraint(fields=["recipe", "position"], name="recipeingredient_recipe_position_uniq"),
+        ]
+        indexes = [models.Index(fields=["name"], name="recipeingredient_name_idx")]
+
+    def __str__(self) -> str:  # pragma: no cover - trivial representation
+        return self.name
+
+
+class RecipeIngredientRemoval(models.Model):
+    """A recipe whose parsed ingredient rows were all removed.
+
+    Other processes find rewritten recipes by scanning for new ingredient
+    rows; a recipe left with none writes no rows, so it is logged here
+    instead (see scrape_me/ingredient_index.py).
+    """
+
+    recipe_id = models.BigIntegerField()
+
+    def __str__(self) -> str:  # pragma: no cover - trivial representation
+        return f"Ingredients of recipe {self.recipe_id} removed"
+
+
+class RecipeFingerprint(models.Model):
+    """MinHash signature of a recipe's content (see scrape_me/duplicates.py)."""
+
+    recipe = models.OneToOneField(Recipe, on_delete=models.CASCADE, primary_key=True, related_name="fingerprint")
+    signature = models.BinaryField()
+
+    def __str__(self) -> str:  # pragma: no cover - trivial representation
+        return f"Fingerprint of recipe {self.recipe_id}"
+
+
+class RecipeLshBucket(models.Model):
+    """One LSH band of a recipe's fingerprint; recipes sharing a bucket are duplicate candidates."""
+
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name="+")
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        indexes = [models.Index(fields=["bucket", "recipe"], name="recipelshbucket_bucket_idx")]
+
+    def __str__(self) -> str:  # pragma: no cover - trivial representation
+        return f"{self.bucket} -> {self.recipe_id}"
+
+
+class RecipeAlias(models.Model):
+    """Another canonical URL that serves a stored recipe (see scrape_me/canonical_urls.py)."""
+
+    url = models.CharField(max_length=2048, unique=True)
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name="aliases")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:  # pragma: no cover - trivial representation
+        return f"{self.url} -> {self.recipe_id}"
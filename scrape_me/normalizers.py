@@ -0,0 +1,106 @@
+from collections.abc import Iterable
+from typing import Any, Dict, List
+from urllib.parse import urlparse
+
+from .canonical_urls import canonicalize_recipe_url
+
+
+def normalize_recipe_url(url: str) -> str:
+    """Return the canonical form of a recipe URL (see `canonicalize_recipe_url`)."""
+
+    return canonicalize_recipe_url(url)
+
+
+def is_scrapable_url(normalized_url: str) -> bool:
+    """Return True for absolute http(s) URLs that can be handed to the scraper."""
+
+    parsed = urlparse(normalized_url)
+    return parsed.scheme in {"http", "https"} and bool(parsed.netloc)
+
+
+def normalize_instructions(raw_instructions: Any) -> List[str]:
+    """Convert instructions payload into a list of cleaned steps."""
+
+    if not raw_instructions:
+        return []
+
+    if isinstance(raw_instructions, str):
+        normalized = raw_instructions.replace("\r\n", "\n")
+        steps = [step.strip() for step in normalized.split("\n") if step.strip()]
+        return steps or [raw_instructions.strip()]
+
+    if isinstance(raw_instructions, Iterable):
+        cleaned_steps: List[str] = []
+        for step in raw_instructions:
+            if isinstance(step, str):
+                trimmed = step.strip()
+                if trimmed:
+                    cleaned_steps.append(trimmed)
+        return cleaned_steps
+
+    return []
+
+
+def normalize_description(raw_description: Any) -> str:
+    """Convert description payload to a cleaned string."""
+
+    if not raw_description:
+        return ""
+
+    if isinstance(raw_description, str):
+        return raw_description.strip()
+
+    if isinstance(raw_description, dict):
+        for key in ("text", "description", "value"):
+            value = raw_description.get(key)
+            if isinstance(value, str):
+                stripped = value.strip()
+                if stripped:
+                    return stripped
+        return ""
+
+    if isinstance(raw_description, Iterable):
+        parts: List[str] = []
+        for item in raw_description:
+            if isinstance(item, str):
+                trimmed = item.strip()
+                if trimmed:
+                    parts.append(trimmed)
+            elif isinstance(item, dict):
+                nested = normalize_description(item)
+                if nested:
+                    parts.append(nested)
+            else:
+                nested = normalize_description(item)
+                if nested:
+                    parts.append(nested)
+
+        return " ".join(parts)
+
+    coerced = str(raw_description).strip()
+    return coerced if coerced else ""
+
+
+def recipe_fields_from_scrape(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a recipe_scrapers JSON payload onto Recipe model fields."""
+
+    ingredients = data.get("ingredients") or []
+    if isinstance(ingredients, str):
+        ingredients = [line.strip() for line in ingredients.splitlines() if line.strip()]
+
+    total_time = data.get("total_time")
+    try:
+        total_time_value = int(total_time) if total_time is not None else None
+    except (TypeError, ValueError):
+        total_time_value = None
+
+    return {
+        "description": normalize_description(data.get("description")),
+        "title": data.get("title", ""),
+        "author": data.get("author", ""),
+        "total_time": total_time_value,
+        "yields": data.get("yields", ""),
+        "image": data.get("image", ""),
+        "ingredients": ingredients,
+        "instructions": normalize_instructions(data.get("instructions")),
+    }
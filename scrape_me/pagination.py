@@ -0,0 +1,83 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Tuple
+
+from django.db.models import Q, QuerySet
+
+from .models import Recipe
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Position in the `(-created_at, -id)` ordering plus the paging direction."""
+
+    created_at: datetime
+    id: int
+    backwards: bool = False
+
+    def encode(self) -> str:
+        payload = json.dumps([self.created_at.isoformat(), self.id, int(self.backwards)], separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "Cursor":
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            created_at, recipe_id, backwards = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            return cls(datetime.fromisoformat(created_at), int(recipe_id), bool(backwards))
+        except (binascii.Error, UnicodeError, ValueError, TypeError) as exc:
+            raise InvalidCursor("Invalid 'cursor' parameter.") from exc
+
+    @classmethod
+    def for_recipe(cls, recipe: Recipe, backwards: bool = False) -> "Cursor":
+        return cls(recipe.created_at, recipe.id, backwards)
+
+
+def keyset_page(
+    queryset: QuerySet, cursor: Cursor | None, page_size: int
+) -> Tuple[List[Recipe], str | None, str | None]:
+    """Return one page in newest-first order with `(results, next_cursor, prev_cursor)`.
+
+    Pages are anchored on `(created_at, id)` rather than an offset, so deep
+    pages stay as cheap as the first one (via the matching composite index)
+    and rows inserted meanwhile never shift items between pages.
+    """
+
+    if cursor is None:
+        rows = list(queryset.order_by("-created_at", "-id")[: page_size + 1])
+        has_next, has_previous = len(rows) > page_size, False
+    elif not cursor.backwards:
+        rows = list(
+            queryset.filter(
+                # The redundant `<=` bound lets SQLite seek into the index
+                # instead of scanning it from the top.
+                Q(created_at__lte=cursor.created_at),
+                Q(created_at__lt=cursor.created_at) | Q(id__lt=cursor.id),
+            )
+            .order_by("-created_at", "-id")[: page_size + 1]
+        )
+        has_next, has_previous = len(rows) > page_size, True
+    else:
+        rows = list(
+            queryset.filter(
+                Q(created_at__gte=cursor.created_at),
+                Q(created_at__gt=cursor.created_at) | Q(id__gt=cursor.id),
+            )
+            .order_by("created_at", "id")[: page_size + 1]
+        )
+        has_next, has_previous = True, len(rows) > page_size
+
+    results = rows[:page_size]
+    if cursor is not None and cursor.backwards:
+        results.reverse()
+
+    next_cursor = Cursor.for_recipe(results[-1]).encode() if results and has_next else None
+    prev_cursor = Cursor.for_recipe(results[0], backwards=True).encode() if results and has_previous else None
+    return results, next_cursor, prev_cursor
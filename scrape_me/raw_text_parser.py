@@ -0,0 +1,162 @@
+"""Local fast path for convert-raw-recipe.
+
+Much pasted text is already laid out as a recipe: a title, an "Ingredients"
+heading followed by one ingredient per line, and an "Instructions" (or
+"Directions", "Method", ...) heading followed by bulleted or numbered steps.
+`parse_raw_recipe` reads that layout with a handful of precompiled patterns
+and scores how well the text fits it. Callers answer from the local result
+when the score reaches `RECIPE_LOCAL_PARSE_MIN_CONFIDENCE` and otherwise ask
+the model.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from .model_cache import normalize_raw_text
+from .normalizers import normalize_instructions
+
+_INGREDIENTS = "ingredients"
+_INSTRUCTIONS = "instructions"
+_NOTES = "notes"
+
+_HEADING = re.compile(
+    r"^(?:#{1,6}\s*)?(?P<name>ingredients?|instructions?|directions?|method|preparation|steps|notes?|tips)"
+    r"\s*:?\s*$",
+    re.IGNORECASE,
+)
+_SECTIONS = {
+    "ingredient": _INGREDIENTS,
+    "ingredients": _INGREDIENTS,
+    "instruction": _INSTRUCTIONS,
+    "instructions": _INSTRUCTIONS,
+    "direction": _INSTRUCTIONS,
+    "directions": _INSTRUCTIONS,
+    "method": _INSTRUCTIONS,
+    "preparation": _INSTRUCTIONS,
+    "steps": _INSTRUCTIONS,
+    "note": _NOTES,
+    "notes": _NOTES,
+    "tips": _NOTES,
+}
+
+# "- 2 eggs", "* salt", "• flour", "1. Mix", "2) Bake", "Step 3: Serve"
+_BULLET = re.compile(r"^(?:[-*•·–]\s+|\d{1,2}\s*[.)]\s+|step\s+\d{1,2}\s*[:.)-]?\s*)", re.IGNORECASE)
+_QUANTITY = re.compile(r"^(?:\d|[¼-¾⅐-⅞]|an?\s|one\s|two\s|three\s|half\s|pinch\s|handful\s)", re.IGNORECASE)
+_SUBHEADING = re.compile(r"^for the .{1,60}:$", re.IGNORECASE)
+
+_YIELDS = re.compile(r"^(?:serves|servings|yields?|makes)\s*:?\s*(?P<value>.+)$", re.IGNORECASE)
+_TIME = re.compile(r"^(?P<kind>total|prep|preparation|cook|cooking)\s+time\s*:?\s*(?P<value>.+)$", re.IGNORECASE)
+_TIME_KINDS = {"total": "total", "prep": "prep", "preparation": "prep", "cook": "cook", "cooking": "cook"}
+_HOURS = re.compile(r"(\d+(?:\.\d+)?)\s*(?:h|hrs?|hours?)\b", re.IGNORECASE)
+_MINUTES = re.compile(r"(\d+)\s*(?:m|mins?|minutes?)\b", re.IGNORECASE)
+
+_MAX_TITLE_LENGTH = 120
+
+# Score weights; they sum to 1.0. Both sections must be present to score at all.
+_SECTIONS_WEIGHT = 0.4
+_TITLE_WEIGHT = 0.2
+_INGREDIENT_LINES_WEIGHT = 0.2
+_INSTRUCTION_LINES_WEIGHT = 0.2
+
+
+@dataclass
+class LocalParse:
+    result: Dict[str, Any]
+    confidence: float
+
+
+def _minutes(text: str) -> int | None:
+    hours = sum(float(value) for value in _HOURS.findall(text))
+    minutes = sum(int(value) for value in _MINUTES.findall(text))
+    if not hours and not minutes:
+        return None
+    return round(hours * 60) + minutes
+
+
+def _looks_like_ingredient(line: str) -> bool:
+    return bool(_QUANTITY.match(line)) or (len(line) <= 60 and not line.endswith("."))
+
+
+def _looks_like_step(line: str) -> bool:
+    return len(line.split()) >= 3
+
+
+def parse_raw_recipe(raw_text: str, source_url: str | None = None) -> LocalParse:
+    """Split well-structured recipe text into Recipe fields, with a 0..1 confidence."""
+
+    sections: Dict[str, List[str]] = {_INGREDIENTS: [], _INSTRUCTIONS: [], _NOTES: []}
+    preamble: List[str] = []
+    current: str | None = None
+    bulleted_steps = 0
+
+    for line in normalize_raw_text(raw_text).split("\n"):
+        if not line:
+            continue
+        heading = _HEADING.match(line)
+        if heading:
+            current = _SECTIONS[heading.group("name").lower()]
+            continue
+        if current is None:
+            preamble.append(line)
+            continue
+        if current == _INGREDIENTS and _SUBHEADING.match(line):
+            continue
+        bullet = _BULLET.match(line)
+        if bullet:
+            line = line[bullet.end():].strip()
+            if current == _INSTRUCTIONS:
+                bulleted_steps += 1
+        if line:
+            sections[current].append(line)
+
+    title = ""
+    yields = ""
+    times: Dict[str, int] = {}
+    description: List[str] = []
+    for index, line in enumerate(preamble):
+        yields_match = _YIELDS.match(line)
+        time_match = _TIME.match(line)
+        if yields_match:
+            yields = yields_match.group("value").strip()
+        elif time_match:
+            minutes = _minutes(time_match.group("value"))
+            if minutes is not None:
+                times[_TIME_KINDS[time_match.group("kind").lower()]] = minutes
+        elif index == 0 and len(line) <= _MAX_TITLE_LENGTH and not line.endswith("."):
+            title = line.lstrip("#").strip()
+        else:
+            description.append(line)
+
+    total_time = times.get("total")
+    if total_time is None and ("prep" in times or "cook" in times):
+        total_time = times.get("prep", 0) + times.get("cook", 0)
+
+    ingredients = sections[_INGREDIENTS]
+    instructions = normalize_instructions(sections[_INSTRUCTIONS])
+    result = {
+        "source_url": source_url,
+        "title": title,
+        "description": " ".join(description + sections[_NOTES]),
+        "author": "",
+        "total_time": total_time,
+        "yields": yields,
+        "image": "",
+        "ingredients": ingredients,
+        "instructions": instructions,
+    }
+
+    confidence = 0.0
+    if ingredients and instructions:
+        confidence = _SECTIONS_WEIGHT
+        if title:
+            confidence += _TITLE_WEIGHT
+        confidence += _INGREDIENT_LINES_WEIGHT * (
+            sum(_looks_like_ingredient(line) for line in ingredients) / len(ingredients)
+        )
+        # One unnumbered paragraph under "Method" is usually several steps run together.
+        step_score = sum(_looks_like_step(line) for line in instructions) / len(instructions)
+        if len(instructions) == 1 and not bulleted_steps:
+            step_score /= 2
+        confidence += _INSTRUCTION_LINES_WEIGHT * step_score
+    return LocalParse(result=result, confidence=round(confidence, 3))
@@ -0,0 +1,80 @@
+"""Refreshing stored recipes from their origin with conditional requests.
+
+Each full fetch stores the origin's `ETag` / `Last-Modified` on the recipe.
+A refresh sends them back as `If-None-Match` / `If-Modified-Since`; on a
+304 only `last_checked_at` is written and nothing is downloaded or parsed.
+"""
+
+from datetime import timedelta
+from typing import Any, Dict
+
+from django.conf import settings
+from django.db.models import QuerySet
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .duplicates import fingerprint_recipe
+from .fetching import FetchedPage, fetch_recipe_page, scrape_recipe_html
+from .html_store import store_html
+from .models import Recipe
+from .normalizers import recipe_fields_from_scrape
+
+
+class RefreshOutcome:
+    NOT_MODIFIED = "not_modified"
+    UPDATED = "updated"
+    FAILED = "failed"
+
+
+def origin_validators(page: FetchedPage) -> Dict[str, Any]:
+    """Recipe field values for the validators of a freshly fetched page."""
+
+    etag_field = Recipe._meta.get_field("origin_etag")
+    last_modified_field = Recipe._meta.get_field("origin_last_modified")
+    return {
+        # A truncated validator would never match, so oversized ones are dropped.
+        "origin_etag": page.etag if len(page.etag) <= etag_field.max_length else "",
+        "origin_last_modified": (
+            page.last_modified if len(page.last_modified) <= last_modified_field.max_length else ""
+        ),
+    }
+
+
+def stale_recipes(max_age: float | None = None) -> QuerySet:
+    """Scraped recipes not checked against their origin for `max_age` seconds, oldest first.
+
+    Recipes never revalidated count from when they were scraped.
+    """
+
+    max_age = settings.RECIPE_REFRESH_AFTER if max_age is None else max_age
+    cutoff = timezone.now() - timedelta(seconds=max_age)
+    return (
+        Recipe.objects.exclude(source_url=None)
+        .alias(checked_at=Coalesce("last_checked_at", "created_at"))
+        .filter(checked_at__lt=cutoff)
+        .order_by("checked_at", "pk")
+    )
+
+
+def refresh_recipe(recipe: Recipe) -> str:
+    """Revalidate one scraped recipe against its origin; returns a RefreshOutcome.
+
+    Fetch and parse errors propagate to the caller; the stored row is left
+    untouched in that case.
+    """
+
+    page = fetch_recipe_page(recipe.source_url, recipe.origin_etag, recipe.origin_last_modified)
+    now = timezone.now()
+    if page is None:
+        # Deliberately not save(): updated_at (and the render cache) stay put.
+        Recipe.objects.filter(pk=recipe.pk).update(last_checked_at=now)
+        recipe.last_checked_at = now
+        return RefreshOutcome.NOT_MODIFIED
+
+    fields = recipe_fields_from_scrape(scrape_recipe_html(page.html, recipe.source_url))
+    fields.update(origin_validators(page), html_sha256=store_html(page.html), last_checked_at=now)
+    for name, value in fields.items():
+        setattr(recipe, name, value)
+    recipe.save(update_fields=[*fields, "updated_at"])
+    fingerprint_recipe(recipe)
+    return RefreshOutcome.UPDATED
@@ -0,0 +1,138 @@
+"""Stale-while-revalidate: background refresh jobs kept in the database.
+
+`parse_recipe_url` always answers from the stored row. When that row has not
+been checked against its origin for `RECIPE_REFRESH_AFTER` seconds it also
+enqueues a `RefreshJob`, which a `manage.py run_refresh_worker` process picks
+up later:
+
+* jobs are unique per recipe, so repeat hits never queue duplicates;
+* workers claim jobs with a lease, so a job is run by one worker at a time
+  and is picked up again if its worker dies;
+* `DomainThrottle` spaces requests to each origin across all workers;
+* failed jobs are retried with exponential backoff and dropped after
+  `RECIPE_REFRESH_MAX_ATTEMPTS`.
+"""
+
+import logging
+import time
+from datetime import timedelta
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import DomainThrottle, Recipe, RefreshJob
+from .refresh import refresh_recipe
+
+logger = logging.getLogger(__name__)
+
+# Seconds a recipe is remembered as queued in the cache, so hot stale
+# recipes cost one cache lookup per hit instead of one INSERT.
+_ENQUEUE_MEMO_SECONDS = 60
+
+# Due jobs looked at per claim attempt; jobs on throttled domains are skipped.
+_CLAIM_SCAN = 50
+
+
+def is_stale(recipe: Recipe) -> bool:
+    """True if a scraped recipe has not been checked for `RECIPE_REFRESH_AFTER` seconds."""
+
+    if not recipe.source_url:
+        return False
+    checked_at = recipe.last_checked_at or recipe.created_at
+    return checked_at < timezone.now() - timedelta(seconds=settings.RECIPE_REFRESH_AFTER)
+
+
+def enqueue_refresh(recipe: Recipe) -> None:
+    """Queue a background refresh of `recipe` unless one is already queued."""
+
+    if not cache.add(f"refresh-queued:{recipe.pk}", True, timeout=_ENQUEUE_MEMO_SECONDS):
+        return
+    job = RefreshJob(recipe_id=recipe.pk, domain=urlparse(recipe.source_url).netloc.lower())
+    RefreshJob.objects.bulk_create([job], ignore_conflicts=True)
+
+
+def enqueue_if_stale(recipe: Recipe) -> bool:
+    if not is_stale(recipe):
+        return False
+    enqueue_refresh(recipe)
+    return True
+
+
+def _due_jobs():
+    now = timezone.now()
+    return RefreshJob.objects.filter(run_after__lte=now).filter(
+        Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lte=now)
+    )
+
+
+def claim_next_job() -> RefreshJob | None:
+    """Lease the oldest due job whose domain may be fetched now, if any."""
+
+    throttled = set()
+    for job in _due_jobs().select_related("recipe").order_by("run_after", "pk")[:_CLAIM_SCAN]:
+        if job.domain in throttled:
+            continue
+        if not DomainThrottle.acquire(job.domain, settings.RECIPE_REFRESH_DOMAIN_INTERVAL):
+            throttled.add(job.domain)
+            continue
+        token = RefreshJob.claim(job.pk, settings.RECIPE_REFRESH_LEASE_SECONDS)
+        if token:
+            job.lease_token = token
+            return job
+    return None
+
+
+def retry_delay(attempts: int) -> float:
+    return min(settings.RECIPE_REFRESH_RETRY_BASE * 2 ** (attempts - 1), settings.RECIPE_REFRESH_RETRY_MAX)
+
+
+def _fail_job(job: RefreshJob, exc: Exception) -> None:
+    attempts = job.attempts + 1
+    leased = RefreshJob.objects.filter(pk=job.pk, lease_token=job.lease_token)
+    if attempts >= settings.RECIPE_REFRESH_MAX_ATTEMPTS:
+        logger.warning("Giving up refreshing %s after %d attempts: %s", job.recipe.source_url, attempts, exc)
+        leased.delete()
+        # Serve the stored copy for another full window before trying again.
+        Recipe.objects.filter(pk=job.recipe_id).update(last_checked_at=timezone.now())
+        return
+    leased.update(
+        attempts=attempts,
+        last_error=f"{type(exc).__name__}: {exc}",
+        run_after=timezone.now() + timedelta(seconds=retry_delay(attempts)),
+        lease_token="",
+        lease_expires_at=None,
+    )
+
+
+def run_job(job: RefreshJob) -> bool:
+    """Refresh the job's recipe and settle the job; returns True on success."""
+
+    try:
+        outcome = refresh_recipe(job.recipe)
+    except Exception as exc:  # recipe_scrapers raises various exceptions per site
+        _fail_job(job, exc)
+        return False
+    logger.info("Refreshed %s: %s", job.recipe.source_url, outcome)
+    RefreshJob.objects.filter(pk=job.pk, lease_token=job.lease_token).delete()
+    return True
+
+
+def run_worker(*, max_jobs: int | None = None, exit_when_idle: bool = False, poll_interval: float | None = None) -> int:
+    """Claim and run jobs until `max_jobs` are done (or, with `exit_when_idle`, none are due)."""
+
+    poll_interval = settings.RECIPE_REFRESH_POLL_INTERVAL if poll_interval is None else poll_interval
+    processed = 0
+    while max_jobs is None or processed < max_jobs:
+        job = claim_next_job()
+        if job is None:
+            if exit_when_idle and not _due_jobs().exists():
+                break
+            # Nothing due, or every due job is on a throttled domain.
+            time.sleep(poll_interval)
+            continue
+        run_job(job)
+        processed += 1
+    return processed
@@ -0,0 +1,91 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Iterable, List, Tuple
+
+from django.conf import settings
+
+from .models import Recipe
+from .serializers import encode_json, serialize_recipe
+
+# Pre-encoded JSON around the `views` member, which changes on every hit and
+# is therefore spliced in per response.
+_Fragment = Tuple[bytes, bytes]
+
+
+def _render(recipe: Recipe) -> _Fragment:
+    items = list(serialize_recipe(recipe).items())
+    split = next(index for index, (key, _) in enumerate(items) if key == "views")
+    head = encode_json(dict(items[:split]))[:-1] + b', "views": '
+    tail = b", " + encode_json(dict(items[split + 1 :]))[1:]
+    return head, tail
+
+
+class RecipeRenderCache:
+    """LRU cache of each recipe's serialized JSON, bounded by total bytes.
+
+    Entries are keyed by primary key and stamped with `updated_at`, so a
+    recipe read after any save or view flush is re-rendered instead of served
+    stale. Output is byte-for-byte what `JsonResponse(serialize_recipe(...))`
+    would produce.
+    """
+
+    def __init__(self, max_bytes: int | None = None) -> None:
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, Tuple[datetime, _Fragment]]" = OrderedDict()
+        self._size = 0
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes if self._max_bytes is not None else settings.RECIPE_RENDER_CACHE_MAX_BYTES
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def render(self, recipe: Recipe) -> bytes:
+        """Return the recipe's JSON object as bytes."""
+
+        head, tail = self._fragment(recipe)
+        return head + str(recipe.views).encode("ascii") + tail
+
+    def render_many(self, recipes: Iterable[Recipe]) -> List[bytes]:
+        return [self.render(recipe) for recipe in recipes]
+
+    def _fragment(self, recipe: Recipe) -> _Fragment:
+        with self._lock:
+            entry = self._entries.get(recipe.pk)
+            if entry is not None and entry[0] == recipe.updated_at:
+                self._entries.move_to_end(recipe.pk)
+                return entry[1]
+
+        fragment = _render(recipe)
+        fragment_size = len(fragment[0]) + len(fragment[1])
+        if fragment_size > self.max_bytes:
+            return fragment
+
+        with self._lock:
+            previous = self._entries.pop(recipe.pk, None)
+            if previous is not None:
+                self._size -= len(previous[1][0]) + len(previous[1][1])
+            self._entries[recipe.pk] = (recipe.updated_at, fragment)
+            self._size += fragment_size
+            while self._size > self.max_bytes:
+                _, (_, (old_head, old_tail)) = self._entries.popitem(last=False)
+                self._size -= len(old_head) + len(old_tail)
+        return fragment
+
+    def invalidate(self, recipe_id: int) -> None:
+        with self._lock:
+            entry = self._entries.pop(recipe_id, None)
+            if entry is not None:
+                self._size -= len(entry[1][0]) + len(entry[1][1])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+render_cache = RecipeRenderCache()
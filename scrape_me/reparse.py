@@ -0,0 +1,147 @@
+"""Rebuild scraped recipe fields from archived HTML, with no network I/O.
+
+Pages are read from the HTML store and parsed in a process pool, one batch
+of recipes at a time; the main process compares the results with the stored
+rows and writes only the ones that changed, one transaction per batch.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from .batching import map_batches
+from .duplicates import fingerprint_recipe
+from .fetching import scrape_recipe_html
+from .html_store import HtmlNotStored, HtmlStore, html_store
+from .ingredients import store_recipe_ingredients
+from .models import Recipe
+from .normalizers import recipe_fields_from_scrape
+
+# Fields reparsing may change; everything else on the row is left alone.
+REPARSED_FIELDS = [
+    "description",
+    "title",
+    "author",
+    "total_time",
+    "yields",
+    "image",
+    "ingredients",
+    "instructions",
+]
+
+# Fields the MinHash fingerprint (see scrape_me/duplicates.py) is computed from.
+FINGERPRINTED_FIELDS = ("ingredients", "instructions")
+
+# Only the first failures are kept with their messages.
+MAX_REPORTED_ERRORS = 100
+
+_Job = Tuple[int, str, str]
+_Result = Tuple[int, Dict[str, Any] | None, str | None]
+
+_worker_store: HtmlStore | None = None
+
+
+@dataclass
+class ReparseStats:
+    changed: int = 0
+    unchanged: int = 0
+    missing: int = 0
+    failed: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def processed(self) -> int:
+        return self.changed + self.unchanged + self.missing + self.failed
+
+
+def _init_worker(store_root: str, compression: str) -> None:
+    global _worker_store
+    _worker_store = HtmlStore(store_root, compression)
+
+
+def _reparse_one(job: _Job) -> _Result:
+    recipe_id, source_url, digest = job
+    store = _worker_store or html_store
+    try:
+        html = store.get(digest)
+    except HtmlNotStored:
+        return recipe_id, None, None
+    try:
+        data = scrape_recipe_html(html, source_url)
+    except Exception as exc:  # recipe_scrapers raises various exceptions per site
+        return recipe_id, None, f"{type(exc).__name__}: {exc}"
+    return recipe_id, recipe_fields_from_scrape(data), None
+
+
+def _apply(results: List[_Result], stats: ReparseStats, dry_run: bool) -> None:
+    parsed = {}
+    for recipe_id, fields, error in results:
+        if error is not None:
+            stats.failed += 1
+            if len(stats.errors) < MAX_REPORTED_ERRORS:
+                stats.errors.append((recipe_id, error))
+        elif fields is None:
+            stats.missing += 1
+        else:
+            parsed[recipe_id] = fields
+
+    changed = []
+    refingerprint = []
+    for recipe in Recipe.objects.filter(pk__in=list(parsed)).only("pk", "duplicate_of", *REPARSED_FIELDS):
+        fields = parsed[recipe.pk]
+        if all(getattr(recipe, name) == fields[name] for name in REPARSED_FIELDS):
+            stats.unchanged += 1
+            continue
+        if any(getattr(recipe, name) != fields[name] for name in FINGERPRINTED_FIELDS):
+            refingerprint.append(recipe)
+        for name in REPARSED_FIELDS:
+            setattr(recipe, name, fields[name])
+        recipe.prepare_for_save()
+        changed.append(recipe)
+    stats.changed += len(changed)
+
+    if changed and not dry_run:
+        now = timezone.now()
+        for recipe in changed:
+            recipe.updated_at = now
+        with transaction.atomic():
+            Recipe.objects.bulk_update(changed, REPARSED_FIELDS + ["updated_at"])
+            store_recipe_ingredients({recipe.pk: recipe.ingredients for recipe in changed})
+            for recipe in refingerprint:
+                fingerprint_recipe(recipe)
+
+
+def reparse_recipes(
+    queryset: QuerySet | None = None,
+    *,
+    workers: int | None = None,
+    batch_size: int = 500,
+    dry_run: bool = False,
+    progress: Callable[[ReparseStats], None] | None = None,
+) -> ReparseStats:
+    """Re-parse every recipe in `queryset` that has archived HTML.
+
+    `workers` defaults to one process per CPU; `workers=1` parses in this
+    process.
+    """
+
+    queryset = Recipe.objects.all() if queryset is None else queryset
+    stats = ReparseStats()
+
+    queryset = queryset.exclude(html_sha256="").exclude(source_url=None)
+    for results in map_batches(
+        _reparse_one,
+        queryset,
+        ("source_url", "html_sha256"),
+        batch_size=batch_size,
+        workers=workers,
+        initializer=_init_worker,
+        initargs=(str(html_store.root), html_store.compression),
+    ):
+        _apply(results, stats, dry_run)
+        if progress is not None:
+            progress(stats)
+    return stats
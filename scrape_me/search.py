@@ -0,0 +1,157 @@
+"""SQLite FTS5 full-text index over recipes.
+
+The index is an external-content FTS5 table over `scrape_me_recipe`, kept in
+sync by SQLite triggers so that `save()`, `delete()`, `bulk_create()` and
+queryset `update()` calls are all indexed without any Python hooks. The JSON
+list columns are indexed as their joined string values, not as JSON text
+(which escapes non-ASCII characters), so the triggers and the rebuild fill
+the index themselves instead of FTS5 reading the recipe table.
+
+Django rebuilds a SQLite table (dropping its triggers) for many schema changes,
+so the table and triggers are (re)installed idempotently after every
+`migrate` rather than by a one-off migration.
+"""
+
+import re
+
+from django.conf import settings
+from django.db import connection as default_connection, transaction
+from django.db.models import QuerySet
+from django.db.models.expressions import RawSQL
+
+from .models import Recipe
+
+FTS_TABLE = "scrape_me_recipe_fts"
+INDEXED_COLUMNS = ("title", "description", "author", "ingredients", "instructions")
+
+# bm25() weights per indexed column: title matches rank highest.
+COLUMN_WEIGHTS = (10.0, 2.0, 2.0, 1.0, 0.5)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_TRIGGER_NAMES = (f"{FTS_TABLE}_ai", f"{FTS_TABLE}_ad", f"{FTS_TABLE}_au")
+_JSON_COLUMNS = frozenset({"ingredients", "instructions"})
+
+
+def _indexed_values(row: str) -> str:
+    # Triggers and rebuilds must produce the same text, or 'delete' corrupts the index.
+    return ", ".join(
+        f"(SELECT group_concat(value, ' ') FROM json_each({row}.{column}))" if column in _JSON_COLUMNS
+        else f"{row}.{column}"
+        for column in INDEXED_COLUMNS
+    )
+
+
+def _trigger_statements():
+    recipe_table = Recipe._meta.db_table
+    columns = ", ".join(INDEXED_COLUMNS)
+    delete_old = (
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) VALUES ('delete', old.id, {_indexed_values('old')});"
+    )
+    insert_new = f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {_indexed_values('new')});"
+    # Written as SQLite stores them in sqlite_master, so outdated triggers can be spotted.
+    return {
+        f"{FTS_TABLE}_ai": f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {recipe_table} BEGIN {insert_new} END",
+        f"{FTS_TABLE}_ad": f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {recipe_table} BEGIN {delete_old} END",
+        f"{FTS_TABLE}_au": f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF {columns} ON {recipe_table} "
+        f"BEGIN {delete_old} {insert_new} END",
+    }
+
+
+def _create_table_statement():
+    return (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"{', '.join(INDEXED_COLUMNS)}, content='{Recipe._meta.db_table}', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')"
+    )
+
+
+def _installed_triggers(cursor) -> dict:
+    cursor.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name IN (%s, %s, %s)",
+        _TRIGGER_NAMES,
+    )
+    return dict(cursor.fetchall())
+
+
+def _reindex(cursor) -> None:
+    # FTS5's own 'rebuild' would index the raw JSON text of the recipe table.
+    cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')")
+    recipe_table = Recipe._meta.db_table
+    cursor.execute(
+        f"INSERT INTO {FTS_TABLE}(rowid, {', '.join(INDEXED_COLUMNS)}) "
+        f"SELECT {recipe_table}.id, {_indexed_values(recipe_table)} FROM {recipe_table}"
+    )
+
+
+def ensure_search_index(connection=None) -> bool:
+    """Install the FTS table and triggers if missing or outdated; returns True if it had to rebuild."""
+
+    connection = connection or default_connection
+    if connection.vendor != "sqlite":
+        return False
+
+    triggers = _trigger_statements()
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        if _installed_triggers(cursor) == triggers:
+            return False
+        cursor.execute(_create_table_statement())
+        for name, statement in triggers.items():
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            cursor.execute(statement)
+        # Rows written while the triggers were missing are not indexed yet.
+        _reindex(cursor)
+    return True
+
+
+def rebuild_search_index(connection=None) -> None:
+    """Re-create the index contents from the recipe table."""
+
+    connection = connection or default_connection
+    ensure_search_index(connection)
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        _reindex(cursor)
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+
+
+def search_index_available(connection=None) -> bool:
+    connection = connection or default_connection
+    return connection.vendor == "sqlite" and settings.RECIPE_SEARCH_BACKEND == "fts"
+
+
+def build_match_expression(query: str) -> str | None:
+    """Turn free text into an FTS5 query matching every word as a prefix."""
+
+    tokens = _TOKEN_RE.findall(query.lower())
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def search_recipes(queryset: QuerySet, query: str, ranked: bool = True) -> QuerySet:
+    """Filter `queryset` to recipes matching `query`.
+
+    With `ranked`, results are ordered by bm25 relevance (newest first on
+    ties); otherwise the queryset keeps its ordering and only gains an
+    indexed `id IN (...)` filter. Falls back to `title__icontains` when the
+    FTS index is not in use.
+    """
+
+    expression = build_match_expression(query)
+    if expression is None or not search_index_available():
+        return queryset.filter(title__icontains=query)
+
+    if not ranked:
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [expression])
+        )
+
+    recipe_table = Recipe._meta.db_table
+    weights = ", ".join(str(weight) for weight in COLUMN_WEIGHTS)
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[f"{FTS_TABLE}.rowid = {recipe_table}.id", f"{FTS_TABLE} MATCH %s"],
+        params=[expression],
+        select={"search_rank": f"bm25({FTS_TABLE}, {weights})"},
+        order_by=["search_rank", "-created_at"],
+    )
@@ -0,0 +1,84 @@
+import json
+from typing import Any, Dict, Iterable, Sequence
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Recipe
+
+# Keys of `serialize_recipe`, in output order; each is a Recipe field name.
+RECIPE_FIELDS = (
+    "id",
+    "source_url",
+    "description",
+    "title",
+    "author",
+    "total_time",
+    "yields",
+    "image",
+    "ingredients",
+    "instructions",
+    "views",
+    "type",
+    "created_at",
+    "updated_at",
+)
+
+# What the recipe list UI shows; leaves out the heavy text and JSON columns.
+SUMMARY_FIELDS = ("id", "title", "image", "total_time")
+
+_DATETIME_FIELDS = {"created_at", "updated_at"}
+
+
+def serialize_recipe(recipe: Recipe) -> Dict[str, Any]:
+    """Convert a Recipe instance into a JSON-serializable dict."""
+
+    return {
+        "id": recipe.id,
+        "source_url": recipe.source_url,
+        "description": recipe.description,
+        "title": recipe.title,
+        "author": recipe.author,
+        "total_time": recipe.total_time,
+        "yields": recipe.yields,
+        "image": recipe.image,
+        "ingredients": recipe.ingredients,
+        "instructions": recipe.instructions,
+        "views": recipe.views,
+        "type": recipe.type,
+        "created_at": recipe.created_at.isoformat(),
+        "updated_at": recipe.updated_at.isoformat(),
+    }
+
+
+def serialize_recipe_fields(recipe: Recipe, fields: Sequence[str]) -> Dict[str, Any]:
+    """Serialize only `fields` of a recipe, formatted as in `serialize_recipe`.
+
+    No other attribute is touched, so a recipe loaded with `.only(*fields)`
+    never triggers a query for its deferred columns.
+    """
+
+    payload = {}
+    for name in fields:
+        value = getattr(recipe, name)
+        payload[name] = value.isoformat() if name in _DATETIME_FIELDS else value
+    return payload
+
+
+def encode_json(value: Any) -> bytes:
+    """Encode a value exactly as `JsonResponse` would."""
+
+    return json.dumps(value, cls=DjangoJSONEncoder).encode("utf-8")
+
+
+def encode_json_object(payload: Dict[str, Any], raw: Dict[str, bytes]) -> bytes:
+    """Encode `payload` as a JSON object, splicing pre-encoded values from `raw` in by key."""
+
+    members = [
+        encode_json(key) + b": " + (raw[key] if key in raw else encode_json(value))
+        for key, value in payload.items()
+    ]
+    return b"{" + b", ".join(members) + b"}"
+
+
+def encode_json_array(fragments: Iterable[bytes]) -> bytes:
+    return b"[" + b", ".join(fragments) + b"]"
@@ -0,0 +1,60 @@
+from django.core.management import call_command
+from django.db import connections
+
+from .counting import ensure_recipe_counter
+from .ingredient_index import ingredient_index
+from .ingredients import store_recipe_ingredients
+from .models import RecipeIngredientRemoval
+from .render_cache import render_cache
+from .search import ensure_search_index
+
+
+def install_database_triggers(sender, using, **kwargs):
+    """post_migrate hook: (re)install triggers that SQLite table rebuilds drop."""
+
+    connection = connections[using]
+    ensure_search_index(connection)
+    ensure_recipe_counter(connection)
+
+
+def create_cache_tables(sender, using, **kwargs):
+    """post_migrate hook: create the tables of database-backed caches (idempotent)."""
+
+    call_command("createcachetable", database=using, verbosity=0)
+
+
+def invalidate_rendered_recipe(sender, instance, **kwargs):
+    """post_save/post_delete hook: drop the recipe's cached JSON."""
+
+    render_cache.invalidate(instance.pk)
+
+
+def note_ingredient_changes(sender, instance, raw=False, update_fields=None, **kwargs):
+    """pre_save hook: note whether this save changes `ingredients`, for `reindex_recipe_ingredients`."""
+
+    # A deferred field is not written, so it cannot change.
+    changed = not raw and "ingredients" in instance.__dict__
+    changed = changed and (update_fields is None or "ingredients" in update_fields)
+    if changed and not instance._state.adding:
+        # Only saves that may write `ingredients` pay for reading the stored value.
+        stored = sender.objects.filter(pk=instance.pk).values_list("ingredients", flat=True).first()
+        changed = stored != instance.ingredients
+    instance._ingredients_changed = changed
+
+
+def reindex_recipe_ingredients(sender, instance, created, **kwargs):
+    """post_save hook: rewrite the parsed ingredient rows (and index) when `ingredients` changed."""
+
+    if not instance._ingredients_changed:
+        return
+    ingredients = instance.ingredients
+    if created and not ingredients:
+        return
+    store_recipe_ingredients({instance.pk: ingredients if isinstance(ingredients, list) else []})
+
+
+def unindex_recipe_ingredients(sender, instance, **kwargs):
+    """post_delete hook: drop the recipe from the in-memory ingredient index, here and elsewhere."""
+
+    RecipeIngredientRemoval.objects.create(recipe_id=instance.pk)
+    ingredient_index.remove_recipe(instance.pk)
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class InFlightCallInterrupted(RuntimeError):
+    """Raised in waiters when the leader was cancelled or interrupted before finishing."""
+
+
+class SingleFlight:
+    """Collapse concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the work; callers that arrive while it is
+    still in flight wait for it and receive the same result or exception.
+    Waiters block on a `concurrent.futures.Future`, so threads (WSGI) and
+    coroutines on any event loop (ASGI) can share one in-flight call.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def _finish(self, key: str, future: Future, result: Any = None, error: BaseException | None = None) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
+        if future.done():
+            return
+        if error is None:
+            future.set_result(result)
+        elif isinstance(error, Exception):
+            future.set_exception(error)
+        else:
+            # Cancellation or interpreter shutdown in the leader should not be
+            # re-raised as-is inside unrelated requests.
+            future.set_exception(InFlightCallInterrupted("In-flight call was interrupted."))
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Run `fn` once per in-flight `key`; returns `(result, shared)`."""
+
+        future, leader = self._join(key)
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as exc:
+            self._finish(key, future, error=exc)
+            raise
+        self._finish(key, future, result=result)
+        return result, False
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Async counterpart of `do` for coroutine functions."""
+
+        future, leader = self._join(key)
+        if not leader:
+            # Shielded so that a cancelled waiter (say, a disconnected client)
+            # does not cancel the future the leader and other waiters share.
+            return await asyncio.shield(asyncio.wrap_future(future)), True
+
+        try:
+            result = await fn()
+        except BaseException as exc:
+            self._finish(key, future, error=exc)
+            raise
+        self._finish(key, future, result=result)
+        return result, False
@@ -1,9 +1,73 @@
+import asyncio
+import gzip
+import io
 import json
-from unittest.mock import patch
+import os
+import tempfile
+import threading
+import time
+from array import array
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock, patch
 
-from django.test import SimpleTestCase
+from django.core.cache import caches
+from django.conf import settings
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.http import JsonResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
+from .batching import keyset_batches, map_batches
+from .canonical_urls import declared_canonical_url, find_recipe
+from .convert_jobs import convert_jobs
+from .counting import RECIPE_COUNTER
+from .duplicates import (
+    NUM_PERM,
+    ROWS,
+    _store_fingerprints,
+    cluster_duplicates,
+    fingerprint_recipe,
+    recipe_signature,
+    similarity,
+)
+from .export import export_queryset, iter_export
+from .failure_cache import lookup_failure, record_failure
+from .fetching import FetchedPage, fetch_recipe_page, fetch_recipe_page_async, scrape_recipe_html
+from .html_store import HtmlNotStored, html_store
+from .ingest import _write_chunk, ingest_recipe_urls
+from .ingredient_index import IngredientIndex, ingredient_index, ingredient_keys
+from .ingredients import ParsedIngredient, parse_ingredient, store_recipe_ingredients
+from .metrics import registry as metrics_registry, view_latency
+from .model_cache import model_cache_counts, model_cache_stats
+from .models import (
+    ConvertJob,
+    DomainThrottle,
+    Recipe,
+    RecipeAlias,
+    RecipeFingerprint,
+    RecipeIngredient,
+    RecipeIngredientRemoval,
+    RecipeType,
+    RefreshJob,
+    ScrapeLease,
+    TableCounter,
+)
+from . import render_cache as render_cache_module
+from .normalizers import recipe_fields_from_scrape
+from .raw_text_parser import parse_raw_recipe
+from .refresh import RefreshOutcome, refresh_recipe, stale_recipes
+from .refresh_queue import claim_next_job, enqueue_refresh, is_stale, run_job
+from .render_cache import RecipeRenderCache, render_cache
+from .reparse import reparse_recipes
+from .search import FTS_TABLE, ensure_search_index
+from .serializers import serialize_recipe
+from .singleflight import InFlightCallInterrupted, SingleFlight
+from .view_counts import ViewCountBuffer, view_counts
 from .views import (
     RecipeStructError,
     normalize_description,
@@ -37,6 +101,48 @@ class NormalizeRecipeUrlTests(SimpleTestCase):
             "https://example.com/recipe",
         )
 
+    def test_variants_share_one_canonical_url(self):
+        variants = [
+            "http://example.com/recipe",
+            "https://WWW.Example.COM/recipe/",
+            "https://example.com:443/recipe?utm_source=feed&utm_medium=rss&fbclid=abc",
+            "https://example.com/recipe#comments",
+            "https://example.com/recipe/amp/",
+            "https://example.com/amp/recipe",
+            "https://example.com/recipe/print/1234",
+            "https://example.com/recipe?print=1",
+        ]
+        for variant in variants:
+            with self.subTest(variant=variant):
+                self.assertEqual(normalize_recipe_url(variant), "https://example.com/recipe")
+
+    def test_meaningful_query_parameters_kept_in_a_stable_order(self):
+        self.assertEqual(
+            normalize_recipe_url("https://example.com/recipe.php?id=7&lang=en&utm_campaign=x"),
+            normalize_recipe_url("https://example.com/recipe.php?lang=en&id=7"),
+        )
+        self.assertEqual(
+            normalize_recipe_url("https://example.com/recipe.php?lang=en&id=7"),
+            "https://example.com/recipe.php?id=7&lang=en",
+        )
+
+    def test_domain_rules(self):
+        # Path-identified sites drop every query parameter, and these also serve a mobile host.
+        self.assertEqual(
+            normalize_recipe_url("https://m.allrecipes.com/recipe/1/soup/?page=2"),
+            "https://allrecipes.com/recipe/1/soup",
+        )
+        with override_settings(RECIPE_URL_DOMAIN_RULES={"example.com": {"https": False, "keep_params": ["id"]}}):
+            self.assertEqual(
+                normalize_recipe_url("http://blog.example.com/recipe?id=7&page=2"),
+                "http://blog.example.com/recipe?id=7",
+            )
+
+    def test_local_and_non_http_urls(self):
+        self.assertEqual(normalize_recipe_url("http://127.0.0.1:8000/soup/"), "http://127.0.0.1:8000/soup")
+        self.assertEqual(normalize_recipe_url("http://example.com:8080/soup"), "http://example.com:8080/soup")
+        self.assertEqual(normalize_recipe_url(" ftp://example.com/soup/ "), "ftp://example.com/soup")
+
 
 class NormalizeInstructionsTests(SimpleTestCase):
     def test_string_with_newlines_split_into_steps(self):
@@ -146,3 +252,1912 @@ class ConvertRawRecipeViewTests(SimpleTestCase):
 
         self.assertEqual(response.status_code, 502)
         self.assertEqual(response.json(), {"error": "Upstream error"})
+
+
+class ClearCachesMixin:
+    def setUp(self):
+        super().setUp()
+        for cache in caches.all():
+            cache.clear()
+        view_counts.discard()
+        self.addCleanup(view_counts.discard)
+        model_cache_counts.discard()
+        self.addCleanup(model_cache_counts.discard)
+        render_cache.clear()
+        ingredient_index.clear()
+        self.addCleanup(ingredient_index.clear)
+        scratch_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(scratch_dir.cleanup)
+        scratch_settings = override_settings(
+            RECIPE_HTML_STORE_DIR=scratch_dir.name,
+            RECIPE_INGREDIENT_INDEX_SNAPSHOT=Path(scratch_dir.name) / "ingredient_index.snapshot",
+        )
+        scratch_settings.enable()
+        self.addCleanup(scratch_settings.disable)
+
+
+STUB_PAGE = FetchedPage("<html></html>")
+
+SCRAPED_PAYLOAD = {
+    "title": "Stub Soup",
+    "author": "Bench",
+    "description": "  A soup.  ",
+    "ingredients": ["1 cup water", "2 carrots"],
+    "instructions": "Boil.\nServe.",
+    "total_time": 20,
+    "yields": "2 servings",
+    "image": "https://example.com/soup.jpg",
+}
+
+
+class ParseRecipeUrlAsyncViewTests(ClearCachesMixin, TestCase):
+    url = "https://example.com/soup"
+
+    @patch("scrape_me.views.scrape_recipe_html", return_value=SCRAPED_PAYLOAD)
+    @patch("scrape_me.views.fetch_recipe_page_async", new_callable=AsyncMock, return_value=STUB_PAGE)
+    async def test_cache_miss_fetches_and_stores_recipe(self, mock_fetch, mock_scrape):
+        submitted = "http://www.example.com/soup/"
+        response = await self.async_client.get(reverse("parse-recipe-url-async"), {"url": submitted})
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["source_url"], self.url)
+        self.assertEqual(body["description"], "A soup.")
+        self.assertEqual(body["instructions"], ["Boil.", "Serve."])
+        self.assertEqual(body["views"], 1)
+        self.assertEqual(body["type"], RecipeType.URL)
+        # The canonical URL is the storage key; the page is fetched as submitted.
+        mock_fetch.assert_awaited_once_with(submitted)
+        mock_scrape.assert_called_once_with("<html></html>", submitted)
+
+    @patch("scrape_me.views.fetch_recipe_page_async", new_callable=AsyncMock)
+    async def test_cache_hit_skips_fetch_and_counts_view(self, mock_fetch):
+        await Recipe.objects.acreate(source_url=self.url, title="Stored", views=3)
+
+        response = await self.async_client.get(reverse("parse-recipe-url-async"), {"url": self.url})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["views"], 4)
+        mock_fetch.assert_not_awaited()
+
+    @patch("scrape_me.views.fetch_recipe_page_async", new_callable=AsyncMock, side_effect=ValueError("boom"))
+    async def test_fetch_failure_returns_400(self, mock_fetch):
+        response = await self.async_client.get(reverse("parse-recipe-url-async"), {"url": self.url})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "boom"})
+        self.assertFalse(await Recipe.objects.aexists())
+
+    async def test_invalid_url_returns_400(self):
+        response = await self.async_client.get(reverse("parse-recipe-url-async"), {"url": "ftp://example.com"})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class SingleFlightTests(SimpleTestCase):
+    def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def work():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "done"
+
+        leader = threading.Thread(target=lambda: results.append(flight.do("key", work)))
+        leader.start()
+        started.wait(5)
+        followers = [threading.Thread(target=lambda: results.append(flight.do("key", work))) for _ in range(3)]
+        for follower in followers:
+            follower.start()
+        # Give the followers time to join the in-flight call.
+        time.sleep(0.1)
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(results), [("done", False), ("done", True), ("done", True), ("done", True)])
+
+    def test_exception_propagates_and_key_is_cleared(self):
+        flight = SingleFlight()
+
+        with self.assertRaises(ValueError):
+            flight.do("key", lambda: (_ for _ in ()).throw(ValueError("boom")))
+
+        self.assertEqual(flight.do("key", lambda: 42), (42, False))
+
+    async def test_cancelled_waiter_does_not_affect_leader_or_other_waiters(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "done"
+
+        leader = asyncio.create_task(flight.ado("key", work))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(flight.ado("key", work)) for _ in range(2)]
+        await asyncio.sleep(0)
+        waiters[0].cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        self.assertEqual(await leader, ("done", False))
+        self.assertEqual(await waiters[1], ("done", True))
+        with self.assertRaises(asyncio.CancelledError):
+            await waiters[0]
+
+
+class ScrapeLeaseTests(TestCase):
+    url = "https://example.com/soup"
+
+    def test_second_acquire_fails_until_release(self):
+        token = ScrapeLease.acquire(self.url, 60)
+
+        self.assertIsNotNone(token)
+        self.assertIsNone(ScrapeLease.acquire(self.url, 60))
+        ScrapeLease.release(self.url, token)
+        self.assertIsNotNone(ScrapeLease.acquire(self.url, 60))
+
+    def test_expired_lease_can_be_taken_over(self):
+        ScrapeLease.objects.create(url=self.url, token="stale", expires_at=timezone.now() - timedelta(seconds=1))
+
+        self.assertIsNotNone(ScrapeLease.acquire(self.url, 60))
+
+
+class ParseRecipeUrlCoalescingTests(ClearCachesMixin, TestCase):
+    url = "https://example.com/soup"
+
+    def test_row_stored_by_another_worker_is_returned_instead_of_500(self):
+        def fetch_while_another_worker_stores(url):
+            Recipe.objects.create(source_url=url, title="Stored elsewhere", views=1)
+            return STUB_PAGE
+
+        with patch("scrape_me.views.fetch_recipe_page", side_effect=fetch_while_another_worker_stores), patch(
+            "scrape_me.views.scrape_recipe_html", return_value=SCRAPED_PAYLOAD
+        ):
+            response = self.client.get(reverse("parse-recipe-url"), {"url": self.url})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["title"], "Stored elsewhere")
+        self.assertEqual(response.json()["views"], 2)
+        self.assertEqual(Recipe.objects.count(), 1)
+
+    def test_waits_for_lease_holder_instead_of_scraping(self):
+        ScrapeLease.acquire(self.url, 60)
+
+        def holder_finishes(_seconds):
+            Recipe.objects.create(source_url=self.url, title="From holder", views=1)
+
+        with patch("scrape_me.views.time.sleep", side_effect=holder_finishes), patch(
+            "scrape_me.views.fetch_recipe_page"
+        ) as mock_fetch:
+            response = self.client.get(reverse("parse-recipe-url"), {"url": self.url})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["title"], "From holder")
+        self.assertEqual(response.json()["views"], 2)
+        mock_fetch.assert_not_called()
+
+    def test_waiter_answers_the_failure_the_lease_holder_recorded(self):
+        token = ScrapeLease.acquire(self.url, 60)
+
+        def holder_fails(_seconds):
+            record_failure(self.url, ValueError("no recipe"))
+            ScrapeLease.release(self.url, token)
+
+        with patch("scrape_me.views.time.sleep", side_effect=holder_fails), patch(
+            "scrape_me.views.fetch_recipe_page"
+        ) as mock_fetch:
+            response = self.client.get(reverse("parse-recipe-url"), {"url": self.url})
+
+        self.assertEqual((response.status_code, response.json()), (400, {"error": "no recipe"}))
+        self.assertIn("Retry-After", response)
+        mock_fetch.assert_not_called()
+
+    def test_interrupted_shared_scrape_returns_503(self):
+        with patch("scrape_me.views._scrape_flight.do", side_effect=InFlightCallInterrupted("interrupted")):
+            response = self.client.get(reverse("parse-recipe-url"), {"url": self.url})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("error", response.json())
+
+    def test_scrape_failure_releases_lease(self):
+        with patch("scrape_me.views.fetch_recipe_page", side_effect=ValueError("unsupported")):
+            response = self.client.get(reverse("parse-recipe-url"), {"url": self.url})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "unsupported"})
+        self.assertFalse(ScrapeLease.objects.exists())
+
+
+class IngestRecipeUrlsTests(ClearCachesMixin, TestCase):
+    @patch("scrape_me.ingest.scrape_recipe_html", return_value=SCRAPED_PAYLOAD)
+    @patch("scrape_me.ingest.fetch_recipe_page_async", new_callable=AsyncMock, return_value=STUB_PAGE)
+    async def test_report_covers_every_input_url(self, mock_fetch, mock_scrape):
+        await Recipe.objects.acreate(source_url="https://example.com/stored", title="Stored")
+
+        def fail_for_broken(html, url):
+            if url.endswith("broken"):
+                raise ValueError("no recipe here")
+            return SCRAPED_PAYLOAD
+
+        mock_scrape.side_effect = fail_for_broken
+        report = await ingest_recipe_urls(
+            [
+                "https://example.com/new/",
+                "https://example.com/new",
+                "https://example.com/stored",
+                "https://example.com/broken",
+                "not a url",
+            ],
+            chunk_size=1,
+        )
+
+        self.assertEqual(
+            [entry["status"] for entry in report],
+            ["created", "duplicate", "exists", "failed", "invalid"],
+        )
+        self.assertEqual(report[3]["error"], "no recipe here")
+        self.assertEqual(mock_fetch.await_count, 2)
+
+        recipe = await Recipe.objects.aget(source_url="https://example.com/new")
+        self.assertEqual(report[0]["id"], recipe.id)
+        self.assertEqual(recipe.description, "A soup.")
+        self.assertEqual(recipe.instructions, ["Boil.", "Serve."])
+        self.assertEqual(recipe.type, RecipeType.URL)
+
+    @patch("scrape_me.ingest.scrape_recipe_html", return_value=SCRAPED_PAYLOAD)
+    async def test_per_host_concurrency_is_bounded(self, mock_scrape):
+        in_flight = {}
+        peak = {}
+
+        async def slow_fetch(url):
+            host = url.split("/")[2]
+            in_flight[host] = in_flight.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), in_flight[host])
+            await asyncio.sleep(0.01)
+            in_flight[host] -= 1
+            return STUB_PAGE
+
+        urls = [f"https://{host}.example.com/{index}" for host in ("a", "b") for index in range(6)]
+        with patch("scrape_me.ingest.fetch_recipe_page_async", side_effect=slow_fetch):
+            report = await ingest_recipe_urls(urls, concurrency=3, per_host=2)
+
+        self.assertTrue(all(entry["status"] == "created" for entry in report))
+        self.assertEqual(peak, {"a.example.com": 2, "b.example.com": 2})
+        self.assertEqual(await Recipe.objects.acount(), 12)
+
+    def test_rows_stored_concurrently_are_not_reindexed(self):
+        stored = Recipe.objects.create(source_url="https://example.com/soup", title="Stored", ingredients=["1 leek"])
+        store_recipe_ingredients({stored.pk: stored.ingredients})
+        scraped = [
+            Recipe(source_url=url, title="Scraped", ingredients=["2 carrots"], instructions=["Boil the carrots well."])
+            for url in ("https://example.com/soup", "https://example.com/stew")
+        ]
+
+        ids, created = _write_chunk(scraped)
+
+        self.assertEqual(ids["https://example.com/soup"], stored.pk)
+        self.assertEqual(created, {"https://example.com/stew"})
+        self.assertEqual(list(stored.parsed_ingredients.values_list("name", flat=True)), ["leek"])
+        self.assertFalse(RecipeFingerprint.objects.filter(recipe=stored).exists())
+        self.assertTrue(RecipeFingerprint.objects.filter(recipe_id=ids["https://example.com/stew"]).exists())
+
+
+class IngestRecipeUrlsViewTests(ClearCachesMixin, TestCase):
+    def test_missing_urls_returns_400(self):
+        response = self.client.post(reverse("ingest-recipe-urls"), data="{}", content_type="application/json")
+
+        self.assertEqual(response.status_code, 400)
+
+    @patch("scrape_me.ingest.scrape_recipe_html", return_value=SCRAPED_PAYLOAD)
+    @patch("scrape_me.ingest.fetch_recipe_page_async", new_callable=AsyncMock, return_value=STUB_PAGE)
+    def test_returns_report_and_summary(self, mock_fetch, mock_scrape):
+        response = self.client.post(
+            reverse("ingest-recipe-urls"),
+            data=json.dumps({"urls": ["https://example.com/a", "ftp://example.com/b"]}),
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["summary"], {"created": 1, "invalid": 1})
+
+
+class WebsiteNotImplementedError(Exception):
+    """Stand-in named like the recipe_scrapers exception for unsupported sites."""
+
+
+def failure_clock(now):
+    """Freeze the clock failure_cache sees."""
+
+    return patch("scrape_me.failure_cache.time", Mock(**{"time.return_value": now}))
+
+
+@override_settings(RECIPE_FAILURE_CACHE_BASE_TTL=60, RECIPE_FAILURE_CACHE_MAX_TTL=200)
+class FailureCacheTests(ClearCachesMixin, TestCase):
+    url = "https://example.com/broken"
+
+    def test_failure_ttl_backs_off_exponentially_up_to_max(self):
+        with failure_clock(1000.0):
+            ttls = [record_failure(self.url, ValueError("boom")).retry_at - 1000 for _ in range(4)]
+
+        self.assertEqual(ttls, [60, 120, 200, 200])
+
+    def test_lookup_returns_error_class_and_message_until_retry_time(self):
+        with failure_clock(1000.0):
+            record_failure(self.url, ValueError("boom"))
+            failure = lookup_failure(self.url)
+
+        self.assertEqual((failure.error_class, failure.message, failure.failures), ("ValueError", "boom", 1))
+        with failure_clock(1061.0):
+            self.assertIsNone(lookup_failure(self.url))
+
+    def test_domain_errors_block_every_url_on_the_domain(self):
+        record_failure(self.url, WebsiteNotImplementedError("unsupported"))
+
+        self.assertEqual(lookup_failure("https://example.com/other").error_class, "WebsiteNotImplementedError")
+        self.assertIsNone(lookup_failure("https://example.org/other"))
+
+    def test_repeat_request_is_answered_without_scraping(self):
+        with patch("scrape_me.views.fetch_recipe_page", side_effect=ValueError("no recipe")) as mock_fetch:
+            first = self.client.get(reverse("parse-recipe-url"), {"url": self.url})
+            second = self.client.get(reverse("parse-recipe-url"), {"url": self.url})
+
+        self.assertEqual(mock_fetch.call_count, 1)
+        self.assertEqual(second.status_code, 400)
+        self.assertEqual(second.json(), first.json())
+        self.assertIn(second["Retry-After"], {"59", "60"})
+
+    def test_purge_command_forgets_failures(self):
+        record_failure(self.url, ValueError("boom"))
+        record_failure("https://example.org/x", WebsiteNotImplementedError("unsupported"))
+
+        call_command("purge_scrape_failures", url=[self.url + "/"], domain=["example.org"], stdout=io.StringIO())
+
+        self.assertIsNone(lookup_failure(self.url))
+        self.assertIsNone(lookup_failure("https://example.org/y"))
+
+    @override_settings(RECIPE_FAILURE_CACHE_MAX_ENTRIES=2)
+    def test_least_recently_used_failures_are_evicted(self):
+        urls = [f"https://example.com/broken-{n}" for n in range(3)]
+        with failure_clock(1000.0):
+            record_failure(urls[0], ValueError("boom"))
+        with failure_clock(1001.0):
+            record_failure(urls[1], ValueError("boom"))
+        with failure_clock(1002.0):
+            self.assertIsNotNone(lookup_failure(urls[0]))  # now used more recently than urls[1]
+        with failure_clock(1003.0):
+            record_failure(urls[2], ValueError("boom"))
+
+            self.assertEqual([url for url in urls if lookup_failure(url)], [urls[0], urls[2]])
+
+    @patch("scrape_me.views.fetch_recipe_page_async", new_callable=AsyncMock, side_effect=ValueError("no recipe"))
+    async def test_async_view_records_and_answers_failures(self, mock_fetch):
+        first = await self.async_client.get(reverse("parse-recipe-url-async"), {"url": self.url})
+        second = await self.async_client.get(reverse("parse-recipe-url-async"), {"url": self.url})
+
+        self.assertEqual(mock_fetch.await_count, 1)
+        self.assertEqual((second.status_code, second.json()), (400, first.json()))
+
+
+class RecipeSearchTests(TestCase):
+    def search(self, query, **params):
+        response = self.client.get(reverse("get-recipes"), {"q": query, **params})
+        self.assertEqual(response.status_code, 200)
+        return [recipe["title"] for recipe in response.json()["results"]]
+
+    def test_matches_description_and_ingredients_ranked_by_title(self):
+        Recipe.objects.create(title="Weeknight stew", ingredients=["1 lb chicken thighs"])
+        Recipe.objects.create(title="Roast chicken", description="Crispy skin.")
+        Recipe.objects.create(title="Lentil soup", description="Vegetarian.")
+
+        self.assertEqual(self.search("chicken"), ["Roast chicken", "Weeknight stew"])
+
+    def test_matches_non_ascii_ingredients_and_instructions(self):
+        Recipe.objects.create(title="Poppers", ingredients=["12 jalapeños", "1 cup cheddar"])
+        Recipe.objects.create(title="Tart", instructions=["Top with crème fraîche."])
+
+        self.assertEqual(self.search("jalapeños"), ["Poppers"])
+        self.assertEqual(self.search("creme fraiche"), ["Tart"])
+        self.assertEqual(self.search("u00f1o"), [])
+
+    def test_outdated_triggers_are_replaced_and_the_index_rebuilt(self):
+        Recipe.objects.create(title="Poppers", ingredients=["12 jalapeños"])
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TRIGGER {FTS_TABLE}_au")
+            cursor.execute(f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON scrape_me_recipe BEGIN SELECT 1; END")
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")  # indexes the raw JSON
+        self.assertEqual(self.search("jalapeños"), [])
+
+        self.assertTrue(ensure_search_index())
+        self.assertEqual(self.search("jalapeños"), ["Poppers"])
+
+    def test_prefix_and_multi_word_queries(self):
+        Recipe.objects.create(title="Chicken noodle soup")
+        Recipe.objects.create(title="Chickpea curry")
+        Recipe.objects.create(title="Tomato soup")
+
+        self.assertEqual(sorted(self.search("chick")), ["Chicken noodle soup", "Chickpea curry"])
+        self.assertEqual(self.search("soup chick"), ["Chicken noodle soup"])
+
+    def test_index_follows_updates_deletes_and_bulk_writes(self):
+        recipe = Recipe.objects.create(title="Pancakes")
+        Recipe.objects.bulk_create([Recipe(title="Waffles")])
+
+        Recipe.objects.filter(pk=recipe.pk).update(title="Crepes")
+        self.assertEqual(self.search("pancakes"), [])
+        self.assertEqual(self.search("crepes"), ["Crepes"])
+        self.assertEqual(self.search("waffles"), ["Waffles"])
+
+        recipe.delete()
+        self.assertEqual(self.search("crepes"), [])
+
+    def test_missing_triggers_are_reinstalled_and_backfilled(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TRIGGER {FTS_TABLE}_ai")
+        Recipe.objects.create(title="Shakshuka")
+
+        self.assertTrue(ensure_search_index())
+        self.assertEqual(self.search("shakshuka"), ["Shakshuka"])
+        self.assertFalse(ensure_search_index())
+
+    @override_settings(RECIPE_SEARCH_BACKEND="icontains")
+    def test_icontains_backend_matches_title_substrings(self):
+        Recipe.objects.create(title="Chicken soup")
+        Recipe.objects.create(title="Tomato soup", description="no chicken")
+
+        self.assertEqual(self.search("hicke"), ["Chicken soup"])
+
+
+class GetRecipesCursorPaginationTests(TestCase):
+    def setUp(self):
+        for index in range(5):
+            Recipe.objects.create(title=f"Recipe {index}")
+        # Identical timestamps force the id tie-breaker to do its job.
+        Recipe.objects.update(created_at=timezone.now())
+
+    def fetch(self, **params):
+        response = self.client.get(reverse("get-recipes"), {"page_size": 2, **params})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        return [recipe["title"] for recipe in body["results"]], body["pagination"]
+
+    def test_walks_forward_and_back_without_gaps(self):
+        titles, page = self.fetch(cursor="")
+        self.assertEqual(titles, ["Recipe 4", "Recipe 3"])
+        self.assertIsNone(page["prev_cursor"])
+
+        titles, page = self.fetch(cursor=page["next_cursor"])
+        self.assertEqual(titles, ["Recipe 2", "Recipe 1"])
+        second_page = page
+
+        titles, page = self.fetch(cursor=page["next_cursor"])
+        self.assertEqual(titles, ["Recipe 0"])
+        self.assertFalse(page["has_next"])
+        self.assertIsNone(page["next_cursor"])
+
+        titles, page = self.fetch(cursor=second_page["prev_cursor"])
+        self.assertEqual(titles, ["Recipe 4", "Recipe 3"])
+        self.assertFalse(page["has_previous"])
+
+    def test_new_rows_do_not_shift_later_pages(self):
+        _, page = self.fetch(cursor="")
+        Recipe.objects.create(title="Brand new")
+
+        titles, _ = self.fetch(cursor=page["next_cursor"])
+        self.assertEqual(titles, ["Recipe 2", "Recipe 1"])
+
+    def test_invalid_cursor_returns_400(self):
+        response = self.client.get(reverse("get-recipes"), {"cursor": "not-a-cursor"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "Invalid 'cursor' parameter."})
+
+    def test_page_and_cursor_together_returns_400(self):
+        response = self.client.get(reverse("get-recipes"), {"cursor": "", "page": 2})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_page_mode_still_reports_totals(self):
+        titles, page = self.fetch(page=3)
+
+        self.assertEqual(titles, ["Recipe 0"])
+        self.assertEqual(page["total_items"], 5)
+        self.assertEqual(page["total_pages"], 3)
+
+
+class KeysetBatchesTests(TestCase):
+    def setUp(self):
+        self.ids = [Recipe.objects.create(title=f"Recipe {index}").pk for index in range(5)]
+
+    def test_batches_cover_the_queryset_in_pk_order(self):
+        queryset = Recipe.objects.exclude(pk=self.ids[2]).order_by("-title")
+
+        batches = list(keyset_batches(queryset, ("title",), 2))
+
+        self.assertEqual([len(batch) for batch in batches], [2, 2])
+        self.assertEqual([row[0] for batch in batches for row in batch], self.ids[:2] + self.ids[3:])
+        self.assertEqual(batches[0][0], (self.ids[0], "Recipe 0"))
+
+    def test_map_batches_applies_the_job_to_every_row(self):
+        results = list(map_batches(tuple, Recipe.objects.all(), ("title",), batch_size=3, workers=1))
+
+        self.assertEqual([len(batch) for batch in results], [3, 2])
+        self.assertEqual(results[1][-1], (self.ids[4], "Recipe 4"))
+
+
+class DatabaseProfileTests(TestCase):
+    def test_tuned_profile_pragmas_are_applied_on_connect(self):
+        from django.conf import settings
+
+        if settings.SQLITE_PROFILE != "tuned":
+            self.skipTest("SQLITE_PROFILE=default in this environment.")
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute("PRAGMA cache_size")
+            self.assertEqual(cursor.fetchone()[0], settings.SQLITE_PRAGMAS["cache_size"])
+        self.assertEqual(connection.transaction_mode, "IMMEDIATE")
+
+    def test_listing_queries_use_indexes(self):
+        for queryset, index in (
+            (export_queryset("url"), "recipe_type_id_idx"),
+            (Recipe.objects.order_by("-views", "-id")[:20], "recipe_views_id_idx"),
+            (Recipe.objects.all()[:20], "recipe_created_id_idx"),
+        ):
+            sql, params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+                plan = " ".join(row[-1] for row in cursor.fetchall())
+            self.assertIn(f"USING INDEX {index}", plan)
+            self.assertNotIn("TEMP B-TREE", plan)
+
+
+class RecipeCountingTests(ClearCachesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        for index in range(3):
+            Recipe.objects.create(title=f"Soup {index}")
+
+    def counter_value(self):
+        return TableCounter.objects.get(name=RECIPE_COUNTER).value
+
+    def test_counter_tracks_inserts_bulk_inserts_and_deletes(self):
+        Recipe.objects.bulk_create([Recipe(title="Bulk 1"), Recipe(title="Bulk 2")])
+        self.assertEqual(self.counter_value(), 5)
+
+        Recipe.objects.filter(title__startswith="Bulk").delete()
+        self.assertEqual(self.counter_value(), Recipe.objects.count())
+
+    def test_unfiltered_total_comes_from_counter(self):
+        with self.assertNumQueries(2):  # counter row + page rows
+            response = self.client.get(reverse("get-recipes"))
+
+        self.assertEqual(response.json()["pagination"]["total_items"], 3)
+
+    def test_filtered_total_is_cached(self):
+        self.client.get(reverse("get-recipes"), {"q": "soup"})
+        Recipe.objects.create(title="Soup 3")
+
+        with self.assertNumQueries(1):  # page rows only
+            response = self.client.get(reverse("get-recipes"), {"q": "soup"})
+
+        self.assertEqual(response.json()["pagination"]["total_items"], 3)
+
+    def test_include_total_false_skips_counting(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("get-recipes"), {"include_total": "false", "page_size": 2})
+
+        pagination = response.json()["pagination"]
+        self.assertIsNone(pagination["total_items"])
+        self.assertIsNone(pagination["total_pages"])
+        self.assertTrue(pagination["has_next"])
+
+        response = self.client.get(reverse("get-recipes"), {"include_total": "false", "page_size": 2, "page": 2})
+        self.assertFalse(response.json()["pagination"]["has_next"])
+        self.assertEqual(len(response.json()["results"]), 1)
+
+    def test_invalid_include_total_returns_400(self):
+        response = self.client.get(reverse("get-recipes"), {"include_total": "maybe"})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_admin_changelist_uses_counter(self):
+        from django.contrib.auth.models import User
+
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "pw"))
+        response = self.client.get(reverse("admin:scrape_me_recipe_changelist"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["cl"].result_count, 3)
+
+
+@override_settings(RECIPE_VIEW_FLUSH_THRESHOLD=3, RECIPE_VIEW_FLUSH_INTERVAL=0)
+class ViewCountBufferTests(ClearCachesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.recipe = Recipe.objects.create(source_url="https://example.com/soup", title="Soup", views=5)
+
+    def stored_views(self):
+        return Recipe.objects.values_list("views", flat=True).get(pk=self.recipe.pk)
+
+    def test_cache_hits_do_not_write_until_threshold(self):
+        url = reverse("parse-recipe-url")
+        with self.assertNumQueries(1):
+            first = self.client.get(url, {"url": self.recipe.source_url})
+        second = self.client.get(url, {"url": self.recipe.source_url})
+
+        self.assertEqual([first.json()["views"], second.json()["views"]], [6, 7])
+        self.assertEqual(self.stored_views(), 5)
+
+        third = self.client.get(url, {"url": self.recipe.source_url})
+        self.assertEqual(third.json()["views"], 8)
+        self.assertEqual(self.stored_views(), 8)
+        self.assertEqual(view_counts.pending(self.recipe.pk), 0)
+
+    def test_flush_batches_by_increment(self):
+        other = Recipe.objects.create(title="Other", views=0)
+        buffer = ViewCountBuffer()
+        buffer.record(self.recipe.pk)
+        buffer.record(other.pk)
+
+        with self.assertNumQueries(3):  # savepoint + one UPDATE for both rows + release
+            self.assertEqual(buffer.flush(), 2)
+        self.assertEqual(self.stored_views(), 6)
+        self.assertEqual(buffer.flush(), 0)
+
+    def test_failed_flush_keeps_views_for_retry_without_double_counting(self):
+        buffer = ViewCountBuffer()
+        buffer.record(self.recipe.pk)
+
+        with patch(
+            "scrape_me.view_counts.Recipe.objects.filter", side_effect=DatabaseError("locked")
+        ), self.assertLogs("scrape_me.buffered_counts", level="ERROR"):
+            self.assertEqual(buffer.flush(), 0)
+        self.assertEqual(buffer.pending(self.recipe.pk), 1)
+
+        self.assertEqual(buffer.flush(), 1)
+        self.assertEqual(self.stored_views(), 6)
+
+
+class RecipeRenderCacheTests(ClearCachesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.recipe = Recipe.objects.create(
+            source_url="https://example.com/soup",
+            title="Soupe à l'oignon",
+            description='Say "hi"',
+            ingredients=["1 onion", "½ cup stock"],
+            instructions=["Slice.", "Simmer."],
+            total_time=45,
+            views=3,
+        )
+
+    def test_output_matches_json_response(self):
+        cache = RecipeRenderCache(max_bytes=1 << 20)
+        expected = JsonResponse(serialize_recipe(self.recipe)).content
+
+        self.assertEqual(cache.render(self.recipe), expected)
+        self.recipe.views = 4
+        self.assertEqual(cache.render(self.recipe), JsonResponse(serialize_recipe(self.recipe)).content)
+
+    def test_stale_updated_at_rerenders(self):
+        cache = RecipeRenderCache(max_bytes=1 << 20)
+        cache.render(self.recipe)
+
+        Recipe.objects.filter(pk=self.recipe.pk).update(title="Onion Soup", updated_at=timezone.now())
+        fresh = Recipe.objects.get(pk=self.recipe.pk)
+
+        self.assertEqual(json.loads(cache.render(fresh))["title"], "Onion Soup")
+
+    def test_save_invalidates_shared_cache(self):
+        render_cache.render(self.recipe)
+        self.assertGreater(render_cache.size, 0)
+
+        self.recipe.save()
+        self.assertEqual(render_cache.size, 0)
+
+    def test_evicts_least_recently_used_within_byte_budget(self):
+        other = Recipe.objects.create(title="Other", source_url="https://example.com/other")
+        probe = RecipeRenderCache(max_bytes=1 << 20)
+        probe.render(self.recipe)
+        cache = RecipeRenderCache(max_bytes=probe.size + 10)
+
+        cache.render(self.recipe)
+        cache.render(other)
+
+        self.assertLessEqual(cache.size, probe.size + 10)
+        with patch("scrape_me.render_cache._render", wraps=render_cache_module._render) as render:
+            cache.render(other)
+            cache.render(self.recipe)
+        self.assertEqual(render.call_count, 1)
+
+    def test_get_recipes_splices_cached_recipes(self):
+        response = self.client.get(reverse("get-recipes"))
+
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(response.json()["results"], [json.loads(JsonResponse(serialize_recipe(self.recipe)).content)])
+
+
+class GetRecipesFieldProjectionTests(ClearCachesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.recipe = Recipe.objects.create(
+            source_url="https://example.com/soup",
+            title="Soup",
+            image="https://example.com/soup.jpg",
+            total_time=20,
+            ingredients=["1 cup water"] * 50,
+            instructions=["Boil."] * 50,
+        )
+
+    def test_summary_view_reads_only_summary_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("get-recipes"), {"view": "summary", "include_total": "false"})
+
+        self.assertEqual(
+            response.json()["results"],
+            [{"id": self.recipe.pk, "title": "Soup", "image": "https://example.com/soup.jpg", "total_time": 20}],
+        )
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("ingredients", queries[0]["sql"])
+        self.assertNotIn("instructions", queries[0]["sql"])
+
+    def test_fields_keep_serializer_order_and_always_include_id(self):
+        response = self.client.get(reverse("get-recipes"), {"fields": "created_at, title", "cursor": ""})
+
+        result = response.json()["results"][0]
+        self.assertEqual(list(result), ["id", "title", "created_at"])
+        self.assertEqual(result["created_at"], self.recipe.created_at.isoformat())
+
+    def test_invalid_projection_rejected(self):
+        for params in ({"fields": "title,secret"}, {"fields": ""}, {"view": "tiny"}, {"view": "summary", "fields": "id"}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(reverse("get-recipes"), params).status_code, 400)
+
+
+class ExportRecipesTests(ClearCachesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.old = Recipe.objects.create(source_url="https://example.com/old", title="Old")
+        Recipe.objects.filter(pk=self.old.pk).update(updated_at=timezone.now() - timedelta(days=30))
+        self.new = Recipe.objects.create(source_url="https://example.com/new", title="New")
+        self.typed = Recipe.objects.create(title="Typed", type=RecipeType.USER_INPUT)
+
+    def export(self, **params):
+        response = self.client.get(reverse("export-recipes"), params)
+        self.assertEqual(response.status_code, 200)
+        body = b"".join(response.streaming_content)
+        if params.get("gzip") == "true":
+            self.assertEqual(response["Content-Type"], "application/gzip")
+            body = gzip.decompress(body)
+        return [json.loads(line) for line in body.splitlines()]
+
+    def test_streams_every_recipe_in_id_order(self):
+        rows = self.export()
+
+        self.assertEqual([row["id"] for row in rows], [self.old.pk, self.new.pk, self.typed.pk])
+        self.assertEqual(rows[1], serialize_recipe(self.new))
+
+    def test_gzip_and_filters(self):
+        since = (timezone.now() - timedelta(days=1)).date().isoformat()
+
+        self.assertEqual([row["id"] for row in self.export(gzip="true", since=since)], [self.new.pk, self.typed.pk])
+        self.assertEqual([row["id"] for row in self.export(type="user_input")], [self.typed.pk])
+
+    def test_invalid_filters_rejected(self):
+        for params in ({"type": "pdf"}, {"since": "yesterday"}, {"gzip": "maybe"}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(reverse("export-recipes"), params).status_code, 400)
+
+    def test_command_writes_gzip_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "recipes.ndjson.gz"
+            call_command("export_recipes", output=str(path), recipe_type="url", stderr=io.StringIO())
+            rows = [json.loads(line) for line in gzip.decompress(path.read_bytes()).splitlines()]
+
+        self.assertEqual([row["title"] for row in rows], ["Old", "New"])
+
+
+class ImportRecipesTests(ClearCachesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.stored = Recipe.objects.create(source_url="https://example.com/soup", title="Old Soup", views=9)
+
+    def import_rows(self, rows, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "recipes.ndjson"
+            lines = [row if isinstance(row, str) else json.dumps(row) for row in rows]
+            path.write_text("\n".join(lines), encoding="utf-8")
+            stdout, stderr = io.StringIO(), io.StringIO()
+            call_command("import_recipes", str(path), stdout=stdout, stderr=stderr, **options)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_rows_are_normalized_and_upserted_on_source_url(self):
+        stdout, stderr = self.import_rows(
+            [
+                {
+                    "source_url": "https://example.com/soup/",
+                    "title": "New Soup",
+                    "description": [" Hot ", {"text": "soup"}],
+                    "instructions": "Boil.\r\nServe.",
+                    "views": 3,
+                },
+                {"title": "Notes", "ingredients": "1 egg\n\n2 eggs", "created_at": "2020-01-02T03:04:05+00:00"},
+                "{not json",
+                {"source_url": "ftp://example.com/x", "title": "Bad"},
+            ],
+            batch_size=2,
+        )
+
+        self.stored.refresh_from_db()
+        self.assertEqual(
+            (self.stored.title, self.stored.description, self.stored.instructions, self.stored.views),
+            ("New Soup", "Hot soup", ["Boil.", "Serve."], 3),
+        )
+        notes = Recipe.objects.get(title="Notes")
+        self.assertEqual((notes.type, notes.ingredients), (RecipeType.USER_INPUT, ["1 egg", "2 eggs"]))
+        self.assertEqual(notes.created_at.year, 2020)
+        self.assertEqual(list(notes.parsed_ingredients.values_list("quantity", "name")), [(1.0, "egg"), (2.0, "eggs")])
+        self.assertIn("created: 1, updated: 1, skipped: 0, invalid: 2", stdout)
+        self.assertIn(":3: Invalid JSON", stderr)
+        self.assertIn("rows/s", stderr)
+        self.assertEqual(TableCounter.objects.get(name=RECIPE_COUNTER).value, 2)
+
+    def test_out_of_range_timestamp_is_an_invalid_row(self):
+        stdout, stderr = self.import_rows(
+            [
+                {"title": "Bad date", "created_at": "2024-13-45T00:00:00"},
+                {"title": "Good"},
+            ]
+        )
+
+        self.assertIn("created: 1, updated: 0, skipped: 0, invalid: 1", stdout)
+        self.assertIn(":1: 'created_at' must be an ISO datetime.", stderr)
+        self.assertFalse(Recipe.objects.filter(title="Bad date").exists())
+
+    def test_skip_keeps_stored_rows(self):
+        self.import_rows(
+            [
+                {"source_url": "https://example.com/soup", "title": "New Soup"},
+                {"source_url": "https://example.com/stew", "title": "Stew", "ingredients": ["1 onion"]},
+            ],
+            on_conflict="skip",
+            quiet=True,
+        )
+
+        self.assertEqual(Recipe.objects.get(pk=self.stored.pk).title, "Old Soup")
+        stew = Recipe.objects.get(source_url="https://example.com/stew")
+        self.assertEqual(stew.type, RecipeType.URL)
+        self.assertEqual(list(stew.parsed_ingredients.values_list("name", flat=True)), ["onion"])
+
+    def test_export_round_trips(self):
+        self.stored.ingredients = ["1 cup water"]
+        self.stored.save()
+        exported = b"".join(iter_export(export_queryset())).decode().splitlines()
+        Recipe.objects.all().delete()
+
+        self.import_rows(exported, quiet=True)
+
+        restored = Recipe.objects.get()
+        expected = json.loads(exported[0])
+        actual = serialize_recipe(restored)
+        expected.pop("id"), actual.pop("id")
+        self.assertEqual(actual, expected)
+
+
+def recipe_page(name, ingredients=("1 cup water", "2 carrots")):
+    """A minimal schema.org recipe page recipe_scrapers can parse offline."""
+
+    recipe = {
+        "@context": "https://schema.org",
+        "@type": "Recipe",
+        "name": name,
+        "author": {"@type": "Person", "name": "Bench"},
+        "recipeIngredient": list(ingredients),
+        "recipeInstructions": [{"@type": "HowToStep", "text": "Boil."}, {"@type": "HowToStep", "text": "Serve."}],
+        "totalTime": "PT20M",
+        "recipeYield": "2",
+        "image": "https://example.com/soup.jpg",
+        "description": "A soup.",
+    }
+    return (
+        f'<html><head><script type="application/ld+json">{json.dumps(recipe, ensure_ascii=False)}</script></head>'
+        "<body></body></html>"
+    )
+
+
+@override_settings(RECIPE_SCRAPE_SUPPORTED_ONLY=False)
+class HtmlStoreTests(ClearCachesMixin, TestCase):
+    url = "https://example.com/soup"
+
+    def test_pages_are_stored_once_by_content_hash(self):
+        first = html_store.put("<html>soup</html>")
+        second = html_store.put("<html>soup</html>")
+
+        self.assertEqual(first, second)
+        self.assertEqual(html_store.get(first), "<html>soup</html>")
+        self.assertEqual(len(list(html_store.root.rglob("*.html.gz"))), 1)
+        with self.assertRaises(HtmlNotStored):
+            html_store.get("0" * 64)
+
+    @patch("scrape_me.views.fetch_recipe_page")
+    def test_scrape_archives_page_and_reparse_rebuilds_from_it(self, mock_fetch):
+        mock_fetch.return_value = FetchedPage(recipe_page("Soup"))
+        self.client.get(reverse("parse-recipe-url"), {"url": self.url})
+        recipe = Recipe.objects.get()
+        self.assertEqual(html_store.get(recipe.html_sha256), mock_fetch.return_value.html)
+
+        Recipe.objects.filter(pk=recipe.pk).update(title="Mis-parsed", ingredients=[])
+        Recipe.objects.create(title="Typed in")  # no archived page: ignored
+        stdout = io.StringIO()
+        call_command("reparse_recipes", workers=1, stdout=stdout, stderr=io.StringIO())
+
+        recipe.refresh_from_db()
+        self.assertEqual((recipe.title, recipe.ingredients), ("Soup", ["1 cup water", "2 carrots"]))
+        self.assertIn("changed: 1, unchanged: 0, missing html: 0, failed: 0", stdout.getvalue())
+        mock_fetch.assert_called_once()
+
+    def test_reparse_reports_unchanged_and_failed_pages(self):
+        page = recipe_page("Soup")
+        good = Recipe.objects.create(
+            source_url=self.url,
+            html_sha256=html_store.put(page),
+            **recipe_fields_from_scrape(scrape_recipe_html(page, self.url)),
+        )
+        Recipe.objects.create(source_url="https://example.com/bad", html_sha256=html_store.put("<html></html>"))
+
+        stats = reparse_recipes(workers=1, dry_run=True)
+
+        self.assertEqual((stats.changed, stats.unchanged, stats.failed), (0, 1, 1))
+        self.assertEqual(Recipe.objects.get(pk=good.pk).title, "Soup")
+
+    def test_reparse_refreshes_fingerprints_of_changed_recipes(self):
+        page = recipe_page("Soup")
+        fields = recipe_fields_from_scrape(scrape_recipe_html(page, self.url))
+        original = Recipe.objects.create(source_url="https://example.com/original", **fields)
+        fingerprint_recipe(original)
+        misparsed = Recipe.objects.create(
+            source_url=self.url,
+            html_sha256=html_store.put(page),
+            **{**fields, "ingredients": ["3 lemons"], "instructions": ["Squeeze the lemons into a tall jug."]},
+        )
+        self.assertIsNone(fingerprint_recipe(misparsed))
+
+        reparse_recipes(workers=1)
+
+        misparsed.refresh_from_db()
+        self.assertEqual(misparsed.duplicate_of_id, original.pk)
+        self.assertEqual(
+            bytes(RecipeFingerprint.objects.get(recipe=misparsed).signature),
+            recipe_signature(fields["ingredients"], fields["instructions"]).tobytes(),
+        )
+
+
+class IngredientParserTests(SimpleTestCase):
+    def test_lines_are_split_into_quantity_unit_name_and_notes(self):
+        cases = {
+            "1 ½ cups flour, sifted": ParsedIngredient(1.5, None, "cup", "flour", "sifted"),
+            "1 1/2 cups milk": ParsedIngredient(1.5, None, "cup", "milk", ""),
+            "2-3 garlic cloves, minced": ParsedIngredient(2.0, 3.0, "", "garlic cloves", "minced"),
+            "1 (14 oz) can diced tomatoes": ParsedIngredient(1.0, None, "can", "diced tomatoes", "14 oz"),
+            "a pinch of salt": ParsedIngredient(1.0, None, "pinch", "salt", ""),
+            "800g Canned Tomatoes": ParsedIngredient(800.0, None, "g", "canned tomatoes", ""),
+            "- 3 to 4 Tbsp. olive oil (extra virgin)": ParsedIngredient(3.0, 4.0, "tbsp", "olive oil", "extra virgin"),
+            "Salt and pepper to taste": ParsedIngredient(None, None, "", "salt and pepper", "to taste"),
+            "2 large eggs": ParsedIngredient(2.0, None, "", "large eggs", ""),
+        }
+        for line, expected in cases.items():
+            with self.subTest(line=line):
+                self.assertEqual(parse_ingredient(line), expected)
+
+
+@override_settings(RECIPE_SCRAPE_SUPPORTED_ONLY=False)
+class RecipeIngredientTableTests(ClearCachesMixin, TestCase):
+    @patch("scrape_me.views.fetch_recipe_page")
+    def test_scraped_recipe_gets_parsed_ingredient_rows(self, mock_fetch):
+        mock_fetch.return_value = FetchedPage(recipe_page("Soup"))
+        self.client.get(reverse("parse-recipe-url"), {"url": "https://example.com/soup"})
+
+        rows = list(Recipe.objects.get().parsed_ingredients.values_list("position", "quantity", "unit", "name"))
+        self.assertEqual(rows, [(0, 1.0, "cup", "water"), (1, 2.0, "", "carrots")])
+
+    def test_backfill_command_parses_recipes_without_rows(self):
+        # bulk_create skips the post_save hook, like recipes stored before rows were written.
+        parsed, *missing = Recipe.objects.bulk_create(
+            [Recipe(title="Parsed", ingredients=["1 egg"])]
+            + [Recipe(title=f"Soup {n}", ingredients=["2 tsp salt", "1 onion"]) for n in range(3)]
+        )
+        RecipeIngredient.objects.create(recipe=parsed, position=0, quantity=1, name="stale")
+
+        stdout = io.StringIO()
+        call_command("parse_ingredients", workers=2, batch_size=2, stdout=stdout, stderr=io.StringIO())
+
+        self.assertIn("recipes: 3, ingredient lines: 6", stdout.getvalue())
+        self.assertEqual(RecipeIngredient.objects.filter(recipe__in=missing, unit="tsp", name="salt").count(), 3)
+        self.assertEqual(parsed.parsed_ingredients.get().name, "stale")
+
+        call_command("parse_ingredients", all=True, workers=1, stdout=io.StringIO(), stderr=io.StringIO())
+        self.assertEqual(parsed.parsed_ingredients.get().name, "egg")
+        self.assertEqual(RecipeIngredient.objects.count(), 7)
+
+
+class IngredientIndexTests(ClearCachesMixin, TestCase):
+    def make_recipe(self, title, ingredients):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Recipe.objects.create(title=title, ingredients=ingredients)
+
+    def cook_with(self, **params):
+        response = self.client.get(reverse("cook-with-ingredients"), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_ingredient_keys_drop_descriptors_and_plurals(self):
+        self.assertEqual(ingredient_keys("fresh tomatoes and basil"), ["tomato", "basil"])
+        self.assertEqual(ingredient_keys("large eggs"), ["egg"])
+        self.assertEqual(ingredient_keys("salt/pepper"), ["salt", "pepper"])
+
+    def test_results_are_ranked_by_missing_then_matched(self):
+        omelette = self.make_recipe("Omelette", ["3 large eggs", "1 tbsp butter", "salt to taste"])
+        pancakes = self.make_recipe("Pancakes", ["2 cups flour", "2 eggs", "1 cup milk", "1 tbsp butter"])
+        self.make_recipe("Soup", ["2 carrots", "1 onion"])
+        toast = self.make_recipe("Toast", ["1 slice bread", "1 tsp butter"])
+
+        body = self.cook_with(ingredients="eggs, butter,salt")
+
+        self.assertEqual(body["ingredients"], ["butter", "egg", "salt"])
+        self.assertEqual(
+            [(row["id"], row["matched"], row["missing"]) for row in body["results"]],
+            [(omelette.pk, 3, 0), (toast.pk, 1, 1), (pancakes.pk, 2, 2)],
+        )
+        self.assertEqual(body["results"][2]["missing_ingredients"], ["flour", "milk"])
+        self.assertEqual(body["results"][2]["coverage"], 0.5)
+        self.assertEqual(
+            set(body["results"][0]),
+            {"id", "title", "image", "total_time", "matched", "missing", "coverage", "missing_ingredients"},
+        )
+
+        self.assertEqual(self.cook_with(ingredients="egg", max_missing=1)["results"], [])
+        close = self.cook_with(ingredients=["egg", "butter"], max_missing=1, limit=1)["results"]
+        self.assertEqual([row["id"] for row in close], [omelette.pk])
+
+    def test_index_follows_writes_and_deletes(self):
+        soup = self.make_recipe("Soup", ["2 carrots"])
+        self.assertEqual([row["id"] for row in self.cook_with(ingredients="carrot")["results"]], [soup.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            store_recipe_ingredients({soup.pk: ["1 leek"]})
+        salad = self.make_recipe("Salad", ["1 carrot", "1 lettuce"])
+        self.assertEqual([row["id"] for row in self.cook_with(ingredients="carrot")["results"]], [salad.pk])
+        self.assertEqual([row["id"] for row in self.cook_with(ingredients="leek")["results"]], [soup.pk])
+
+        salad.delete()
+        self.assertEqual(self.cook_with(ingredients="carrot")["results"], [])
+
+    def test_direct_saves_rewrite_changed_ingredients_only(self):
+        soup = self.make_recipe("Soup", ["2 carrots"])
+        row_ids = list(soup.parsed_ingredients.values_list("pk", flat=True))
+
+        edited = Recipe.objects.get(pk=soup.pk)  # as the admin loads it
+        edited.title = "Carrot soup"
+        edited.save()
+        self.assertEqual(list(soup.parsed_ingredients.values_list("pk", flat=True)), row_ids)
+
+        edited.ingredients = ["1 leek"]
+        with self.captureOnCommitCallbacks(execute=True):
+            edited.save()
+        self.assertEqual(list(soup.parsed_ingredients.values_list("name", flat=True)), ["leek"])
+        self.assertEqual([row["id"] for row in self.cook_with(ingredients="leek")["results"]], [soup.pk])
+        self.assertEqual(self.cook_with(ingredients="carrot")["results"], [])
+
+    @override_settings(RECIPE_INGREDIENT_INDEX_SYNC_INTERVAL=0)
+    def test_sync_notices_recipes_left_without_rows_elsewhere(self):
+        soup = self.make_recipe("Soup", ["2 carrots"])
+        salad = self.make_recipe("Salad", ["1 carrot"])
+        self.assertEqual(len(self.cook_with(ingredients="carrot")["results"]), 2)
+
+        # Without captured on-commit callbacks, only the sync can update the index.
+        soup.ingredients = []
+        soup.save()
+        self.assertFalse(soup.parsed_ingredients.exists())
+        self.assertEqual([row["id"] for row in self.cook_with(ingredients="carrot")["results"]], [salad.pk])
+
+        salad_id = salad.pk
+        salad.delete()
+        self.assertEqual(
+            sorted(RecipeIngredientRemoval.objects.values_list("recipe_id", flat=True)), [soup.pk, salad_id]
+        )
+
+    @override_settings(RECIPE_INGREDIENT_INDEX_SYNC_INTERVAL=0)
+    def test_snapshots_prune_removals_and_lagging_indexes_rebuild(self):
+        soup = self.make_recipe("Soup", ["2 carrots"])
+        salad = self.make_recipe("Salad", ["1 carrot"])
+        self.assertEqual(len(self.cook_with(ingredients="carrot")["results"]), 2)
+
+        # Another process clears the soup's ingredients and snapshots its index.
+        soup.ingredients = []
+        soup.save()
+        other = IngredientIndex()
+        other.build()
+        other.save_snapshot()
+
+        self.assertFalse(RecipeIngredientRemoval.objects.exists())
+        self.assertEqual([row["id"] for row in self.cook_with(ingredients="carrot")["results"]], [salad.pk])
+
+    def test_snapshot_round_trip_catches_up_with_newer_rows(self):
+        soup = self.make_recipe("Soup", ["2 carrots"])
+        call_command("build_ingredient_index", stdout=io.StringIO())
+        ingredient_index.clear()
+        RecipeIngredient.objects.create(recipe=soup, position=1, name="leek")  # written by "another process"
+
+        self.assertTrue(ingredient_index.load_snapshot())
+        self.assertEqual([match.recipe_id for match in ingredient_index.search(["leek"])], [soup.pk])
+
+    def test_missing_ingredients_parameter_is_rejected(self):
+        response = self.client.get(reverse("cook-with-ingredients"), {"ingredients": " , "})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse("cook-with-ingredients"), {"ingredients": "egg", "limit": "0"})
+        self.assertEqual(response.status_code, 400)
+
+
+class CanonicalUrlTests(ClearCachesMixin, TestCase):
+    url = "https://example.com/soup"
+
+    def scrape(self, url, payload=SCRAPED_PAYLOAD):
+        with patch("scrape_me.views.fetch_recipe_page", return_value=STUB_PAGE) as mock_fetch, patch(
+            "scrape_me.views.scrape_recipe_html", return_value=payload
+        ):
+            response = self.client.get(reverse("parse-recipe-url"), {"url": url})
+        self.assertEqual(response.status_code, 200)
+        return response.json(), mock_fetch
+
+    def test_variant_of_a_stored_url_is_served_without_scraping(self):
+        Recipe.objects.create(source_url=self.url, title="Stored", views=3)
+
+        body, mock_fetch = self.scrape("http://www.example.com/soup/?utm_source=newsletter#print")
+
+        self.assertEqual((body["source_url"], body["views"]), (self.url, 4))
+        mock_fetch.assert_not_called()
+
+    def test_page_declared_canonical_url_becomes_an_alias(self):
+        canonical = {**SCRAPED_PAYLOAD, "canonical_url": "https://example.com/recipes/soup"}
+        stored, _ = self.scrape("https://example.com/recipes/soup")
+        # Another URL for the same page: scraped once, then stored as an alias instead of a new row.
+        body, _ = self.scrape("https://example.com/soup?from=home", canonical)
+
+        self.assertEqual(body["id"], stored["id"])
+        self.assertEqual(Recipe.objects.count(), 1)
+        self.assertTrue(RecipeAlias.objects.filter(url="https://example.com/soup?from=home").exists())
+
+        with self.assertNumQueries(1):
+            recipe = find_recipe("https://example.com/soup?from=home")
+        self.assertEqual(recipe.pk, stored["id"])
+
+        body, mock_fetch = self.scrape("https://www.example.com/soup?from=home&utm_medium=email")
+        self.assertEqual(body["id"], stored["id"])
+        mock_fetch.assert_not_called()
+
+    def test_first_scrape_aliases_the_declared_canonical_url(self):
+        payload = {**SCRAPED_PAYLOAD, "canonical_url": "https://example.com/recipes/soup"}
+        body, _ = self.scrape("https://example.com/soup?from=home", payload)
+
+        self.assertEqual(body["source_url"], "https://example.com/soup?from=home")
+        self.assertEqual(find_recipe("https://example.com/recipes/soup").pk, body["id"])
+
+    def test_declared_canonical_url_on_another_site_or_the_home_page_is_ignored(self):
+        for declared in ("https://other.example.org/soup", "https://example.com/"):
+            with self.subTest(declared=declared):
+                self.assertIsNone(declared_canonical_url({"canonical_url": declared}, self.url))
+
+    @patch("scrape_me.ingest.fetch_recipe_page_async", new_callable=AsyncMock, return_value=STUB_PAGE)
+    async def test_bulk_ingest_resolves_variants_and_aliases(self, mock_fetch):
+        stored = await Recipe.objects.acreate(source_url=self.url, title="Stored")
+        await RecipeAlias.objects.acreate(url="https://example.com/soup-2", recipe=stored)
+        payload = {**SCRAPED_PAYLOAD, "canonical_url": self.url}
+
+        with patch("scrape_me.ingest.scrape_recipe_html", return_value=payload):
+            report = await ingest_recipe_urls(
+                ["http://www.example.com/soup/", "https://example.com/soup-2", "https://example.com/soup?id=3"]
+            )
+
+        self.assertEqual([(entry["status"], entry["id"]) for entry in report], [("exists", stored.pk)] * 3)
+        self.assertEqual(await Recipe.objects.acount(), 1)
+        mock_fetch.assert_awaited_once_with("https://example.com/soup?id=3")
+
+    def test_merge_command_collapses_stored_variants(self):
+        kept = Recipe.objects.create(source_url="https://example.com/soup", title="Soup", views=5)
+        variant = Recipe.objects.create(source_url="http://www.example.com/soup?utm_source=x", title="Soup", views=2)
+        copy_ = Recipe.objects.create(title="Copy", duplicate_of=variant)
+        RecipeAlias.objects.create(url="https://example.com/tomato-soup", recipe=variant)
+        first = Recipe.objects.create(source_url="http://example.com/stew/amp", title="Stew", views=1)
+        second = Recipe.objects.create(source_url="https://www.example.com/stew", title="Stew", views=1)
+
+        stdout = io.StringIO()
+        call_command("merge_url_variants", "--dry-run", stdout=stdout)
+        self.assertIn("scanned: 4, would be renamed: 1, would be merged: 2", stdout.getvalue())
+        self.assertEqual(Recipe.objects.count(), 5)
+
+        stdout = io.StringIO()
+        call_command("merge_url_variants", stdout=stdout)
+        self.assertIn("scanned: 4, renamed: 1, merged: 2", stdout.getvalue())
+
+        kept.refresh_from_db()
+        first.refresh_from_db()
+        self.assertEqual(kept.views, 7)
+        self.assertEqual((first.source_url, first.views), ("https://example.com/stew", 2))
+        self.assertFalse(Recipe.objects.filter(pk__in=[variant.pk, second.pk]).exists())
+        self.assertEqual(Recipe.objects.get(pk=copy_.pk).duplicate_of_id, kept.pk)
+        self.assertEqual(find_recipe("https://example.com/tomato-soup").pk, kept.pk)
+
+    def test_hit_rate_report_over_logged_urls(self):
+        Recipe.objects.create(source_url=self.url, title="Stored")
+        log = tempfile.NamedTemporaryFile("w", suffix=".log", delete=False)
+        self.addCleanup(Path(log.name).unlink)
+        with log:
+            log.write(
+                "https://example.com/soup\n"
+                '127.0.0.1 - - "GET /parse-recipe-url?url=http%3A%2F%2Fwww.example.com%2Fsoup HTTP/1.1" 200\n'
+                "https://example.com/soup?utm_source=x\n"
+                "https://example.com/stew\n"
+                "https://example.com/stew#method\n"
+                "not a url\n"
+            )
+
+        stdout = io.StringIO()
+        call_command("url_hit_rate", log.name, stdout=stdout)
+
+        output = stdout.getvalue()
+        self.assertIn("requests: 5", output)
+        self.assertIn("legacy URLs:    5 distinct, hit rate 20.0%", output)
+        self.assertIn("canonical URLs: 2 distinct, hit rate 80.0%", output)
+        self.assertIn("improvement: +60.0 percentage points", output)
+
+
+SOUP_INGREDIENTS = ["2 tbsp olive oil", "1 onion, chopped", "800 g canned tomatoes", "500 ml vegetable stock", "salt"]
+SOUP_STEPS = [
+    "Soften the onion in the oil over a low heat for ten minutes.",
+    "Add the tomatoes and stock, bring to a boil and simmer for twenty minutes.",
+    "Blend until smooth, season with salt and serve hot.",
+]
+
+
+@override_settings(RECIPE_SCRAPE_SUPPORTED_ONLY=False)
+class NearDuplicateTests(ClearCachesMixin, TestCase):
+    def test_signatures_estimate_content_similarity(self):
+        original = recipe_signature(SOUP_INGREDIENTS, SOUP_STEPS)
+        # A syndicated copy: converted quantities, one step reworded slightly.
+        copy_ = recipe_signature(
+            ["2 tablespoons olive oil", "1 onion", "28 oz canned tomatoes", "2 cups vegetable stock", "salt"],
+            SOUP_STEPS[:2] + ["Blend until smooth, season with salt and serve."],
+        )
+        other = recipe_signature(["2 cups flour", "2 eggs", "1 cup milk"], ["Whisk everything and fry in a pan."])
+
+        self.assertGreaterEqual(similarity(original, copy_), 0.8)
+        self.assertLess(similarity(original, other), 0.2)
+        self.assertIsNone(recipe_signature([], []))
+
+    def scrape(self, url, **overrides):
+        payload = {**SCRAPED_PAYLOAD, "ingredients": SOUP_INGREDIENTS, "instructions": "\n".join(SOUP_STEPS)}
+        payload.update(overrides)
+        with patch("scrape_me.views.fetch_recipe_page", return_value=STUB_PAGE), patch(
+            "scrape_me.views.scrape_recipe_html", return_value=payload
+        ):
+            response = self.client.get(reverse("parse-recipe-url"), {"url": url})
+        self.assertEqual(response.status_code, 200)
+        return Recipe.objects.get(pk=response.json()["id"])
+
+    def test_syndicated_copy_is_linked_to_the_first_stored_recipe(self):
+        first = self.scrape("https://example.com/soup")
+        second = self.scrape("https://example.org/tomato-soup", title="Tomato soup")
+        third = self.scrape("https://example.net/soup-copy")
+        different = self.scrape("https://example.com/pancakes", ingredients=["2 eggs"], instructions="Fry the eggs.")
+
+        self.assertIsNone(first.duplicate_of_id)
+        self.assertEqual((second.duplicate_of_id, third.duplicate_of_id), (first.pk, first.pk))
+        self.assertIsNone(different.duplicate_of_id)
+
+    @patch("scrape_me.ingest.fetch_recipe_page_async", new_callable=AsyncMock, return_value=STUB_PAGE)
+    async def test_bulk_ingest_can_skip_near_duplicates(self, mock_fetch):
+        payload = {**SCRAPED_PAYLOAD, "ingredients": SOUP_INGREDIENTS, "instructions": "\n".join(SOUP_STEPS)}
+        with patch("scrape_me.ingest.scrape_recipe_html", return_value=payload):
+            await ingest_recipe_urls(["https://example.com/soup"])
+            report = await ingest_recipe_urls(["https://example.org/soup"], skip_duplicates=True)
+            linked = await ingest_recipe_urls(["https://example.net/soup"])
+
+        stored = await Recipe.objects.aget(source_url="https://example.com/soup")
+        self.assertEqual((report[0]["status"], report[0]["id"]), ("near_duplicate", stored.pk))
+        self.assertFalse(await Recipe.objects.filter(source_url="https://example.org/soup").aexists())
+        copy_ = await Recipe.objects.aget(pk=linked[0]["id"])
+        self.assertEqual(copy_.duplicate_of_id, stored.pk)
+
+    def test_cluster_command_links_the_existing_catalog(self):
+        recipes = [
+            Recipe.objects.create(title=f"Soup {n}", ingredients=SOUP_INGREDIENTS, instructions=SOUP_STEPS)
+            for n in range(3)
+        ]
+        pancakes = Recipe.objects.create(title="Pancakes", ingredients=["2 eggs"], instructions=["Fry the eggs."])
+        Recipe.objects.create(title="Empty")
+        Recipe.objects.filter(pk=pancakes.pk).update(duplicate_of=recipes[0])  # stale link
+
+        stdout = io.StringIO()
+        call_command("cluster_duplicates", workers=2, batch_size=2, stdout=stdout, stderr=io.StringIO())
+
+        self.assertIn("fingerprinted: 5, clusters: 1, duplicates: 2", stdout.getvalue())
+        links = dict(Recipe.objects.values_list("pk", "duplicate_of_id"))
+        self.assertEqual([links[recipe.pk] for recipe in recipes], [None, recipes[0].pk, recipes[0].pk])
+        self.assertIsNone(links[pancakes.pk])
+
+    def test_clustering_compares_every_pair_in_a_bucket(self):
+        other, first, second = [Recipe.objects.create(title=title) for title in ("Other", "Soup", "Soup copy")]
+        # All three share only band 0; the soups differ in one value of every other band (0.88 similar).
+        soup = array("I", range(NUM_PERM))
+        copy_ = array("I", soup)
+        unrelated = array("I", soup)
+        for index in range(ROWS, NUM_PERM):
+            unrelated[index] += NUM_PERM
+            if index % ROWS == 0:
+                copy_[index] += 2 * NUM_PERM
+        _store_fingerprints({other.pk: unrelated, first.pk: soup, second.pk: copy_})
+        self.assertGreaterEqual(similarity(soup, copy_), settings.RECIPE_DUPLICATE_THRESHOLD)
+
+        cluster_duplicates(workers=1)
+
+        links = dict(Recipe.objects.values_list("pk", "duplicate_of_id"))
+        self.assertEqual((links[other.pk], links[first.pk], links[second.pk]), (None, None, first.pk))
+
+
+class OriginStub:
+    """Local HTTP origin serving one recipe page with ETag/Last-Modified validators."""
+
+    def __init__(self):
+        self.title = "Soup"
+        self.etag = '"v1"'
+        self.last_modified = "Wed, 01 Jan 2025 00:00:00 GMT"
+        # Encoding of the body and the charset declared for it (None: not declared).
+        self.encoding = self.charset = "utf-8"
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests.append(dict(self.headers))
+                if stub.etag and self.headers.get("If-None-Match") == stub.etag or (
+                    not stub.etag and self.headers.get("If-Modified-Since") == stub.last_modified
+                ):
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                body = recipe_page(stub.title).encode(stub.encoding)
+                self.send_response(200)
+                self.send_header("Content-Type", f"text/html; charset={stub.charset}" if stub.charset else "text/html")
+                self.send_header("Content-Length", str(len(body)))
+                if stub.etag:
+                    self.send_header("ETag", stub.etag)
+                self.send_header("Last-Modified", stub.last_modified)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/soup"
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FetchRecipePageTests(SimpleTestCase):
+    def setUp(self):
+        self.origin = OriginStub()
+        self.addCleanup(self.origin.close)
+        self.origin.title = "Jalapeño crème soup"
+
+    def test_declared_charset_is_used(self):
+        self.origin.encoding = self.origin.charset = "iso-8859-1"
+        self.assertIn("Jalapeño crème soup", fetch_recipe_page(self.origin.url).html)
+
+    async def test_declared_charset_is_used_async(self):
+        self.origin.encoding = self.origin.charset = "cp1252"
+        self.assertIn("Jalapeño crème soup", (await fetch_recipe_page_async(self.origin.url)).html)
+
+    def test_undeclared_non_utf8_page_still_decodes(self):
+        self.origin.encoding, self.origin.charset = "cp1252", None
+        self.assertIn("Jalape\ufffdo", fetch_recipe_page(self.origin.url).html)
+
+
+@override_settings(RECIPE_SCRAPE_SUPPORTED_ONLY=False)
+class ConditionalRefreshTests(ClearCachesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.origin = OriginStub()
+        self.addCleanup(self.origin.close)
+        self.client.get(reverse("parse-recipe-url"), {"url": self.origin.url})
+        self.recipe = Recipe.objects.get(source_url=self.origin.url)
+
+    def test_scrape_stores_origin_validators(self):
+        self.assertEqual(self.recipe.origin_etag, '"v1"')
+        self.assertEqual(self.recipe.origin_last_modified, self.origin.last_modified)
+        self.assertIsNotNone(self.recipe.last_checked_at)
+
+    def test_not_modified_only_touches_last_checked_at(self):
+        Recipe.objects.filter(pk=self.recipe.pk).update(last_checked_at=timezone.now() - timedelta(days=2))
+        recipe = Recipe.objects.get(pk=self.recipe.pk)
+
+        with patch("scrape_me.refresh.scrape_recipe_html") as mock_scrape:
+            self.assertEqual(refresh_recipe(recipe), RefreshOutcome.NOT_MODIFIED)
+
+        mock_scrape.assert_not_called()
+        self.assertEqual(self.origin.requests[-1]["If-None-Match"], '"v1"')
+        self.assertEqual(self.origin.requests[-1]["If-Modified-Since"], self.origin.last_modified)
+        stored = Recipe.objects.get(pk=self.recipe.pk)
+        self.assertGreater(stored.last_checked_at, self.recipe.last_checked_at)
+        self.assertEqual(stored.updated_at, self.recipe.updated_at)
+
+    def test_changed_page_is_reparsed_and_new_validators_stored(self):
+        self.origin.title, self.origin.etag = "Better Soup", '"v2"'
+
+        self.assertEqual(refresh_recipe(self.recipe), RefreshOutcome.UPDATED)
+
+        stored = Recipe.objects.get(pk=self.recipe.pk)
+        self.assertEqual((stored.title, stored.origin_etag), ("Better Soup", '"v2"'))
+        self.assertEqual(html_store.get(stored.html_sha256), recipe_page("Better Soup"))
+
+    def test_last_modified_alone_revalidates(self):
+        self.origin.etag = ""
+        Recipe.objects.filter(pk=self.recipe.pk).update(origin_etag="")
+
+        stdout = io.StringIO()
+        call_command("refresh_recipes", url=[self.origin.url], stdout=stdout)
+
+        self.assertIn("not_modified: 1", stdout.getvalue())
+        self.assertNotIn("If-None-Match", self.origin.requests[-1])
+
+    def test_stale_recipes_selects_unchecked_and_old(self):
+        new = Recipe.objects.create(source_url="https://example.com/new")
+        never = Recipe.objects.create(source_url="https://example.com/never")
+        Recipe.objects.filter(pk=never.pk).update(created_at=timezone.now() - timedelta(days=3))
+        Recipe.objects.filter(pk=self.recipe.pk).update(last_checked_at=timezone.now() - timedelta(days=2))
+
+        self.assertEqual(list(stale_recipes(max_age=3600)), [never, self.recipe])
+        self.assertNotIn(new, stale_recipes(max_age=3600))
+
+
+@override_settings(
+    RECIPE_SCRAPE_SUPPORTED_ONLY=False,
+    RECIPE_REFRESH_AFTER=3600,
+    RECIPE_REFRESH_DOMAIN_INTERVAL=60,
+    RECIPE_REFRESH_RETRY_BASE=30,
+    RECIPE_REFRESH_MAX_ATTEMPTS=2,
+)
+class RefreshQueueTests(ClearCachesMixin, TestCase):
+    def make_recipe(self, url, checked_hours_ago=2):
+        recipe = Recipe.objects.create(source_url=url, title="Stored")
+        Recipe.objects.filter(pk=recipe.pk).update(last_checked_at=timezone.now() - timedelta(hours=checked_hours_ago))
+        return Recipe.objects.get(pk=recipe.pk)
+
+    @patch("scrape_me.views.fetch_recipe_page")
+    def test_stale_hit_is_served_and_queued_once(self, mock_fetch):
+        recipe = self.make_recipe("https://example.com/soup")
+        fresh = self.make_recipe("https://example.com/fresh", checked_hours_ago=0)
+
+        for url in [recipe.source_url, recipe.source_url, fresh.source_url]:
+            response = self.client.get(reverse("parse-recipe-url"), {"url": url})
+            self.assertEqual(response.json()["title"], "Stored")
+
+        mock_fetch.assert_not_called()
+        self.assertEqual(list(RefreshJob.objects.values_list("recipe_id", "domain")), [(recipe.pk, "example.com")])
+        caches["default"].clear()
+        enqueue_refresh(recipe)
+        self.assertEqual(RefreshJob.objects.count(), 1)
+
+    def test_worker_refreshes_queued_recipe(self):
+        origin = OriginStub()
+        self.addCleanup(origin.close)
+        recipe = self.make_recipe(origin.url)
+        enqueue_refresh(recipe)
+
+        stdout = io.StringIO()
+        call_command("run_refresh_worker", once=True, stdout=stdout)
+
+        self.assertIn("Ran 1 refresh jobs.", stdout.getvalue())
+        self.assertFalse(RefreshJob.objects.exists())
+        recipe.refresh_from_db()
+        self.assertEqual((recipe.title, recipe.origin_etag), ("Soup", '"v1"'))
+
+    def test_claims_respect_leases_and_domain_throttle(self):
+        for url in ["https://a.example/1", "https://a.example/2", "https://b.example/1"]:
+            enqueue_refresh(self.make_recipe(url))
+
+        first, second = claim_next_job(), claim_next_job()
+
+        self.assertEqual([first.domain, second.domain], ["a.example", "b.example"])
+        self.assertIsNone(claim_next_job())
+        self.assertIsNone(RefreshJob.claim(first.pk, 60))
+
+        RefreshJob.objects.filter(pk=first.pk).update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+        DomainThrottle.objects.update(next_allowed_at=timezone.now())
+        self.assertEqual(claim_next_job().pk, first.pk)
+
+    @patch("scrape_me.refresh_queue.refresh_recipe", side_effect=ValueError("origin down"))
+    def test_failures_back_off_then_give_up(self, mock_refresh):
+        recipe = self.make_recipe("https://example.com/soup")
+        enqueue_refresh(recipe)
+
+        self.assertFalse(run_job(claim_next_job()))
+        job = RefreshJob.objects.get()
+        self.assertEqual((job.attempts, job.last_error, job.lease_token), (1, "ValueError: origin down", ""))
+        self.assertAlmostEqual((job.run_after - timezone.now()).total_seconds(), 30, delta=5)
+        self.assertIsNone(claim_next_job())
+
+        RefreshJob.objects.update(run_after=timezone.now())
+        DomainThrottle.objects.all().delete()
+        with self.assertLogs("scrape_me.refresh_queue", level="WARNING"):
+            self.assertFalse(run_job(claim_next_job()))
+        self.assertFalse(RefreshJob.objects.exists())
+        recipe.refresh_from_db()
+        self.assertFalse(is_stale(recipe))
+
+
+class FakeReplicate:
+    """Stands in for the `replicate` module; answers with a fixed recipe JSON string."""
+
+    def __init__(self, output='{"title": "Pancakes", "ingredients": ["1 egg"]}'):
+        self.output = output
+        self.calls = []
+
+    def run(self, model, input, api_token):
+        self.calls.append((model, input))
+        return [self.output[:10], self.output[10:]]  # replicate streams output in pieces
+
+
+@override_settings(RECIPE_STRUCT_MODEL="test/model")
+class ModelResultCacheTests(ClearCachesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.replicate = FakeReplicate()
+        for patcher in (
+            patch.dict("sys.modules", {"replicate": self.replicate}),
+            patch.dict("os.environ", {"REPLICATE_API_TOKEN": "token"}),
+            patch("scrape_me.views._RECIPE_SYSTEM_PROMPT", "Return recipe JSON."),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def convert(self, raw_text, source_url=None):
+        response = self.client.post(
+            reverse("convert-raw-recipe"),
+            data=json.dumps({"raw_text": raw_text, "source_url": source_url}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_identical_paste_is_answered_from_cache(self):
+        first = self.convert("Pancakes\r\n\r\n1  egg \n", "https://example.com/p")
+        second = self.convert("  Pancakes\n\n1 egg", "https://example.com/p")
+
+        self.assertEqual(first, second)
+        self.assertEqual(first["title"], "Pancakes")
+        self.assertEqual(len(self.replicate.calls), 1)
+        self.assertEqual(self.replicate.calls[0][0], "test/model")
+        # Tallies stay in memory until flushed; reading the stats flushes them.
+        self.assertFalse(TableCounter.objects.filter(name__startswith="model-cache-").exists())
+        self.assertEqual(model_cache_stats(), {"hits": 1, "misses": 1, "hit_rate": 0.5})
+        self.assertEqual(TableCounter.objects.get(name="model-cache-hits").value, 1)
+
+    def test_key_covers_prompt_model_text_and_url(self):
+        self.convert("Pancakes")
+        self.convert("Pancakes", "https://example.com/p")
+        self.convert("Waffles")
+        with override_settings(RECIPE_STRUCT_MODEL="test/other"):
+            self.convert("Pancakes")
+        with patch("scrape_me.views._RECIPE_SYSTEM_PROMPT", "New prompt."):
+            self.convert("Pancakes")
+
+        self.assertEqual(len(self.replicate.calls), 5)
+
+    def test_failures_are_not_cached(self):
+        self.replicate.output = "not json"
+        response = self.client.post(
+            reverse("convert-raw-recipe"), data=json.dumps({"raw_text": "Pancakes"}), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 502)
+
+        self.replicate.output = '{"title": "Pancakes"}'
+        self.assertEqual(self.convert("Pancakes"), {"title": "Pancakes"})
+        self.assertEqual(len(self.replicate.calls), 2)
+
+    def test_stats_command(self):
+        self.convert("Pancakes")
+        self.convert("Pancakes")
+
+        stdout = io.StringIO()
+        call_command("model_cache_stats", reset=True, clear=True, stdout=stdout)
+
+        self.assertIn("hits: 1, misses: 1, hit rate: 50.0%", stdout.getvalue())
+        self.assertEqual(model_cache_stats()["hits"], 0)
+        self.convert("Pancakes")
+        self.assertEqual(len(self.replicate.calls), 2)
+
+
+STRUCTURED_PASTE = """Classic Pancakes
+Fluffy weekend pancakes.
+Serves 4
+Prep time: 10 minutes
+Cook time: 1 hour 5 min
+
+Ingredients:
+- 2 cups flour
+- 2 eggs
+- 1 1/2 cups milk
+- Salt
+
+Method
+1. Whisk the dry ingredients together.
+2) Beat in the eggs and milk until smooth.
+Step 3: Fry ladlefuls in a hot pan until golden.
+"""
+
+
+class LocalRawTextParserTests(ClearCachesMixin, TestCase):
+    def test_structured_paste_is_parsed_with_full_confidence(self):
+        parsed = parse_raw_recipe(STRUCTURED_PASTE, "https://example.com/pancakes")
+
+        self.assertEqual(parsed.confidence, 1.0)
+        self.assertEqual(parsed.result["title"], "Classic Pancakes")
+        self.assertEqual(parsed.result["description"], "Fluffy weekend pancakes.")
+        self.assertEqual((parsed.result["yields"], parsed.result["total_time"]), ("4", 75))
+        self.assertEqual(parsed.result["ingredients"], ["2 cups flour", "2 eggs", "1 1/2 cups milk", "Salt"])
+        self.assertEqual(
+            parsed.result["instructions"],
+            [
+                "Whisk the dry ingredients together.",
+                "Beat in the eggs and milk until smooth.",
+                "Fry ladlefuls in a hot pan until golden.",
+            ],
+        )
+
+    def test_unstructured_text_has_no_confidence(self):
+        self.assertEqual(parse_raw_recipe("Mix an egg with flour and fry it.").confidence, 0.0)
+        self.assertEqual(parse_raw_recipe("Ingredients\n2 eggs\n").confidence, 0.0)
+
+    def test_run_together_method_lowers_confidence(self):
+        parsed = parse_raw_recipe("Ingredients\n2 eggs\nMethod\nBeat the eggs, then fry them in butter.")
+        self.assertLess(parsed.confidence, 0.8)
+
+    @patch("scrape_me.views._invoke_recipe_struct_model")
+    def test_confident_parse_skips_the_model(self, mock_invoke):
+        response = self.client.post(
+            reverse("convert-raw-recipe") + "?persist=true",
+            data=json.dumps({"raw_text": STRUCTURED_PASTE}),
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["title"], "Classic Pancakes")
+        mock_invoke.assert_not_called()
+        recipe = Recipe.objects.get()
+        self.assertEqual((recipe.type, len(recipe.instructions)), (RecipeType.AI_GENERATED, 3))
+
+    @override_settings(RECIPE_LOCAL_PARSE_MIN_CONFIDENCE=1.1)
+    @patch("scrape_me.views._invoke_recipe_struct_model", return_value={"title": "From model"})
+    def test_threshold_above_one_always_uses_the_model(self, mock_invoke):
+        response = self.client.post(
+            reverse("convert-raw-recipe"),
+            data=json.dumps({"raw_text": STRUCTURED_PASTE}),
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.json(), {"title": "From model"})
+        mock_invoke.assert_called_once_with(None, STRUCTURED_PASTE)
+
+
+class DeferredExecutor:
+    """Executor stand-in that holds submitted work until `run_all` is called."""
+
+    def __init__(self):
+        self.pending = []
+
+    def submit(self, fn, *args):
+        self.pending.append((fn, args))
+
+    def run_all(self):
+        while self.pending:
+            fn, args = self.pending.pop(0)
+            fn(*args)
+
+
+@override_settings(RECIPE_CONVERT_CONCURRENCY=1, RECIPE_CONVERT_QUEUE_DEPTH=1)
+class ConvertJobTests(ClearCachesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.executor = DeferredExecutor()
+        for patcher in (
+            patch.object(convert_jobs, "_pool", self.executor),
+            patch.object(convert_jobs, "_slots", threading.BoundedSemaphore(2)),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def submit(self, raw_text="Pancakes", **params):
+        query = "&".join(["async=true"] + [f"{key}={value}" for key, value in params.items()])
+        return self.client.post(
+            f"{reverse('convert-raw-recipe')}?{query}",
+            data=json.dumps({"raw_text": raw_text, "source_url": "https://example.com/pancakes"}),
+            content_type="application/json",
+        )
+
+    @patch("scrape_me.views._invoke_recipe_struct_model")
+    def test_job_is_accepted_then_polled_to_completion(self, mock_invoke):
+        mock_invoke.return_value = {"title": "Pancakes", "ingredients": ["1 egg"], "instructions": "Mix.\nFry."}
+
+        response = self.submit(persist="true")
+        self.assertEqual(response.status_code, 202)
+        status_url = response.json()["status_url"]
+        self.assertEqual(response["Location"], status_url)
+        self.assertEqual(self.client.get(status_url).json()["status"], "queued")
+        mock_invoke.assert_not_called()
+
+        self.executor.run_all()
+
+        job = self.client.get(status_url).json()
+        self.assertEqual((job["status"], job["result"]["title"], job["error"]), ("succeeded", "Pancakes", None))
+        recipe = Recipe.objects.get(pk=job["recipe_id"])
+        self.assertEqual((recipe.type, recipe.instructions), (RecipeType.AI_GENERATED, ["Mix.", "Fry."]))
+        self.assertEqual(recipe.source_url, "https://example.com/pancakes")
+
+    def test_finished_at_is_recorded_after_the_conversion(self):
+        converted_at = []
+
+        def convert(source_url, raw_text):
+            converted_at.append(timezone.now())
+            if len(converted_at) == 2:
+                raise RecipeStructError("Upstream error")
+            return {"title": "Pancakes"}
+
+        with patch("scrape_me.views._invoke_recipe_struct_model", side_effect=convert):
+            self.submit()
+            self.submit()
+            self.executor.run_all()
+
+        jobs = ConvertJob.objects.order_by("created_at")
+        self.assertEqual([job.status for job in jobs], [ConvertJob.Status.SUCCEEDED, ConvertJob.Status.FAILED])
+        for job, started in zip(jobs, converted_at):
+            self.assertGreater(job.finished_at, job.created_at)
+            self.assertGreater(job.finished_at, started)
+
+    @patch("scrape_me.views._invoke_recipe_struct_model", side_effect=RecipeStructError("Upstream error"))
+    def test_failed_conversion_is_reported(self, mock_invoke):
+        status_url = self.submit().json()["status_url"]
+        self.executor.run_all()
+
+        self.assertEqual(self.client.get(status_url).json()["error"], "Upstream error")
+        self.assertEqual(ConvertJob.objects.get().status, ConvertJob.Status.FAILED)
+
+    def test_full_queue_is_refused(self):
+        self.assertEqual([self.submit().status_code for _ in range(3)], [202, 202, 503])
+        self.assertEqual(ConvertJob.objects.count(), 2)
+
+    def test_unknown_job_and_bad_flag(self):
+        missing = reverse("convert-raw-recipe-job", args=["00000000-0000-0000-0000-000000000000"])
+        self.assertEqual(self.client.get(missing).status_code, 404)
+        self.assertEqual(self.submit(persist="maybe").status_code, 400)
+
+    @patch("scrape_me.views._invoke_recipe_struct_model", return_value={"title": "Stew"})
+    def test_persisted_result_with_taken_url_is_stored_without_it(self, mock_invoke):
+        Recipe.objects.create(source_url="https://example.com/pancakes", title="Scraped")
+
+        self.submit(persist="true")
+        self.executor.run_all()
+
+        self.assertIsNone(Recipe.objects.get(title="Stew").source_url)
+
+
+def metric_value(text, name, **labels):
+    """The value of one sample in Prometheus text output, or None if it is absent."""
+
+    selector = ",".join(f'{label}="{value}"' for label, value in labels.items())
+    prefix = f"{name}{{{selector}}} " if labels else f"{name} "
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return float(line[len(prefix):])
+    return None
+
+
+@override_settings(RECIPE_SCRAPE_SUPPORTED_ONLY=False, RECIPE_STRUCT_MODEL="test/model", METRICS_DIR=None)
+class MetricsTests(ClearCachesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        metrics_registry.reset()
+        self.addCleanup(metrics_registry.reset)
+
+    def scrape(self):
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        return response.content.decode()
+
+    def test_view_latency_and_sql_cost_are_recorded_per_view(self):
+        Recipe.objects.create(source_url="https://example.com/soup", title="Soup")
+        for _ in range(2):
+            self.assertEqual(self.client.get(reverse("get-recipes"), {"cursor": ""}).status_code, 200)
+
+        text = self.scrape()
+        labels = {"view": "get-recipes", "method": "GET", "status": "200"}
+        self.assertEqual(metric_value(text, "flavorbuddy_view_seconds_count", **labels), 2)
+        self.assertEqual(metric_value(text, "flavorbuddy_view_seconds_bucket", **labels, le="+Inf"), 2)
+        self.assertGreater(metric_value(text, "flavorbuddy_view_seconds_sum", **labels), 0)
+        self.assertEqual(metric_value(text, "flavorbuddy_view_sql_queries_sum", view="get-recipes"), 2)
+        self.assertEqual(metric_value(text, "flavorbuddy_view_sql_queries_bucket", view="get-recipes", le="0.0"), 0)
+        self.assertEqual(metric_value(text, "flavorbuddy_view_sql_queries_bucket", view="get-recipes", le="1.0"), 2)
+        self.assertGreater(metric_value(text, "flavorbuddy_view_sql_seconds_sum", view="get-recipes"), 0)
+        self.assertEqual(metric_value(text, "flavorbuddy_serialize_seconds_count", kind="list"), 2)
+
+    async def test_async_views_count_queries_run_in_threads(self):
+        await Recipe.objects.acreate(source_url="https://example.com/soup", title="Soup")
+
+        response = await self.async_client.get(reverse("parse-recipe-url-async"), {"url": "https://example.com/soup"})
+        self.assertEqual(response.status_code, 200)
+
+        text = metrics_registry.render()
+        self.assertGreater(metric_value(text, "flavorbuddy_view_sql_queries_sum", view="parse-recipe-url-async"), 0)
+
+    def test_scrape_fetch_and_parse_are_timed_per_domain(self):
+        origin = OriginStub()
+        self.addCleanup(origin.close)
+
+        self.assertEqual(self.client.get(reverse("parse-recipe-url"), {"url": origin.url}).status_code, 200)
+
+        text = self.scrape()
+        for name in ("flavorbuddy_scrape_fetch_seconds_count", "flavorbuddy_scrape_parse_seconds_count"):
+            self.assertEqual(metric_value(text, name, domain="127.0.0.1", outcome="ok"), 1)
+
+    def test_model_calls_are_timed(self):
+        replicate = FakeReplicate()
+        with patch.dict("sys.modules", {"replicate": replicate}), patch.dict(
+            "os.environ", {"REPLICATE_API_TOKEN": "token"}
+        ), patch("scrape_me.views._RECIPE_SYSTEM_PROMPT", "Return recipe JSON."):
+            response = self.client.post(
+                reverse("convert-raw-recipe"), data=json.dumps({"raw_text": "Pancakes"}), content_type="application/json"
+            )
+        self.assertEqual(response.status_code, 200)
+
+        text = self.scrape()
+        self.assertEqual(metric_value(text, "flavorbuddy_model_call_seconds_count", model="test/model", outcome="ok"), 1)
+
+    def test_label_values_are_escaped(self):
+        view_latency.observe(0.01, 'a "quoted"\\view', "GET", "200")
+
+        self.assertIn('view="a \\"quoted\\"\\\\view"', metrics_registry.render())
+
+    def test_totals_are_summed_across_worker_processes(self):
+        metrics_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(metrics_dir.cleanup)
+        with override_settings(METRICS_DIR=metrics_dir.name):
+            view_latency.observe(0.01, "home", "GET", "200")
+            pid = os.fork()
+            if pid == 0:  # pragma: no cover - runs in the child
+                try:
+                    # The child starts from zero and reports under its own file.
+                    view_latency.observe(0.02, "home", "GET", "200")
+                    view_latency.observe(0.03, "home", "GET", "200")
+                    metrics_registry.write()
+                finally:
+                    os._exit(0)
+            os.waitpid(pid, 0)
+
+            text = metrics_registry.render()
+
+        self.assertEqual(len(list(Path(metrics_dir.name).glob("metrics-*.json"))), 2)
+        labels = {"view": "home", "method": "GET", "status": "200"}
+        self.assertEqual(metric_value(text, "flavorbuddy_view_seconds_count", **labels), 3)
+        self.assertAlmostEqual(metric_value(text, "flavorbuddy_view_seconds_sum", **labels), 0.06)
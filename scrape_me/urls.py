@@ -1,11 +1,29 @@
 from django.urls import path
 
-from .views import convert_raw_recipe, get_recipes, home, parse_recipe_url, test_scrape
+from .views import (
+    convert_raw_recipe,
+    convert_raw_recipe_job,
+    cook_with_ingredients,
+    export_recipes,
+    get_recipes,
+    home,
+    ingest_recipe_urls_view,
+    metrics,
+    parse_recipe_url,
+    parse_recipe_url_async,
+    test_scrape,
+)
 
 urlpatterns = [
     path("", home, name="home"),
     path("test-example", test_scrape, name="test-example"),
     path("parse-recipe-url", parse_recipe_url, name="parse-recipe-url"),
+    path("parse-recipe-url-async", parse_recipe_url_async, name="parse-recipe-url-async"),
+    path("ingest-recipe-urls", ingest_recipe_urls_view, name="ingest-recipe-urls"),
     path("get-recipes", get_recipes, name="get-recipes"),
+    path("cook-with-ingredients", cook_with_ingredients, name="cook-with-ingredients"),
+    path("export-recipes", export_recipes, name="export-recipes"),
     path("convert-raw-recipe", convert_raw_recipe, name="convert-raw-recipe"),
+    path("convert-raw-recipe/jobs/<uuid:job_id>", convert_raw_recipe_job, name="convert-raw-recipe-job"),
+    path("metrics", metrics, name="metrics"),
 ]
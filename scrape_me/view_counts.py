@@ -0,0 +1,34 @@
+from collections import Counter, defaultdict
+
+from django.db.models import F
+from django.utils import timezone
+
+from .buffered_counts import BufferedCounts, flush_on_exit
+from .models import Recipe
+
+
+class ViewCountBuffer(BufferedCounts):
+    """Accumulate recipe views in memory and add them to `Recipe.views` in batches.
+
+    Flushes after `RECIPE_VIEW_FLUSH_THRESHOLD` views or
+    `RECIPE_VIEW_FLUSH_INTERVAL` seconds, whichever comes first.
+    """
+
+    interval_setting = "RECIPE_VIEW_FLUSH_INTERVAL"
+    threshold_setting = "RECIPE_VIEW_FLUSH_THRESHOLD"
+    description = "recipe views"
+
+    def write(self, batch: Counter) -> None:
+        ids_by_increment = defaultdict(list)
+        for recipe_id, increment in batch.items():
+            ids_by_increment[increment].append(recipe_id)
+
+        now = timezone.now()
+        for increment, recipe_ids in ids_by_increment.items():
+            Recipe.objects.filter(pk__in=recipe_ids).update(
+                views=F("views") + increment,
+                updated_at=now,
+            )
+
+
+view_counts = flush_on_exit(ViewCountBuffer())
@@ -1,112 +1,68 @@
+import asyncio
+import copy
 import json
 import os
-from collections.abc import Iterable
+import time
 from pathlib import Path
-from typing import Any, Dict, List
-from urllib.parse import urlparse
+from typing import Any, Dict, Tuple
 
 import math
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.urls import reverse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_GET, require_POST
-from django.db.models import F
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from recipe_scrapers import scrape_me
 
-from .models import Recipe, RecipeType
-
-
-def normalize_recipe_url(url: str) -> str:
-    """Return the recipe URL without any trailing slash."""
-
-    return url.strip().rstrip("/")
-
-
-def normalize_instructions(raw_instructions: Any) -> List[str]:
-    """Convert instructions payload into a list of cleaned steps."""
-
-    if not raw_instructions:
-        return []
-
-    if isinstance(raw_instructions, str):
-        normalized = raw_instructions.replace("\r\n", "\n")
-        steps = [step.strip() for step in normalized.split("\n") if step.strip()]
-        return steps or [raw_instructions.strip()]
-
-    if isinstance(raw_instructions, Iterable):
-        cleaned_steps: List[str] = []
-        for step in raw_instructions:
-            if isinstance(step, str):
-                trimmed = step.strip()
-                if trimmed:
-                    cleaned_steps.append(trimmed)
-        return cleaned_steps
-
-    return []
-
-
-def normalize_description(raw_description: Any) -> str:
-    """Convert description payload to a cleaned string."""
-
-    if not raw_description:
-        return ""
-
-    if isinstance(raw_description, str):
-        return raw_description.strip()
-
-    if isinstance(raw_description, dict):
-        for key in ("text", "description", "value"):
-            value = raw_description.get(key)
-            if isinstance(value, str):
-                stripped = value.strip()
-                if stripped:
-                    return stripped
-        return ""
-
-    if isinstance(raw_description, Iterable):
-        parts: List[str] = []
-        for item in raw_description:
-            if isinstance(item, str):
-                trimmed = item.strip()
-                if trimmed:
-                    parts.append(trimmed)
-            elif isinstance(item, dict):
-                nested = normalize_description(item)
-                if nested:
-                    parts.append(nested)
-            else:
-                nested = normalize_description(item)
-                if nested:
-                    parts.append(nested)
-
-        return " ".join(parts)
-
-    coerced = str(raw_description).strip()
-    return coerced if coerced else ""
-
-
-def serialize_recipe(recipe: Recipe) -> Dict[str, Any]:
-    """Convert a Recipe instance into a JSON-serializable dict."""
-
-    return {
-        "id": recipe.id,
-        "source_url": recipe.source_url,
-        "description": recipe.description,
-        "title": recipe.title,
-        "author": recipe.author,
-        "total_time": recipe.total_time,
-        "yields": recipe.yields,
-        "image": recipe.image,
-        "ingredients": recipe.ingredients,
-        "instructions": recipe.instructions,
-        "views": recipe.views,
-        "type": recipe.type,
-        "created_at": recipe.created_at.isoformat(),
-        "updated_at": recipe.updated_at.isoformat(),
-    }
+from .canonical_urls import add_aliases, afind_recipe, declared_canonical_url, find_recipe
+from .convert_jobs import convert_jobs, serialize_convert_job, store_converted_recipe
+from .counting import RecipePaginator
+from .duplicates import fingerprint_recipe
+from .export import export_queryset, iter_export, parse_since
+from .failure_cache import ScrapeFailure, alookup_failure, arecord_failure, lookup_failure, record_failure
+from .fetching import FetchedPage, fetch_recipe_page, fetch_recipe_page_async, scrape_recipe_html
+from .html_store import store_html
+from .importing import ImportRowError
+from .ingredient_index import ingredient_index, ingredient_keys
+from .ingest import ingest_recipe_urls, summarize_ingest_report
+from .metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    model_call_latency,
+    registry as metrics_registry,
+    serialize_latency,
+    timed_stage,
+)
+from .models import ConvertJob, Recipe, RecipeType, ScrapeLease
+from .model_cache import cached_model_result, model_result_key
+from .normalizers import (
+    is_scrapable_url,
+    normalize_description,
+    normalize_instructions,
+    normalize_recipe_url,
+    recipe_fields_from_scrape,
+)
+from .pagination import Cursor, InvalidCursor, keyset_page
+from .raw_text_parser import parse_raw_recipe
+from .search import search_recipes
+from .refresh import origin_validators
+from .refresh_queue import enqueue_if_stale
+from .render_cache import render_cache
+from .serializers import (
+    RECIPE_FIELDS,
+    SUMMARY_FIELDS,
+    encode_json,
+    encode_json_array,
+    encode_json_object,
+    serialize_recipe_fields,
+)
+from .singleflight import InFlightCallInterrupted, SingleFlight
+from .view_counts import view_counts
+
 
 @require_GET
 def test_scrape(request):
@@ -118,65 +74,281 @@ def test_scrape(request):
     return JsonResponse(data)
 
 
-@require_GET
-def parse_recipe_url(request):
-    """Scrape a recipe URL provided via the `url` query parameter."""
-    recipe_url = request.GET.get("url")
+def _requested_recipe_url(request) -> Tuple[str | None, str | None, JsonResponse | None]:
+    """Validate the `url` query parameter; returns its normalized form and the URL to fetch.
+
+    The normalized form is only a key for lookups and storage: it may force
+    https or drop a "www." the site itself still needs, so pages are
+    fetched from the URL as submitted.
+    """
+
+    recipe_url = (request.GET.get("url") or "").strip()
     if not recipe_url:
-        return JsonResponse({"error": "Missing required 'url' query parameter."}, status=400)
+        return None, None, JsonResponse({"error": "Missing required 'url' query parameter."}, status=400)
 
     normalized_url = normalize_recipe_url(recipe_url)
+    if not (is_scrapable_url(normalized_url) and is_scrapable_url(recipe_url)):
+        return None, None, JsonResponse({"error": "Invalid URL provided."}, status=400)
 
-    parsed = urlparse(normalized_url)
-    if parsed.scheme not in {"http", "https"} or not parsed.netloc:
-        return JsonResponse({"error": "Invalid URL provided."}, status=400)
+    return normalized_url, recipe_url, None
 
-    existing_recipe = Recipe.objects.filter(source_url=normalized_url).first()
-    if existing_recipe:
-        Recipe.objects.filter(pk=existing_recipe.pk).update(
-            views=F("views") + 1,
-            updated_at=timezone.now(),
+
+class ScrapeError(Exception):
+    """Raised when a recipe page cannot be fetched or parsed."""
+
+
+class CachedScrapeFailure(ScrapeError):
+    """Raised instead of scraping when a failure was recorded while waiting for the lease."""
+
+    def __init__(self, failure: ScrapeFailure):
+        super().__init__(failure.message)
+        self.failure = failure
+
+
+# Coalesces concurrent scrapes of the same URL within this process; the
+# ScrapeLease table does the same job across worker processes.
+_scrape_flight = SingleFlight()
+
+
+def _recipe_response(recipe: Recipe) -> HttpResponse:
+    with serialize_latency.time("recipe"):
+        body = render_cache.render(recipe)
+    return HttpResponse(body, content_type="application/json")
+
+
+def _recipe_list_response(payload: Dict[str, Any], fields: Tuple[str, ...] | None = None) -> HttpResponse:
+    """Encode a listing payload whose `results` holds Recipe instances.
+
+    Full recipes come pre-encoded from the render cache and are spliced into
+    the envelope rather than re-encoded; projected ones (`fields`) are small
+    and encoded directly.
+    """
+
+    with serialize_latency.time("list"):
+        if fields is None:
+            results = encode_json_array(render_cache.render_many(payload["results"]))
+        else:
+            results = encode_json([serialize_recipe_fields(recipe, fields) for recipe in payload["results"]])
+        body = encode_json_object(payload, {"results": results})
+    return HttpResponse(body, content_type="application/json")
+
+
+def _requested_fields(request) -> Tuple[Tuple[str, ...] | None, JsonResponse | None]:
+    """Resolve the `fields` / `view` query parameters to the fields to return.
+
+    Returns None for the full recipe. Projections always include `id`.
+    """
+
+    fields_raw = request.GET.get("fields")
+    view = request.GET.get("view", "full").strip().lower()
+    if fields_raw is not None and "view" in request.GET:
+        return None, JsonResponse({"error": "Use either 'fields' or 'view', not both."}, status=400)
+    if view not in {"full", "summary"}:
+        return None, JsonResponse({"error": "Invalid 'view' parameter. Must be 'full' or 'summary'."}, status=400)
+
+    if fields_raw is None:
+        return (SUMMARY_FIELDS if view == "summary" else None), None
+
+    requested = {name.strip() for name in fields_raw.split(",") if name.strip()}
+    unknown = sorted(requested - set(RECIPE_FIELDS))
+    if not requested or unknown:
+        return None, JsonResponse(
+            {"error": f"Invalid 'fields' parameter. Choose from: {', '.join(RECIPE_FIELDS)}."},
+            status=400,
         )
-        existing_recipe.refresh_from_db(fields=["views", "updated_at"])
-        return JsonResponse(serialize_recipe(existing_recipe))
+    requested.add("id")
+    return tuple(name for name in RECIPE_FIELDS if name in requested), None
+
+
+def _count_recipe_view(recipe: Recipe) -> JsonResponse:
+    # Views are buffered and written in batches; report stored + pending.
+    recipe.views += view_counts.record(recipe.pk)
+    return _recipe_response(recipe)
+
+
+async def _acount_recipe_view(recipe: Recipe) -> JsonResponse:
+    recipe.views += await sync_to_async(view_counts.record)(recipe.pk)
+    return _recipe_response(recipe)
+
+
+def _cached_failure_response(failure: ScrapeFailure) -> JsonResponse:
+    response = JsonResponse({"error": failure.message}, status=400)
+    response["Retry-After"] = str(failure.retry_after)
+    return response
+
+
+def _create_scraped_recipe(normalized_url: str, page: FetchedPage, data: Dict[str, Any]) -> Tuple[Recipe, bool]:
+    """Archive the fetched page and insert a scraped recipe, deferring to a row another writer stored first."""
+
+    # The page may name another URL as its canonical one; when that URL is
+    # already stored, this one becomes an alias of it instead of a new row.
+    declared_url = declared_canonical_url(data, normalized_url)
+    if declared_url:
+        existing_recipe = find_recipe(declared_url)
+        if existing_recipe:
+            add_aliases(existing_recipe.pk, [normalized_url])
+            return existing_recipe, False
+
+    html_sha256 = store_html(page.html)
+    try:
+        with transaction.atomic():
+            recipe = Recipe.objects.create(
+                source_url=normalized_url,
+                views=1,
+                type=RecipeType.URL,
+                html_sha256=html_sha256,
+                last_checked_at=timezone.now(),
+                **origin_validators(page),
+                **recipe_fields_from_scrape(data),
+            )
+            # Syndicated copies are stored under their own URL but linked to the first copy.
+            fingerprint_recipe(recipe)
+            if declared_url:
+                add_aliases(recipe.pk, [declared_url])
+    except IntegrityError:
+        return Recipe.objects.get(source_url=normalized_url), False
+    return recipe, True
+
+
+def _scrape_and_store(normalized_url: str, fetch_url: str) -> Tuple[Recipe, bool]:
+    """Scrape `fetch_url` and store it under `normalized_url` unless another process is already doing so.
+
+    Returns `(recipe, created)`. Processes that lose the lease race poll for
+    the row the holder stores; if the holder fails or dies, its lease is
+    released or expires and the next poller scrapes instead.
+    """
+
+    lease_seconds = settings.RECIPE_SCRAPE_LEASE_SECONDS
+    while True:
+        token = ScrapeLease.acquire(normalized_url, lease_seconds)
+        if token:
+            try:
+                existing_recipe = find_recipe(normalized_url)
+                if existing_recipe:
+                    return existing_recipe, False
+                # The previous holder may have failed; don't fetch the URL again.
+                failure = lookup_failure(normalized_url)
+                if failure:
+                    raise CachedScrapeFailure(failure)
+                try:
+                    page = fetch_recipe_page(fetch_url)
+                    data = scrape_recipe_html(page.html, fetch_url)
+                except Exception as exc:  # recipe_scrapers raises various exceptions per site
+                    record_failure(normalized_url, exc)
+                    raise ScrapeError(str(exc)) from exc
+                return _create_scraped_recipe(normalized_url, page, data)
+            finally:
+                ScrapeLease.release(normalized_url, token)
+
+        time.sleep(settings.RECIPE_SCRAPE_LEASE_POLL_INTERVAL)
+        existing_recipe = find_recipe(normalized_url)
+        if existing_recipe:
+            return existing_recipe, False
+
+
+async def _ascrape_and_store(normalized_url: str, fetch_url: str) -> Tuple[Recipe, bool]:
+    """Async counterpart of `_scrape_and_store`."""
+
+    lease_seconds = settings.RECIPE_SCRAPE_LEASE_SECONDS
+    while True:
+        token = await sync_to_async(ScrapeLease.acquire)(normalized_url, lease_seconds)
+        if token:
+            try:
+                existing_recipe = await afind_recipe(normalized_url)
+                if existing_recipe:
+                    return existing_recipe, False
+                # The previous holder may have failed; don't fetch the URL again.
+                failure = await alookup_failure(normalized_url)
+                if failure:
+                    raise CachedScrapeFailure(failure)
+                try:
+                    page = await fetch_recipe_page_async(fetch_url)
+                    data = await sync_to_async(scrape_recipe_html, thread_sensitive=False)(page.html, fetch_url)
+                except Exception as exc:  # recipe_scrapers raises various exceptions per site
+                    await arecord_failure(normalized_url, exc)
+                    raise ScrapeError(str(exc)) from exc
+                return await sync_to_async(_create_scraped_recipe)(normalized_url, page, data)
+            finally:
+                await sync_to_async(ScrapeLease.release)(normalized_url, token)
+
+        await asyncio.sleep(settings.RECIPE_SCRAPE_LEASE_POLL_INTERVAL)
+        existing_recipe = await afind_recipe(normalized_url)
+        if existing_recipe:
+            return existing_recipe, False
+
+
+@require_GET
+def parse_recipe_url(request):
+    """Scrape a recipe URL provided via the `url` query parameter."""
+    normalized_url, fetch_url, error_response = _requested_recipe_url(request)
+    if error_response:
+        return error_response
+
+    existing_recipe = find_recipe(normalized_url)
+    if existing_recipe:
+        # Stale-while-revalidate: answer now, refresh in the background.
+        enqueue_if_stale(existing_recipe)
+        return _count_recipe_view(existing_recipe)
+
+    failure = lookup_failure(normalized_url)
+    if failure:
+        return _cached_failure_response(failure)
 
     try:
-        scraper = scrape_me(normalized_url)
-        data = scraper.to_json()
-        if isinstance(data, str):
-            data = json.loads(data)
-    except Exception as exc:  # recipe_scrapers raises various exceptions per site
+        (recipe, created), shared = _scrape_flight.do(
+            normalized_url, lambda: _scrape_and_store(normalized_url, fetch_url)
+        )
+    except CachedScrapeFailure as exc:
+        return _cached_failure_response(exc.failure)
+    except ScrapeError as exc:
         return JsonResponse({"error": str(exc)}, status=400)
+    except InFlightCallInterrupted:
+        # The request that was scraping this URL went away; the client can retry.
+        return JsonResponse({"error": "Recipe scrape was interrupted; please retry."}, status=503)
+
+    if shared or not created:
+        # Waiters share the leader's instance, so count the view on a copy.
+        return _count_recipe_view(copy.copy(recipe))
+
+    return _recipe_response(recipe)
+
+
+@require_GET
+async def parse_recipe_url_async(request):
+    """Async variant of `parse_recipe_url` for deployments served over ASGI.
+
+    The page is downloaded without holding a thread, and only the CPU-bound
+    parsing step is handed to a worker thread.
+    """
+    normalized_url, fetch_url, error_response = _requested_recipe_url(request)
+    if error_response:
+        return error_response
 
-    ingredients = data.get("ingredients") or []
-    if isinstance(ingredients, str):
-        ingredients = [line.strip() for line in ingredients.splitlines() if line.strip()]
+    existing_recipe = await afind_recipe(normalized_url)
+    if existing_recipe:
+        await sync_to_async(enqueue_if_stale)(existing_recipe)
+        return await _acount_recipe_view(existing_recipe)
 
-    instructions = normalize_instructions(data.get("instructions"))
+    failure = await alookup_failure(normalized_url)
+    if failure:
+        return _cached_failure_response(failure)
 
-    total_time = data.get("total_time")
     try:
-        total_time_value = int(total_time) if total_time is not None else None
-    except (TypeError, ValueError):
-        total_time_value = None
-
-    description_value = normalize_description(data.get("description"))
-
-    recipe = Recipe.objects.create(
-        source_url=normalized_url,
-        description=description_value,
-        title=data.get("title", ""),
-        author=data.get("author", ""),
-        total_time=total_time_value,
-        yields=data.get("yields", ""),
-        image=data.get("image", ""),
-        ingredients=ingredients,
-        instructions=instructions,
-        views=1,
-        type=RecipeType.URL,
-    )
+        (recipe, created), shared = await _scrape_flight.ado(
+            normalized_url, lambda: _ascrape_and_store(normalized_url, fetch_url)
+        )
+    except CachedScrapeFailure as exc:
+        return _cached_failure_response(exc.failure)
+    except ScrapeError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    except InFlightCallInterrupted:
+        # The request that was scraping this URL went away; the client can retry.
+        return JsonResponse({"error": "Recipe scrape was interrupted; please retry."}, status=503)
+
+    if shared or not created:
+        return await _acount_recipe_view(copy.copy(recipe))
 
-    return JsonResponse(serialize_recipe(recipe))
+    return _recipe_response(recipe)
 
 
 @require_GET
@@ -184,13 +356,31 @@ def home(request):
     return render(request, "scrape_me/home.html")
 
 
+@require_GET
+def metrics(request):
+    """Request and pipeline histograms in the Prometheus text format (see scrape_me/metrics.py)."""
+    return HttpResponse(metrics_registry.render(), content_type=METRICS_CONTENT_TYPE)
+
+
 @require_GET
 def get_recipes(request):
-    """Return a JSON list of stored recipes with optional search and pagination."""
+    """Return a JSON list of stored recipes with optional search and pagination.
+
+    Pages are addressed either by `page` number (with totals) or, for deep or
+    live-updating lists, by the opaque `cursor` returned as `next_cursor` /
+    `prev_cursor`; pass an empty `cursor=` to start cursor paging. With
+    `include_total=false`, page mode skips counting and reports null totals.
+    `fields=title,image` (or the `view=summary` preset) returns only those
+    fields, and only their columns are read from the database.
+    """
 
     query = (request.GET.get("q") or "").strip()
     page_raw = request.GET.get("page", "1")
     page_size_raw = request.GET.get("page_size", "10")
+    cursor_raw = request.GET.get("cursor")
+
+    if cursor_raw is not None and "page" in request.GET:
+        return JsonResponse({"error": "Use either 'page' or 'cursor', not both."}, status=400)
 
     try:
         page = int(page_raw)
@@ -206,30 +396,184 @@ def get_recipes(request):
     except (TypeError, ValueError):
         return JsonResponse({"error": "Invalid 'page_size' parameter. Must be between 1 and 100."}, status=400)
 
+    include_total_raw = request.GET.get("include_total", "true").strip().lower()
+    if include_total_raw not in {"true", "false", "1", "0"}:
+        return JsonResponse({"error": "Invalid 'include_total' parameter. Must be 'true' or 'false'."}, status=400)
+    include_total = include_total_raw in {"true", "1"}
+
+    fields, error_response = _requested_fields(request)
+    if error_response is not None:
+        return error_response
+
     recipes_qs = Recipe.objects.all()
-    if query:
-        recipes_qs = recipes_qs.filter(title__icontains=query)
+    if fields is not None:
+        # created_at is needed for cursors even when it is not returned.
+        recipes_qs = recipes_qs.only(*fields, "created_at")
+
+    if cursor_raw is not None:
+        try:
+            cursor = Cursor.decode(cursor_raw) if cursor_raw else None
+        except InvalidCursor as exc:
+            return JsonResponse({"error": str(exc)}, status=400)
+
+        if query:
+            recipes_qs = search_recipes(recipes_qs, query, ranked=False)
+        recipes_page, next_cursor, prev_cursor = keyset_page(recipes_qs, cursor, page_size)
+
+        return _recipe_list_response(
+            {
+                "query": query,
+                "results": recipes_page,
+                "pagination": {
+                    "page_size": page_size,
+                    "next_cursor": next_cursor,
+                    "prev_cursor": prev_cursor,
+                    "has_next": next_cursor is not None,
+                    "has_previous": prev_cursor is not None,
+                },
+            },
+            fields,
+        )
 
-    total_items = recipes_qs.count()
-    total_pages = math.ceil(total_items / page_size) if total_items else 0
+    if query:
+        recipes_qs = search_recipes(recipes_qs, query)
 
     offset = (page - 1) * page_size
-    recipes_slice = list(recipes_qs[offset : offset + page_size])
+
+    if not include_total:
+        # Skip counting entirely; one extra row tells us whether a next page exists.
+        rows = list(recipes_qs[offset : offset + page_size + 1])
+        recipes_slice = rows[:page_size]
+        total_items = total_pages = None
+        has_next = len(rows) > page_size
+        has_previous = page > 1
+    else:
+        total_items = RecipePaginator(recipes_qs, page_size).count
+        total_pages = math.ceil(total_items / page_size) if total_items else 0
+        recipes_slice = list(recipes_qs[offset : offset + page_size])
+        has_next = offset + page_size < total_items
+        has_previous = page > 1 and total_items > 0
 
     payload = {
         "query": query,
-        "results": [serialize_recipe(recipe) for recipe in recipes_slice],
+        "results": recipes_slice,
         "pagination": {
             "page": page,
             "page_size": page_size,
             "total_items": total_items,
             "total_pages": total_pages,
-            "has_next": offset + page_size < total_items,
-            "has_previous": page > 1 and total_items > 0,
+            "has_next": has_next,
+            "has_previous": has_previous,
         },
     }
 
-    return JsonResponse(payload)
+    return _recipe_list_response(payload, fields)
+
+
+@require_GET
+def cook_with_ingredients(request):
+    """Rank recipes by how well the `ingredients` on hand cover them.
+
+    `ingredients` is comma-separated (and may be repeated). Results come
+    fewest missing ingredients first, then most matched; `max_missing` drops
+    recipes that need more than that many extra ingredients.
+    """
+
+    names = [name.strip() for raw in request.GET.getlist("ingredients") for name in raw.split(",") if name.strip()]
+    if not names:
+        return JsonResponse({"error": "Parameter 'ingredients' is required."}, status=400)
+    if len(names) > 50:
+        return JsonResponse({"error": "At most 50 ingredients are allowed."}, status=400)
+
+    try:
+        limit = int(request.GET.get("limit", "20"))
+        if limit < 1 or limit > 100:
+            raise ValueError
+    except (TypeError, ValueError):
+        return JsonResponse({"error": "Invalid 'limit' parameter. Must be between 1 and 100."}, status=400)
+
+    max_missing = None
+    if "max_missing" in request.GET:
+        try:
+            max_missing = int(request.GET["max_missing"])
+            if max_missing < 0:
+                raise ValueError
+        except (TypeError, ValueError):
+            return JsonResponse(
+                {"error": "Invalid 'max_missing' parameter. Must be a non-negative integer."}, status=400
+            )
+
+    while True:
+        matches = ingredient_index.search(names, limit=limit, max_missing=max_missing)
+        recipes = Recipe.objects.only(*SUMMARY_FIELDS).in_bulk([match.recipe_id for match in matches])
+        gone = [match.recipe_id for match in matches if match.recipe_id not in recipes]
+        if not gone:
+            break
+        # Deleted by another process since the index last synced.
+        for recipe_id in gone:
+            ingredient_index.remove_recipe(recipe_id)
+
+    results = [
+        {
+            **serialize_recipe_fields(recipes[match.recipe_id], SUMMARY_FIELDS),
+            "matched": match.matched,
+            "missing": match.missing,
+            "coverage": round(match.matched / match.total, 3),
+            "missing_ingredients": match.missing_ingredients,
+        }
+        for match in matches
+    ]
+    keys = sorted({key for name in names for key in ingredient_keys(name)})
+    return JsonResponse({"ingredients": keys, "results": results})
+
+
+@require_GET
+def export_recipes(request):
+    """Stream the whole catalog as NDJSON, optionally gzipped and filtered by `type` / `since`."""
+
+    compress_raw = request.GET.get("gzip", "false").strip().lower()
+    if compress_raw not in {"true", "false", "1", "0"}:
+        return JsonResponse({"error": "Invalid 'gzip' parameter. Must be 'true' or 'false'."}, status=400)
+    compress = compress_raw in {"true", "1"}
+
+    try:
+        since = parse_since(request.GET["since"]) if request.GET.get("since") else None
+        queryset = export_queryset(request.GET.get("type") or None, since)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    filename = "recipes.ndjson.gz" if compress else "recipes.ndjson"
+    response = StreamingHttpResponse(
+        iter_export(queryset, compress=compress),
+        content_type="application/gzip" if compress else "application/x-ndjson",
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+@csrf_exempt
+@require_POST
+async def ingest_recipe_urls_view(request):
+    """Scrape and store a batch of recipe URLs, returning a per-URL status report."""
+
+    try:
+        payload = json.loads(request.body or "{}")
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON body."}, status=400)
+
+    urls = payload.get("urls") if isinstance(payload, dict) else None
+    if not isinstance(urls, list) or not urls or not all(isinstance(url, str) for url in urls):
+        return JsonResponse({"error": "Field 'urls' must be a non-empty list of strings."}, status=400)
+    skip_duplicates = payload.get("skip_duplicates", False)
+    if not isinstance(skip_duplicates, bool):
+        return JsonResponse({"error": "Field 'skip_duplicates' must be a boolean."}, status=400)
+
+    max_urls = settings.RECIPE_INGEST_MAX_URLS
+    if len(urls) > max_urls:
+        return JsonResponse({"error": f"At most {max_urls} URLs can be ingested per request."}, status=400)
+
+    report = await ingest_recipe_urls(urls, skip_duplicates=skip_duplicates)
+    return JsonResponse({"results": report, "summary": summarize_ingest_report(report)})
 
 
 class RecipeStructError(RuntimeError):
@@ -255,6 +599,23 @@ def get_recipe_system_prompt() -> str:
 
 
 def _invoke_recipe_struct_model(source_url: str | None, raw_text: str) -> Dict[str, Any]:
+    """Structure raw recipe text with the model, reusing the result of an identical earlier call."""
+
+    system_prompt = get_recipe_system_prompt()
+    key = model_result_key(system_prompt, settings.RECIPE_STRUCT_MODEL, raw_text, source_url)
+    return cached_model_result(key, lambda: _run_recipe_struct_model(source_url, raw_text, system_prompt))
+
+
+def _convert_raw_text(source_url: str | None, raw_text: str) -> Dict[str, Any]:
+    """Answer from the local parser when it is confident enough, otherwise from the model."""
+
+    local = parse_raw_recipe(raw_text, source_url)
+    if local.confidence >= settings.RECIPE_LOCAL_PARSE_MIN_CONFIDENCE:
+        return local.result
+    return _invoke_recipe_struct_model(source_url, raw_text)
+
+
+def _run_recipe_struct_model(source_url: str | None, raw_text: str, system_prompt: str) -> Dict[str, Any]:
     try:
         import replicate
     except ImportError as exc:  # pragma: no cover - environment specific
@@ -277,16 +638,17 @@ def _invoke_recipe_struct_model(source_url: str | None, raw_text: str) -> Dict[s
         "messages": [],
         "verbosity": "low",
         "image_input": [],
-        "system_prompt": get_recipe_system_prompt(),
+        "system_prompt": system_prompt,
         "reasoning_effort": "minimal",
     }
 
     try:
-        raw_output = replicate.run(
-            "openai/gpt-5-nano",
-            input=input_payload,
-            api_token=api_token,
-        )
+        with timed_stage(model_call_latency, settings.RECIPE_STRUCT_MODEL):
+            raw_output = replicate.run(
+                settings.RECIPE_STRUCT_MODEL,
+                input=input_payload,
+                api_token=api_token,
+            )
     except Exception as exc:  # pragma: no cover - network/library specific
         raise RecipeStructError(f"Failed to invoke Replicate: {exc}") from exc
 
@@ -342,9 +704,51 @@ def convert_raw_recipe(request):
 
     source_url = _coerce_optional_string(payload.get("source_url"))
 
+    flags = {}
+    for name in ("async", "persist"):
+        raw_flag = request.GET.get(name, "false").strip().lower()
+        if raw_flag not in {"true", "false", "1", "0"}:
+            return JsonResponse({"error": f"Invalid '{name}' parameter. Must be 'true' or 'false'."}, status=400)
+        flags[name] = raw_flag in {"true", "1"}
+
+    if flags["async"]:
+        return _submit_convert_job(request, source_url, raw_text, flags["persist"])
+
     try:
-        result = _invoke_recipe_struct_model(source_url, raw_text)
+        result = _convert_raw_text(source_url, raw_text)
     except RecipeStructError as exc:
         return JsonResponse({"error": str(exc)}, status=502)
 
+    if flags["persist"]:
+        try:
+            store_converted_recipe(result, source_url)
+        except ImportRowError as exc:
+            return JsonResponse({"error": f"Result was not stored as a recipe: {exc}"}, status=502)
     return JsonResponse(result)
+
+
+def _submit_convert_job(request, source_url: str | None, raw_text: str, persist: bool) -> JsonResponse:
+    job = ConvertJob.objects.create(raw_text=raw_text, source_url=source_url, persist=persist)
+    # Looked up at call time so the worker uses whatever is installed then.
+    if not convert_jobs.submit(job, lambda url, text: _convert_raw_text(url, text)):
+        job.delete()
+        response = JsonResponse({"error": "Too many conversions in progress. Try again later."}, status=503)
+        response["Retry-After"] = "5"
+        return response
+
+    status_url = reverse("convert-raw-recipe-job", args=[job.pk])
+    response = JsonResponse(
+        {"job_id": str(job.pk), "status": ConvertJob.Status.QUEUED, "status_url": status_url}, status=202
+    )
+    response["Location"] = status_url
+    return response
+
+
+@require_GET
+def convert_raw_recipe_job(request, job_id):
+    """Poll a background convert-raw-recipe job."""
+
+    job = ConvertJob.objects.filter(pk=job_id).first()
+    if job is None:
+        return JsonResponse({"error": "Unknown job."}, status=404)
+    return JsonResponse(serialize_convert_job(job))